@@ -0,0 +1,145 @@
+"""Latência de transcrição e síntese por motor de fala (Gemini x local).
+
+Roda a mesma carga em cada motor disponível, com o roteamento fixado nele, e
+imprime média, p50 e p95 por operação e tamanho de entrada. O motor local
+vem da Config (GOOGLE_stt_local_motor, GOOGLE_tts_local_motor); motores não
+configurados ficam de fora. Os caches de síntese (entre sessões e de trechos)
+são esvaziados antes de cada iteração, fora da medição: o que se mede é o
+motor, não a consulta ao cache.
+
+    python -m benchmarks.latencia_fala --iteracoes 10
+    python -m benchmarks.latencia_fala --fake --latencia-fake 0.8
+"""
+
+import argparse
+import asyncio
+import importlib
+import statistics
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+from professor_virtual.shared_libraries.audio import encode_wav
+from professor_virtual.shared_libraries.genai_backend import (
+    FakeGenaiBackend,
+    set_genai_backend,
+)
+from professor_virtual.shared_libraries.speech import (
+    GEMINI,
+    LOCAL,
+    SpeechRouter,
+    get_local_stt_engine,
+    get_local_tts_engine,
+    set_speech_router,
+)
+from professor_virtual.shared_libraries.tts_cache import reset_tts_cache
+from professor_virtual.tools import gerar_audio_tts
+from professor_virtual.tools.transcrever_audio import transcrever_bytes
+
+modulo_tts = importlib.import_module("professor_virtual.tools.gerar_audio_tts.gerar_audio_tts")
+
+RATE = 16000
+
+FRASES = [
+    "Muito bem!",
+    "Isso mesmo, sete vezes oito é cinquenta e seis.",
+    "Vamos revisar frações: o numerador indica quantas partes tomamos, e o "
+    "denominador, em quantas partes o inteiro foi dividido.",
+]
+
+
+class _Contexto:
+    """Contexto mínimo: as tools só leem e gravam artifacts e o estado."""
+
+    def __init__(self):
+        self.state = {}
+
+    async def load_artifact(self, filename, version=None):
+        return None
+
+    async def save_artifact(self, filename, artifact):
+        return 0
+
+
+def _esvaziar_caches_de_sintese():
+    reset_tts_cache()
+    modulo_tts._trechos_cache.clear()
+
+
+def _gravacao(secs: float, rng: np.random.Generator) -> bytes:
+    # Tom com ruído sorteado: cada iteração tem bytes novos e escapa do cache
+    t = np.arange(int(secs * RATE)) / RATE
+    samples = 0.3 * np.sin(2 * np.pi * 220.0 * t) + 0.01 * rng.standard_normal(t.size)
+    return encode_wav(samples.astype(np.float32), RATE)
+
+
+async def _medir(operacao, n: int, preparar=None):
+    tempos, motores = [], set()
+    for _ in range(n):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = await operacao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        motores.add(resultado.get("motor", "erro"))
+    return tempos, motores
+
+
+def _linha(motor, operacao, entrada, tempos, motores):
+    p95 = statistics.quantiles(tempos, n=20)[-1] if len(tempos) > 1 else tempos[0]
+    return [
+        motor, operacao, entrada, len(tempos),
+        round(statistics.fmean(tempos)), round(statistics.median(tempos)), round(p95),
+        ",".join(sorted(motores)),
+    ]
+
+
+async def _executar(args) -> list:
+    rng = np.random.default_rng(0)
+    motores = [GEMINI]
+    if get_local_stt_engine() or get_local_tts_engine():
+        motores.append(LOCAL)
+
+    linhas = []
+    for motor in motores:
+        set_speech_router(SpeechRouter(mode=motor))
+        if motor == GEMINI or get_local_stt_engine():
+            for secs in args.duracoes:
+                tempos, usados = await _medir(
+                    lambda: transcrever_bytes(_gravacao(secs, rng), "audio/wav"),
+                    args.iteracoes,
+                )
+                linhas.append(_linha(motor, "transcrição", f"{secs:g}s", tempos, usados))
+        if motor == GEMINI or get_local_tts_engine():
+            for frase in FRASES:
+                tempos, usados = await _medir(
+                    lambda: gerar_audio_tts(frase, _Contexto()), args.iteracoes,
+                    preparar=_esvaziar_caches_de_sintese,
+                )
+                linhas.append(_linha(motor, "síntese", f"{len(frase)} car.", tempos, usados))
+    return linhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iteracoes", type=int, default=5)
+    parser.add_argument(
+        "--duracoes", type=lambda s: [float(d) for d in s.split(",")], default=[1.0, 3.0, 10.0],
+        help="durações das gravações em segundos, separadas por vírgula",
+    )
+    parser.add_argument("--fake", action="store_true", help="Gemini simulado (sem rede)")
+    parser.add_argument("--latencia-fake", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    if args.fake:
+        set_genai_backend(FakeGenaiBackend(latency_secs=args.latencia_fake))
+    linhas = asyncio.run(_executar(args))
+    print(tabulate(
+        linhas,
+        headers=["roteamento", "operação", "entrada", "n", "média ms", "p50 ms", "p95 ms", "motor usado"],
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Pico de memória da montagem do WAV de TTS e de cada pedido à tool.
+
+A primeira tabela compara, para o mesmo PCM (inteiro ou em blocos de stream),
+a montagem antiga (blocos concatenados, `wave` sobre `BytesIO` e `getvalue()`)
+com `audio.build_wav`, até o `types.Part.from_bytes` que vai para o artifact.
+O pico é medido com `tracemalloc` e não inclui o PCM de entrada.
+
+A segunda mede o pico de `gerar_audio_tts` com o Gemini simulado, com vários
+pedidos simultâneos, dividido pelo número de pedidos.
+
+    python -m benchmarks.memoria_wav
+    python -m benchmarks.memoria_wav --duracoes 10,60,300 --concorrencia 16
+"""
+
+import argparse
+import asyncio
+import io
+import tracemalloc
+import wave
+
+from google.genai import types
+from tabulate import tabulate
+
+from professor_virtual.shared_libraries.audio import build_wav
+from professor_virtual.shared_libraries.genai_backend import (
+    FakeGenaiBackend,
+    set_genai_backend,
+)
+from professor_virtual.tools import gerar_audio_tts
+
+RATE = 24000
+BLOCO_STREAM = 9600
+
+MB = 1024 * 1024
+
+FRASE = "Para somar frações com denominadores diferentes, encontramos o mínimo múltiplo comum."
+
+
+class _Contexto:
+    """Contexto mínimo: a tool só grava o artifact e o estado."""
+
+    def __init__(self):
+        self.state = {}
+
+    async def save_artifact(self, filename, artifact):
+        return 0
+
+
+def _wav_com_wave(blocos: list) -> bytes:
+    # Montagem anterior, mantida aqui como referência
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(b"".join(blocos))
+    return wav_buffer.getvalue()
+
+
+def _pico(montar, blocos: list) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    part = types.Part.from_bytes(data=montar(blocos), mime_type="audio/wav")
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del part
+    return pico
+
+
+def _montagem(duracoes: list) -> list:
+    linhas = []
+    for secs in duracoes:
+        pcm = bytes(int(secs * RATE) * 2)
+        for entrada, blocos in (
+            ("inteiro", [pcm]),
+            (f"blocos de {BLOCO_STREAM} B",
+             [pcm[i:i + BLOCO_STREAM] for i in range(0, len(pcm), BLOCO_STREAM)]),
+        ):
+            antigo = _pico(_wav_com_wave, blocos)
+            novo = _pico(lambda b: build_wav(b, RATE), blocos)
+            linhas.append([
+                f"{secs:g}s", entrada, round(len(pcm) / MB, 1),
+                round(antigo / MB, 1), f"{antigo / len(pcm):.2f}x",
+                round(novo / MB, 1), f"{novo / len(pcm):.2f}x",
+            ])
+    return linhas
+
+
+async def _por_pedido(concorrencia: int, frases: int) -> list:
+    set_genai_backend(FakeGenaiBackend())
+    textos = [" ".join(f"{FRASE} ({i}, {j})" for j in range(frases)) for i in range(concorrencia)]
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    resultados = await asyncio.gather(*(gerar_audio_tts(t, _Contexto()) for t in textos))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    audio = sum(r.get("tamanho_bytes", 0) for r in resultados) / concorrencia
+    return [[
+        concorrencia, len(textos[0]), round(audio / MB, 2),
+        round(pico / MB, 1), round(pico / concorrencia / MB, 2),
+        f"{pico / concorrencia / audio:.2f}x" if audio else "-",
+    ]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--duracoes", type=lambda s: [float(d) for d in s.split(",")], default=[10.0, 60.0, 300.0],
+        help="durações do áudio em segundos, separadas por vírgula",
+    )
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--frases", type=int, default=12, help="frases por texto sintetizado")
+    args = parser.parse_args(argv)
+
+    print(tabulate(
+        _montagem(args.duracoes),
+        headers=["áudio", "entrada", "PCM MB", "wave MB", "wave/PCM", "build_wav MB", "build_wav/PCM"],
+    ))
+    print()
+    print(tabulate(
+        asyncio.run(_por_pedido(args.concorrencia, args.frases)),
+        headers=["pedidos", "caracteres", "WAV MB", "pico MB", "pico/pedido MB", "pico/WAV"],
+    ))
+
+
+if __name__ == "__main__":
+    main()
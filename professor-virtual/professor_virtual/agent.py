@@ -99,3 +99,19 @@ runner = Runner(
 # - session_id: Unique session identifier
 # - user_id: User identifier for tracking
 # - action: The action to perform (e.g., "upload_file", "process_audio")
+#
+# Each invocation gets a turn deadline (Config.turn_timeout_secs) in
+# before_agent. It bounds tool work, the rate-limit wait and the agent's own
+# model calls (rate_limit_callback sets their HTTP timeout to the remaining
+# budget). app.include_router(execucao_streaming.criar_router_execucao(runner))
+# runs the agent over SSE and calls cancel_turn(invocation_id) when the
+# frontend disconnects, so in-flight tool work returns "cancelado".
+#
+# Streaming TTS for the frontend (audio plays while it is synthesized) is
+# mounted with app.include_router(tts_streaming.criar_router_tts_stream(runner)).
+# Partial text of long segmented transcriptions goes out through
+# app.include_router(transcricao_streaming.criar_router_transcricao_stream(runner)).
+#
+# On shutdown, ciclo_de_vida.ciclo_de_vida (passed as the FastAPI lifespan)
+# awaits shared_libraries.flush_write_behind() (transcripts queued for
+# background persistence) and shared_libraries.close_genai_clients().
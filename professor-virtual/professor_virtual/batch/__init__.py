@@ -0,0 +1 @@
+"""Execuções em lote fora de uma sessão do agente (`transcrever_lote`)."""
@@ -0,0 +1,246 @@
+"""Transcrição em lote, fora de uma sessão do agente.
+
+Percorre um diretório (ou um manifesto) de gravações e transcreve cada uma
+com o mesmo núcleo da tool `transcrever_audio` (cache, pré-processamento,
+portão de qualidade), com concorrência limitada e limite de requisições por
+minuto. Os resultados são gravados em JSONL conforme ficam prontos; rodar de
+novo com a mesma saída retoma de onde parou.
+
+Uso:
+    python -m professor_virtual.batch.transcrever_lote gravacoes/ -o saida.jsonl
+    python -m professor_virtual.batch.transcrever_lote --manifesto lista.txt -o saida.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import types as pytypes
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from ..shared_libraries.circuit_breaker import CircuitOpenError
+from ..shared_libraries.deadline import (
+    DeadlineExceeded,
+    TurnCancelled,
+    end_turn,
+    start_turn,
+)
+from ..shared_libraries.rate_limiter import TokenBucket
+from ..tools.transcrever_audio import transcrever_bytes
+
+logger = logging.getLogger(__name__)
+
+MIME_POR_EXTENSAO = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/m4a",
+    ".ogg": "audio/ogg",
+    ".oga": "audio/ogg",
+    ".opus": "audio/opus",
+    ".flac": "audio/flac",
+    ".aac": "audio/aac",
+    ".aif": "audio/aiff",
+    ".aiff": "audio/aiff",
+    ".webm": "audio/webm",
+}
+
+
+def listar_diretorio(raiz: Path) -> Iterator[Path]:
+    """Arquivos de áudio sob `raiz`, em ordem estável."""
+    for caminho in sorted(raiz.rglob("*")):
+        if caminho.is_file() and caminho.suffix.lower() in MIME_POR_EXTENSAO:
+            yield caminho
+
+
+def ler_manifesto(manifesto: Path) -> Iterator[Path]:
+    """Um caminho por linha (ou JSON com "caminho"); relativos ao manifesto."""
+    with manifesto.open(encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            if linha.startswith("{"):
+                linha = json.loads(linha)["caminho"]
+            caminho = Path(linha)
+            yield caminho if caminho.is_absolute() else manifesto.parent / caminho
+
+
+def carregar_concluidos(saida: Path) -> set[str]:
+    """Arquivos já resolvidos numa execução anterior.
+
+    Falhas transitórias (modelo indisponível, prazo esgotado, erros
+    inesperados) ficam de fora para serem tentadas de novo. Uma última linha
+    truncada por queda do processo é descartada.
+    """
+    if not saida.exists():
+        return set()
+    conteudo = saida.read_bytes()
+    if conteudo and not conteudo.endswith(b"\n"):
+        conteudo = conteudo[: conteudo.rfind(b"\n") + 1]
+        saida.write_bytes(conteudo)
+    concluidos = set()
+    for linha in conteudo.decode("utf-8").splitlines():
+        try:
+            registro = json.loads(linha)
+        except json.JSONDecodeError:
+            continue
+        if not registro.get("transitorio"):
+            concluidos.add(registro["caminho"])
+    return concluidos
+
+
+class TranscricaoEmLote:
+    """Executa o lote com `concorrencia` workers e `rpm` requisições/minuto."""
+
+    def __init__(
+        self,
+        saida: Path,
+        concorrencia: int = 8,
+        rpm: float = 120,
+        timeout_segundos: float = 120.0,
+        base: Optional[Path] = None,
+    ):
+        self.saida = saida
+        self.concorrencia = concorrencia
+        self.timeout_segundos = timeout_segundos
+        self.base = base
+        self._limite = TokenBucket(rpm, capacity=concorrencia)
+        self.contagem = {"sucesso": 0, "falha": 0, "transitorio": 0, "pulado": 0}
+
+    def _chave(self, caminho: Path) -> str:
+        if self.base is not None:
+            try:
+                return caminho.relative_to(self.base).as_posix()
+            except ValueError:
+                pass
+        return caminho.as_posix()
+
+    async def _transcrever(self, caminho: Path) -> Dict[str, Any]:
+        mime_type = MIME_POR_EXTENSAO.get(caminho.suffix.lower(), "application/octet-stream")
+        try:
+            audio_bytes = await asyncio.to_thread(caminho.read_bytes)
+        except OSError as e:
+            # Arquivo ausente ou ilegível: repetir não adianta
+            logger.warning(f"Não foi possível ler {caminho}: {e}")
+            return {"sucesso": False, "erro": f"Arquivo ilegível: {type(e).__name__}: {e}"}
+        await self._limite.acquire()
+        # Cada arquivo tem seu próprio prazo, como um turno do agente
+        contexto = pytypes.SimpleNamespace(invocation_id=f"lote-{uuid.uuid4().hex}", state={})
+        start_turn(contexto.invocation_id, self.timeout_segundos)
+        try:
+            return await transcrever_bytes(audio_bytes, mime_type, contexto)
+        except (CircuitOpenError, DeadlineExceeded, TurnCancelled) as e:
+            return {"sucesso": False, "transitorio": True, "erro": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            logger.warning(f"Falha ao transcrever {caminho}: {e}")
+            return {"sucesso": False, "transitorio": True, "erro": f"{type(e).__name__}: {e}"}
+        finally:
+            end_turn(contexto.invocation_id)
+
+    async def _worker(self, fila: asyncio.Queue, saida) -> None:
+        # Nenhum arquivo pode derrubar o worker: sem workers, o lote trava
+        # em fila.put/fila.join
+        while True:
+            caminho = await fila.get()
+            try:
+                inicio = time.monotonic()
+                try:
+                    resultado = await self._transcrever(caminho)
+                except Exception as e:
+                    logger.exception(f"Erro inesperado em {caminho}")
+                    resultado = {
+                        "sucesso": False, "transitorio": True, "erro": f"{type(e).__name__}: {e}"
+                    }
+                registro = {
+                    "caminho": self._chave(caminho),
+                    "tempo_segundos": round(time.monotonic() - inicio, 3),
+                    **resultado,
+                }
+                saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+                saida.flush()
+                if resultado.get("sucesso"):
+                    self.contagem["sucesso"] += 1
+                elif resultado.get("transitorio"):
+                    self.contagem["transitorio"] += 1
+                else:
+                    self.contagem["falha"] += 1
+            except Exception:
+                logger.exception(f"Falha ao registrar o resultado de {caminho}")
+            finally:
+                fila.task_done()
+
+    async def executar(self, caminhos) -> Dict[str, int]:
+        concluidos = carregar_concluidos(self.saida)
+        fila: asyncio.Queue = asyncio.Queue(self.concorrencia * 2)
+        self.saida.parent.mkdir(parents=True, exist_ok=True)
+        with self.saida.open("a", encoding="utf-8") as saida:
+            workers = [
+                asyncio.create_task(self._worker(fila, saida))
+                for _ in range(self.concorrencia)
+            ]
+            try:
+                for caminho in caminhos:
+                    if self._chave(caminho) in concluidos:
+                        self.contagem["pulado"] += 1
+                        continue
+                    # Fila limitada: o diretório é percorrido conforme há vaga
+                    await fila.put(caminho)
+                await fila.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+        return dict(self.contagem)
+
+
+def _argumentos(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="transcrever_lote",
+        description="Transcreve em lote um diretório ou manifesto de gravações.",
+    )
+    origem = parser.add_mutually_exclusive_group(required=True)
+    origem.add_argument("diretorio", nargs="?", type=Path, help="diretório com as gravações")
+    origem.add_argument("--manifesto", type=Path, help="arquivo com um caminho por linha")
+    parser.add_argument("-o", "--saida", type=Path, required=True, help="arquivo JSONL de saída")
+    parser.add_argument("-c", "--concorrencia", type=int, default=8)
+    parser.add_argument("--rpm", type=float, default=120, help="requisições por minuto")
+    parser.add_argument("--timeout-segundos", type=float, default=120.0,
+                        help="prazo de cada arquivo")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+async def _executar(args: argparse.Namespace) -> Dict[str, int]:
+    if args.manifesto:
+        caminhos, base = ler_manifesto(args.manifesto), args.manifesto.parent
+    else:
+        caminhos, base = listar_diretorio(args.diretorio), args.diretorio
+    lote = TranscricaoEmLote(
+        args.saida,
+        concorrencia=args.concorrencia,
+        rpm=args.rpm,
+        timeout_segundos=args.timeout_segundos,
+        base=base,
+    )
+    return await lote.executar(caminhos)
+
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    inicio = time.monotonic()
+    contagem = asyncio.run(_executar(args))
+    print(
+        f"{contagem['sucesso']} transcritos, {contagem['falha']} rejeitados, "
+        f"{contagem['transitorio']} a repetir, {contagem['pulado']} já concluídos "
+        f"em {time.monotonic() - inicio:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if contagem["transitorio"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
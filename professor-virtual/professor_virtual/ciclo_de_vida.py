@@ -0,0 +1,49 @@
+"""Encerramento do processo que serve o Runner.
+
+Transcrições agendadas para gravação em background (write-behind) e as
+conexões dos clients genai precisam ser finalizadas antes de o processo sair.
+Passe `ciclo_de_vida` como lifespan do app FastAPI, ao lado dos routers de
+stream:
+
+    from google.adk.cli.fast_api import get_fast_api_app
+    from professor_virtual.ciclo_de_vida import ciclo_de_vida
+
+    app = get_fast_api_app(..., lifespan=ciclo_de_vida)
+
+Fora do FastAPI, aguarde `encerrar_servicos()` antes de sair.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from .config import Config
+from .shared_libraries import close_genai_clients, flush_write_behind
+
+logger = logging.getLogger(__name__)
+
+_config = Config()
+
+
+async def encerrar_servicos(timeout: Optional[float] = None) -> bool:
+    """Grava o que está na fila write-behind e fecha os clients genai.
+
+    Retorna False se alguma gravação ainda estava pendente ao fim do `timeout`
+    (padrão: `Config.encerramento_timeout_secs`).
+    """
+    if timeout is None:
+        timeout = _config.encerramento_timeout_secs
+    gravado = await flush_write_behind(timeout)
+    if not gravado:
+        logger.warning("Encerrando com gravações em background pendentes")
+    await close_genai_clients()
+    return gravado
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    """Lifespan do FastAPI que chama `encerrar_servicos` no shutdown."""
+    try:
+        yield
+    finally:
+        await encerrar_servicos()
@@ -37,6 +37,8 @@ class Config(BaseSettings):
     app_name: str = "professor_virtual_app"
     CLOUD_PROJECT: str = Field(default="my_project")
     CLOUD_LOCATION: str = Field(default="us-central1")
+    # Vertex AI multi-região para as tools, ex.: "us-central1:3,us-east4:1"
+    CLOUD_LOCATIONS: str = Field(default="")
     GENAI_USE_VERTEXAI: str = Field(default="1")
     API_KEY: str | None = Field(default="")
     
@@ -46,3 +48,95 @@ class Config(BaseSettings):
     
     # Configuração de ambiente
     is_production: bool = Field(default=False)
+
+    # Prazo máximo de um turno do aluno (segundos), propagado às tools
+    turn_timeout_secs: float = Field(default=60.0)
+
+    # Rate limit das chamadas ao modelo (requisições por minuto; 0 desativa)
+    rate_limit_global_rpm: int = Field(default=300)
+    rate_limit_user_rpm: int = Field(default=20)
+    rate_limit_session_rpm: int = Field(default=10)
+
+    # Controle adaptativo de concorrência (AIMD) e retry por modelo Gemini
+    genai_concurrency_initial: int = Field(default=8)
+    genai_concurrency_min: int = Field(default=1)
+    genai_concurrency_max: int = Field(default=64)
+    genai_retry_max_attempts: int = Field(default=4)
+    genai_retry_base_delay_secs: float = Field(default=0.5)
+    genai_retry_max_delay_secs: float = Field(default=8.0)
+
+    # Hedging (opt-in): reenvia chamadas lentas de transcrição e visão
+    hedging_enabled: bool = Field(default=False)
+    hedging_percentile: float = Field(default=95.0)
+    hedging_max_fraction: float = Field(default=0.05)
+    hedging_min_samples: int = Field(default=20)
+
+    # Circuit breaker por modelo: falhas consecutivas até abrir e tempo aberto
+    circuit_breaker_failure_threshold: int = Field(default=5)
+    circuit_breaker_reset_timeout_secs: float = Field(default=30.0)
+
+    # Cache de transcrições (LRU limitado por bytes, com TTL)
+    transcricao_cache_max_bytes: int = Field(default=32 * 1024 * 1024)
+    transcricao_cache_ttl_secs: float = Field(default=24 * 60 * 60)
+
+    # Pré-processamento do áudio antes da transcrição (mono, 16kHz, sem silêncio)
+    transcricao_preprocessamento: bool = Field(default=True)
+    transcricao_sample_rate: int = Field(default=16000)
+
+    # Portão de qualidade local: gravações fora destes limites não vão ao modelo
+    transcricao_min_duracao_secs: float = Field(default=0.3)
+    transcricao_min_rms_db: float = Field(default=-45.0)
+    transcricao_max_clipping: float = Field(default=0.05)
+    transcricao_min_fracao_fala: float = Field(default=0.05)
+    transcricao_max_duracao_secs: float = Field(default=10 * 60)
+
+    # Transcrição segmentada (transcrever_audio_avancado)
+    transcricao_segmento_max_secs: float = Field(default=30.0)
+    transcricao_segmentos_paralelos: int = Field(default=4)
+
+    # Persistência das transcrições como artifact: background (write-behind),
+    # sync (aguarda a gravação) ou off
+    transcricao_persistencia: str = Field(default="background")
+    transcricao_persistencia_fila_max: int = Field(default=256)
+    # Espera máxima pelas gravações em background no encerramento (segundos)
+    encerramento_timeout_secs: float = Field(default=10.0)
+
+    # Files API: mídia reenviada a partir deste número de vezes (e deste
+    # tamanho) é enviada uma vez e referenciada pela URI
+    arquivos_reuso_para_upload: int = Field(default=2)
+    arquivos_reuso_min_bytes: int = Field(default=1024 * 1024)
+
+    # Cache de TTS entre sessões: índice pedido -> áudio e áudio recente em memória
+    tts_cache_max_entradas: int = Field(default=10_000)
+    tts_cache_audio_max_bytes: int = Field(default=64 * 1024 * 1024)
+
+    # TTS de textos longos: trechos de frases sintetizados em paralelo
+    tts_texto_longo_caracteres: int = Field(default=400)
+    tts_trecho_max_caracteres: int = Field(default=300)
+    tts_trechos_paralelos: int = Field(default=4)
+    tts_trechos_cache_max_bytes: int = Field(default=32 * 1024 * 1024)
+
+    # Motores de fala locais (CPU) e roteamento Gemini x local. Roteamento:
+    # auto (pela política abaixo), gemini ou local (fixos)
+    fala_roteamento: str = Field(default="auto")
+    # Uso de cota do Gemini (0-1) a partir do qual o motor local assume mais casos
+    fala_pressao_cota_limite: float = Field(default=0.8)
+    stt_local_motor: str = Field(default="", description="faster_whisper ou vazio")
+    stt_local_modelo: str = Field(default="small")
+    stt_local_max_secs: float = Field(default=3.0)
+    stt_local_pressao_max_secs: float = Field(default=15.0)
+    tts_local_motor: str = Field(default="", description="piper ou vazio")
+    tts_local_modelo: str = Field(default="", description="caminho da voz .onnx")
+    # Frases sintetizadas sempre localmente, separadas por "|"
+    tts_local_frases: str = Field(
+        default="Muito bem!|Isso mesmo!|Pode repetir, por favor?|Vamos tentar de novo?"
+    )
+    tts_local_pressao_max_caracteres: int = Field(default=200)
+
+    # Backend das chamadas Gemini das tools
+    genai_backend: str = Field(default="gemini", description="gemini ou fake")
+
+    # Pool de conexões do cliente Gemini compartilhado pelas tools
+    genai_max_connections: int = Field(default=100)
+    genai_max_keepalive_connections: int = Field(default=20)
+    genai_keepalive_expiry_secs: float = Field(default=30.0)
@@ -0,0 +1,74 @@
+"""Contexto de sessão para os endpoints HTTP que chamam tools fora do Runner.
+
+Os endpoints em stream (`tts_streaming`, `transcricao_streaming`) rodam as
+tools direto, sem uma invocação do agente. `ContextoSessao` dá a elas o que
+usam de um ToolContext (estado, artifacts e `invocation_id`) sobre os
+serviços do Runner, e grava as alterações de estado como um evento da sessão.
+"""
+
+import uuid
+from typing import Any, Dict
+
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from .config import Config
+
+_config = Config()
+
+
+class EstadoComDelta(dict):
+    """Estado da sessão que registra o que a tool alterou."""
+
+    def __init__(self, inicial):
+        super().__init__(inicial)
+        self.delta: Dict[str, Any] = {}
+
+    def __setitem__(self, chave, valor):
+        super().__setitem__(chave, valor)
+        self.delta[chave] = valor
+
+
+class ContextoSessao:
+    """O que as tools em stream usam de um ToolContext, sobre os serviços
+    de artifacts e sessões do Runner.
+
+    Cada contexto é uma invocação própria, `<prefixo>-<uuid>`, com seu prazo
+    de turno.
+    """
+
+    def __init__(self, runner, session, prefixo: str):
+        self._runner = runner
+        self._session = session
+        self.invocation_id = f"{prefixo}-{uuid.uuid4().hex}"
+        self.state = EstadoComDelta(session.state)
+
+    def _escopo(self) -> Dict[str, str]:
+        return {
+            "app_name": self._runner.app_name,
+            "user_id": self._session.user_id,
+            "session_id": self._session.id,
+        }
+
+    async def load_artifact(self, filename: str, version=None):
+        return await self._runner.artifact_service.load_artifact(
+            filename=filename, version=version, **self._escopo()
+        )
+
+    async def save_artifact(self, filename: str, artifact: types.Part) -> int:
+        return await self._runner.artifact_service.save_artifact(
+            filename=filename, artifact=artifact, **self._escopo()
+        )
+
+    async def salvar_estado(self) -> None:
+        """Grava as alterações de estado como um evento da sessão."""
+        if not self.state.delta:
+            return
+        await self._runner.session_service.append_event(
+            self._session,
+            Event(
+                invocation_id=self.invocation_id,
+                author=_config.agent_settings.name,
+                actions=EventActions(state_delta=dict(self.state.delta)),
+            ),
+        )
@@ -0,0 +1,89 @@
+"""Endpoint HTTP que executa o agente e cancela o turno quando o cliente sai.
+
+Cada turno recebe um prazo em `before_agent`; este endpoint é o lado do
+servidor que encerra o trabalho em andamento quando o frontend desconecta
+(aba fechada, rede caiu). Monte-o no app FastAPI que serve o Runner:
+
+    from professor_virtual.agent import runner
+    from professor_virtual.execucao_streaming import criar_router_execucao
+
+    app.include_router(criar_router_execucao(runner))
+
+POST /agente/eventos  {"user_id": ..., "session_id": ..., "texto": ...}
+    `text/event-stream`: um evento "data" por evento do Runner (JSON do
+    `Event` do ADK). Se a conexão cair antes do fim, `cancel_turn` é chamado
+    para a invocação: tools ainda em andamento devolvem "cancelado" e chamadas
+    ao modelo compartilhadas são canceladas.
+"""
+
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from google.adk.events import Event
+from google.genai import types
+from pydantic import BaseModel
+
+from .shared_libraries.deadline import cancel_turn, end_turn
+
+logger = logging.getLogger(__name__)
+
+
+class PedidoExecucao(BaseModel):
+    user_id: str
+    session_id: str
+    texto: str
+
+
+async def eventos_do_turno(
+    runner, user_id: str, session_id: str, mensagem: types.Content
+) -> AsyncIterator[Event]:
+    """Eventos de `runner.run_async`; cancela o turno se o consumo parar antes do fim.
+
+    O id da invocação vem do primeiro evento. Antes dele, o turno roda na
+    própria tarefa do consumidor e para junto com ela.
+    """
+    eventos = runner.run_async(user_id=user_id, session_id=session_id, new_message=mensagem)
+    invocation_id: Optional[str] = None
+    concluido = False
+    try:
+        async for evento in eventos:
+            invocation_id = invocation_id or evento.invocation_id
+            yield evento
+        concluido = True
+    finally:
+        if invocation_id:
+            if concluido:
+                end_turn(invocation_id)
+            else:
+                cancel_turn(invocation_id, "client_disconnected")
+        await eventos.aclose()
+
+
+def criar_router_execucao(runner) -> APIRouter:
+    """Router com o endpoint de execução do agente sobre os serviços de `runner`."""
+    router = APIRouter()
+
+    @router.post("/agente/eventos")
+    async def agente_eventos(pedido: PedidoExecucao):
+        session = await runner.session_service.get_session(
+            app_name=runner.app_name, user_id=pedido.user_id, session_id=pedido.session_id
+        )
+        if session is None:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada")
+        mensagem = types.Content(role="user", parts=[types.Part(text=pedido.texto)])
+
+        async def corpo():
+            # Na desconexão o Starlette cancela esta tarefa; o finally de
+            # `eventos_do_turno` cancela o turno
+            async for evento in eventos_do_turno(
+                runner, pedido.user_id, pedido.session_id, mensagem
+            ):
+                yield f"data: {evento.model_dump_json(exclude_none=True, by_alias=True)}\n\n"
+
+        return StreamingResponse(
+            corpo(), media_type="text/event-stream", headers={"Cache-Control": "no-store"}
+        )
+
+    return router
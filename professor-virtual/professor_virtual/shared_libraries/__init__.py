@@ -18,6 +18,14 @@ from .callbacks.lowercase_value import lowercase_value
 from .callbacks.before_tool import before_tool
 from .callbacks.after_tool import after_tool
 from .callbacks.before_agent import before_agent
+from .rate_limiter import get_rate_limiter
+from .genai_client import (
+    get_genai_client,
+    get_async_genai_client,
+    close_genai_clients,
+)
+from .write_behind import flush_write_behind, write_behind_stats
+from .tts_cache import tts_cache_stats
 
 
 __all__ = [
@@ -27,4 +35,11 @@ __all__ = [
     "before_tool",
     "after_tool",
     "before_agent",
+    "get_rate_limiter",
+    "get_genai_client",
+    "get_async_genai_client",
+    "close_genai_clients",
+    "flush_write_behind",
+    "write_behind_stats",
+    "tts_cache_stats",
 ]
@@ -0,0 +1,66 @@
+from .wav import (
+    WavFormatError,
+    WavInfo,
+    build_wav,
+    is_wav,
+    parse_wav_header,
+    decode_wav,
+    encode_wav,
+    streaming_wav_header,
+    wav_header,
+)
+from .output import (
+    DEFAULT_PROFILE,
+    OutputProfile,
+    encode_output,
+    mulaw_decode,
+    mulaw_encode,
+)
+from .webm import WebmError, is_webm, parse_webm, webm_to_ogg_opus
+from .probe import PROBE_BYTES, AudioInfo, probe_audio
+from .vad import frame_energy_db, voice_activity
+from .quality import AudioQualityReport, QualityThresholds, analyze_quality
+from .segmentation import split_at_silence, has_speech
+from .preprocessing import (
+    PreprocessedAudio,
+    downmix,
+    resample,
+    trim_silence,
+    preprocess_for_transcription,
+)
+
+__all__ = [
+    "WavFormatError",
+    "WavInfo",
+    "is_wav",
+    "parse_wav_header",
+    "decode_wav",
+    "encode_wav",
+    "build_wav",
+    "wav_header",
+    "streaming_wav_header",
+    "DEFAULT_PROFILE",
+    "OutputProfile",
+    "encode_output",
+    "mulaw_encode",
+    "mulaw_decode",
+    "PreprocessedAudio",
+    "downmix",
+    "resample",
+    "frame_energy_db",
+    "voice_activity",
+    "trim_silence",
+    "preprocess_for_transcription",
+    "AudioQualityReport",
+    "QualityThresholds",
+    "analyze_quality",
+    "PROBE_BYTES",
+    "AudioInfo",
+    "probe_audio",
+    "split_at_silence",
+    "has_speech",
+    "WebmError",
+    "is_webm",
+    "parse_webm",
+    "webm_to_ogg_opus",
+]
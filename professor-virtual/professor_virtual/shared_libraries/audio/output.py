@@ -0,0 +1,158 @@
+"""Encodes 16-bit PCM into a negotiated output profile (rate, width, container).
+
+Speech is synthesized as 24kHz 16-bit PCM, which is far more than a phone
+speaker needs. A profile lowers the sample rate (NumPy resampling), swaps
+16-bit linear samples for 8-bit G.711 μ-law and picks the container: WAV or
+Sun/NeXT `.au` (`audio/basic`).
+"""
+
+import struct
+from dataclasses import dataclass, replace
+from typing import Iterable, Union
+
+import numpy as np
+
+from .preprocessing import resample
+from .wav import STREAMING_DATA_SIZE, Buffer, build_wav
+
+WAVE_FORMAT_MULAW = 0x0007
+
+AU_ENCODING_MULAW = 1
+AU_ENCODING_PCM16 = 3
+
+CONTAINERS = ("wav", "au")
+SAMPLE_WIDTHS = (16, 8)
+SAMPLE_RATES = (8000, 11025, 16000, 22050, 24000)
+
+_MULAW_BIAS = 0x21
+_MULAW_CLIP = 8158
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """Requested output format.
+
+    `sample_rate` is a ceiling: audio is never upsampled past its source rate.
+    `bits_per_sample` 16 is linear PCM; 8 is G.711 μ-law.
+    """
+
+    sample_rate: int = 24000
+    bits_per_sample: int = 16
+    container: str = "wav"
+
+    def validate(self) -> None:
+        if self.sample_rate not in SAMPLE_RATES:
+            raise ValueError(f"unsupported sample rate {self.sample_rate}")
+        if self.bits_per_sample not in SAMPLE_WIDTHS:
+            raise ValueError(f"unsupported sample width {self.bits_per_sample}")
+        if self.container not in CONTAINERS:
+            raise ValueError(f"unsupported container {self.container!r}")
+
+    def at_most(self, sample_rate: int) -> "OutputProfile":
+        """The profile actually produced from a source at `sample_rate`."""
+        return replace(self, sample_rate=min(self.sample_rate, sample_rate))
+
+    @property
+    def is_default(self) -> bool:
+        return self == DEFAULT_PROFILE
+
+    @property
+    def mime_type(self) -> str:
+        return "audio/wav" if self.container == "wav" else "audio/basic"
+
+    def cache_options(self) -> tuple:
+        """Extra `speech_key` options; empty for the default profile."""
+        if self.is_default:
+            return ()
+        return (self.container, self.sample_rate, self.bits_per_sample)
+
+    def describe(self) -> dict:
+        return {
+            "taxa_amostragem": self.sample_rate,
+            "bits_por_amostra": self.bits_per_sample,
+            "codificacao": "mulaw" if self.bits_per_sample == 8 else "pcm",
+            "conteiner": self.container,
+        }
+
+
+DEFAULT_PROFILE = OutputProfile()
+
+
+def mulaw_encode(pcm16: np.ndarray) -> np.ndarray:
+    """G.711 μ-law encoding of int16 samples, one byte per sample."""
+    # Reference G.711 algorithm, on the 14 most significant bits
+    samples = pcm16.astype(np.int32) >> 2
+    sign = np.where(samples < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(samples), _MULAW_CLIP) + _MULAW_BIAS
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 5
+    mantissa = (magnitude >> (exponent + 1)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def mulaw_decode(encoded: np.ndarray) -> np.ndarray:
+    """Inverse of `mulaw_encode`, back to int16 samples."""
+    inverted = ~encoded.astype(np.int32) & 0xFF
+    exponent = (inverted >> 4) & 0x07
+    magnitude = (((inverted & 0x0F) << 3) + 0x84) << exponent
+    return np.where(inverted & 0x80, 0x84 - magnitude, magnitude - 0x84).astype("<i2")
+
+
+def mulaw_wav_header(data_size: int, sample_rate: int, channels: int = 1) -> bytes:
+    """58-byte WAV header for μ-law data (18-byte fmt chunk plus fact chunk)."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHHH4sII4sI",
+        b"RIFF",
+        min(50 + data_size, STREAMING_DATA_SIZE),
+        b"WAVE",
+        b"fmt ",
+        18,
+        WAVE_FORMAT_MULAW,
+        channels,
+        sample_rate,
+        sample_rate * channels,
+        channels,
+        8,
+        0,
+        b"fact",
+        4,
+        data_size // channels,
+        b"data",
+        data_size,
+    )
+
+
+def au_header(data_size: int, sample_rate: int, channels: int = 1,
+              encoding: int = AU_ENCODING_MULAW) -> bytes:
+    """24-byte Sun/NeXT `.au` header (big-endian)."""
+    return struct.pack(">4sIIIII", b".snd", 24, data_size, encoding, sample_rate, channels)
+
+
+def encode_output(pcm: Union[Buffer, Iterable[Buffer]], sample_rate: int,
+                  profile: OutputProfile = DEFAULT_PROFILE, channels: int = 1) -> bytes:
+    """Encodes 16-bit little-endian PCM (whole or in chunks) as `profile`.
+
+    When nothing changes but the container header (16-bit WAV at the source
+    rate), the PCM goes through `build_wav` untouched.
+    """
+    rate = profile.at_most(sample_rate).sample_rate
+    if profile.container == "wav" and profile.bits_per_sample == 16 and rate == sample_rate:
+        return build_wav(pcm, sample_rate, channels)
+
+    chunks = [pcm] if isinstance(pcm, (bytes, bytearray, memoryview)) else list(pcm)
+    samples = np.concatenate(
+        [np.frombuffer(chunk, dtype="<i2") for chunk in chunks] or [np.zeros(0, "<i2")]
+    ).reshape(-1, channels)
+    if rate != sample_rate:
+        resampled = [resample(samples[:, c] / 32768.0, sample_rate, rate) for c in range(channels)]
+        samples = (np.clip(np.stack(resampled, axis=1), -1.0, 1.0) * 32767.0).round().astype("<i2")
+    samples = samples.reshape(-1)
+
+    if profile.bits_per_sample == 8:
+        data = mulaw_encode(samples).tobytes()
+        if profile.container == "au":
+            return au_header(len(data), rate, channels) + data
+        return mulaw_wav_header(len(data), rate, channels) + data
+    if profile.container == "au":
+        data = samples.astype(">i2").tobytes()
+        return au_header(len(data), rate, channels, AU_ENCODING_PCM16) + data
+    return build_wav(samples.data, rate, channels)
@@ -0,0 +1,129 @@
+"""Shrinks recordings before transcription: mono, 16kHz, silence trimmed."""
+
+import logging
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from .vad import FRAME_MS, frame_energy_db, voice_activity
+from .quality import AudioQualityReport, QualityThresholds, analyze_quality
+from .wav import WavFormatError, decode_wav, encode_wav, is_wav
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+
+
+@dataclass
+class PreprocessedAudio:
+    """Payload to send to the model plus what preprocessing saved."""
+
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    original_secs: float
+    processed_secs: float
+    sample_rate: int
+    channels_in: int
+    quality: Optional[AudioQualityReport] = None
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+    @property
+    def secs_saved(self) -> float:
+        return self.original_secs - self.processed_secs
+
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """(frames, channels) -> mono (frames,) by averaging channels."""
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+
+def _lowpass(samples: np.ndarray, cutoff: float, taps: int = 63) -> np.ndarray:
+    """Windowed-sinc FIR low-pass; `cutoff` is a fraction of the sample rate."""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    kernel /= kernel.sum()
+    return np.convolve(samples, kernel.astype(np.float32), mode="same")
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Resamples mono audio by linear interpolation (anti-aliased when downsampling)."""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+    if target_rate < source_rate:
+        samples = _lowpass(samples, 0.5 * target_rate / source_rate * 0.9)
+    duration = len(samples) / source_rate
+    target_len = max(1, int(round(duration * target_rate)))
+    source_times = np.arange(len(samples)) / source_rate
+    target_times = np.arange(target_len) / target_rate
+    return np.interp(target_times, source_times, samples).astype(np.float32)
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int,
+                 padding_ms: int = 200) -> np.ndarray:
+    """Drops leading and trailing silence, keeping `padding_ms` around speech."""
+    voiced = voice_activity(frame_energy_db(samples, sample_rate))
+    if not voiced.any():
+        return samples
+    frame_len = sample_rate * FRAME_MS // 1000
+    padding = sample_rate * padding_ms // 1000
+    indices = np.flatnonzero(voiced)
+    start = max(0, indices[0] * frame_len - padding)
+    end = min(len(samples), (indices[-1] + 1) * frame_len + padding)
+    return samples[start:end]
+
+
+def preprocess_for_transcription(
+    data: bytes,
+    target_rate: int = TARGET_SAMPLE_RATE,
+    trim: bool = True,
+    thresholds: Optional[QualityThresholds] = None,
+) -> Optional[PreprocessedAudio]:
+    """Decodes a PCM WAV, downmixes, resamples and trims silence.
+
+    When `thresholds` is given, the quality report is computed on the same
+    decoded samples so the caller can reject the recording without decoding
+    it twice. If processing would not shrink the payload, the original bytes
+    are kept. Returns None when the input is not a decodable WAV (compressed
+    formats are sent to the model as they are).
+    """
+    if not is_wav(data):
+        return None
+    try:
+        samples, sample_rate = decode_wav(data)
+    except (WavFormatError, struct.error) as e:
+        logger.debug("Skipping audio preprocessing: %s", e)
+        return None
+
+    channels = samples.shape[1]
+    original_secs = samples.shape[0] / sample_rate if sample_rate else 0.0
+    mono = downmix(samples)
+    quality = analyze_quality(mono, sample_rate, thresholds) if thresholds else None
+    if not sample_rate or len(mono) == 0:
+        return PreprocessedAudio(data, "audio/wav", len(data), 0.0, 0.0,
+                                 sample_rate, channels, quality)
+
+    rate = min(target_rate, sample_rate)
+    mono = resample(mono, sample_rate, rate)
+    if trim:
+        mono = trim_silence(mono, rate)
+
+    encoded = encode_wav(mono, rate)
+    if len(encoded) >= len(data):
+        return PreprocessedAudio(data, "audio/wav", len(data), original_secs,
+                                 original_secs, sample_rate, channels, quality)
+    return PreprocessedAudio(
+        data=encoded,
+        mime_type="audio/wav",
+        original_bytes=len(data),
+        original_secs=original_secs,
+        processed_secs=len(mono) / rate,
+        sample_rate=rate,
+        channels_in=channels,
+        quality=quality,
+    )
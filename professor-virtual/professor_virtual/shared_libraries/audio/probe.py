@@ -0,0 +1,260 @@
+"""Reads duration and stream layout from audio container headers.
+
+Only bounded regions of the payload are touched: the first `PROBE_BYTES`
+(after any ID3v2 tag for MP3), the last `PROBE_BYTES` for Ogg, box headers
+for MP4 and element headers for WebM. Nothing is decoded, so probing a 20MB upload costs the
+same as probing a 20KB one.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+from .webm import WebmError, is_webm, parse_webm
+
+PROBE_BYTES = 8 * 1024
+
+
+@dataclass
+class AudioInfo:
+    format: str
+    duration_secs: Optional[float]
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    bits_per_sample: Optional[int] = None
+    bitrate: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "formato": self.format,
+            "duracao_segundos": (
+                round(self.duration_secs, 3) if self.duration_secs is not None else None
+            ),
+            "sample_rate": self.sample_rate,
+            "canais": self.channels,
+            "bits_por_amostra": self.bits_per_sample,
+            "bitrate": self.bitrate,
+        }
+
+
+def probe_audio(data: bytes) -> Optional[AudioInfo]:
+    """Identifies the container by its magic bytes and parses its header.
+
+    Returns None for unknown or malformed payloads.
+    """
+    view = memoryview(data)
+    head = bytes(view[:PROBE_BYTES])
+    try:
+        if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+            return _probe_wav(head, len(data))
+        if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+            return _probe_aiff(head)
+        if head[:4] == b"fLaC":
+            return _probe_flac(head)
+        if head[:4] == b"OggS":
+            return _probe_ogg(head, bytes(view[-PROBE_BYTES:]))
+        if is_webm(head):
+            return _probe_webm(data)
+        if head[4:8] == b"ftyp":
+            return _probe_mp4(view)
+        if head[:3] == b"ID3" or _is_mpeg_sync(head, 0):
+            return _probe_mp3(view)
+    except (struct.error, IndexError, ValueError, ZeroDivisionError, WebmError):
+        return None
+    return None
+
+
+def _probe_wav(head: bytes, total_size: int) -> Optional[AudioInfo]:
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(head):
+        chunk_id = head[offset:offset + 4]
+        (size,) = struct.unpack_from("<I", head, offset + 4)
+        if chunk_id == b"fmt ":
+            _, channels, rate, byte_rate, _, bits = struct.unpack_from(
+                "<HHIIHH", head, offset + 8
+            )
+            fmt = (channels, rate, byte_rate, bits)
+        elif chunk_id == b"data" and fmt:
+            channels, rate, byte_rate, bits = fmt
+            available = total_size - (offset + 8)
+            data_size = size if 0 < size <= available else available
+            return AudioInfo("wav", data_size / byte_rate, rate, channels, bits,
+                             byte_rate * 8)
+        offset += 8 + size + (size & 1)
+    return None
+
+
+def _extended_to_float(raw: bytes) -> float:
+    """IEEE 754 80-bit extended (used by AIFF for the sample rate)."""
+    exponent, mantissa = struct.unpack(">HQ", raw)
+    sign = -1 if exponent & 0x8000 else 1
+    exponent &= 0x7FFF
+    if exponent == 0 and mantissa == 0:
+        return 0.0
+    return sign * mantissa * 2.0 ** (exponent - 16383 - 63)
+
+
+def _probe_aiff(head: bytes) -> Optional[AudioInfo]:
+    offset = 12
+    while offset + 8 <= len(head):
+        chunk_id = head[offset:offset + 4]
+        (size,) = struct.unpack_from(">I", head, offset + 4)
+        if chunk_id == b"COMM":
+            channels, frames, bits = struct.unpack_from(">hIh", head, offset + 8)
+            rate = _extended_to_float(head[offset + 16:offset + 26])
+            return AudioInfo("aiff", frames / rate, int(rate), channels, bits,
+                             int(rate * channels * bits))
+        offset += 8 + size + (size & 1)
+    return None
+
+
+def _probe_flac(head: bytes) -> Optional[AudioInfo]:
+    # The first metadata block is always STREAMINFO (type 0).
+    if head[4] & 0x7F != 0:
+        return None
+    info = head[8:8 + 34]
+    packed = int.from_bytes(info[10:18], "big")
+    rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits = ((packed >> 36) & 0x1F) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    duration = total_samples / rate if total_samples else None
+    return AudioInfo("flac", duration, rate, channels, bits)
+
+
+def _probe_ogg(head: bytes, tail: bytes) -> Optional[AudioInfo]:
+    # The first page carries the codec identification header.
+    segments = head[26]
+    packet = head[27 + segments:]
+    if packet[:8] == b"OpusHead":
+        channels = packet[9]
+        pre_skip, input_rate = struct.unpack_from("<HI", packet, 10)
+        # Opus granule positions always count 48kHz samples.
+        rate, granule_rate, codec = input_rate or 48000, 48000, "opus"
+    elif packet[:7] == b"\x01vorbis":
+        channels = packet[11]
+        (rate,) = struct.unpack_from("<I", packet, 12)
+        pre_skip, granule_rate, codec = 0, rate, "ogg"
+    else:
+        return None
+
+    # Duration is the granule position of the last page.
+    last_page = tail.rfind(b"OggS")
+    duration = None
+    if last_page >= 0 and last_page + 14 <= len(tail):
+        (granule,) = struct.unpack_from("<q", tail, last_page + 6)
+        if granule > 0:
+            duration = max(0, granule - pre_skip) / granule_rate
+    return AudioInfo(codec, duration, rate, channels)
+
+
+def _probe_webm(data: bytes) -> Optional[AudioInfo]:
+    # Stops after Info/Tracks when Duration is there; live recordings omit
+    # it, and then the duration comes from walking block headers (no decoding).
+    audio = parse_webm(data, with_packets=False)
+    codec = "opus" if audio.codec == "A_OPUS" else audio.codec.lower()
+    return AudioInfo(f"webm/{codec}", audio.duration_secs, audio.sample_rate, audio.channels)
+
+
+def _probe_mp4(view: memoryview) -> Optional[AudioInfo]:
+    """Walks top-level boxes (skipping mdat by size) to moov/mvhd."""
+    offset, total = 0, len(view)
+    while offset + 8 <= total:
+        size, box = struct.unpack(">I4s", view[offset:offset + 8])
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", view[offset + 8:offset + 16])
+            header = 16
+        elif size == 0:
+            size = total - offset
+        if box == b"moov":
+            moov = bytes(view[offset + header:offset + min(size, PROBE_BYTES)])
+            mvhd = moov.find(b"mvhd")
+            if mvhd < 0:
+                return None
+            body = mvhd + 4
+            if moov[body] == 1:
+                timescale, duration = struct.unpack_from(">IQ", moov, body + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", moov, body + 12)
+            return AudioInfo("m4a", duration / timescale)
+        if size < header:
+            return None
+        offset += size
+    return None
+
+
+_MPEG_BITRATES = {
+    # (version is MPEG1, layer) -> kbps by index
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MPEG_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000],
+                      0: [11025, 12000, 8000]}
+
+
+def _is_mpeg_sync(buf: bytes, offset: int) -> bool:
+    return (
+        offset + 4 <= len(buf)
+        and buf[offset] == 0xFF
+        and buf[offset + 1] & 0xE0 == 0xE0
+        and (buf[offset + 1] >> 3) & 0x3 != 1  # reserved version
+        and (buf[offset + 1] >> 1) & 0x3 != 0  # reserved layer
+        and buf[offset + 2] >> 4 not in (0, 15)
+        and (buf[offset + 2] >> 2) & 0x3 != 3
+    )
+
+
+def _probe_mp3(view: memoryview) -> Optional[AudioInfo]:
+    start = 0
+    if bytes(view[:3]) == b"ID3":
+        header = bytes(view[:10])
+        tag_size = 0
+        for b in header[6:10]:
+            tag_size = (tag_size << 7) | (b & 0x7F)
+        start = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+
+    head = bytes(view[start:start + PROBE_BYTES])
+    sync = next((i for i in range(len(head) - 3) if _is_mpeg_sync(head, i)), None)
+    if sync is None:
+        return None
+    b1, b2, b3 = head[sync + 1], head[sync + 2], head[sync + 3]
+    version = (b1 >> 3) & 0x3  # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+    layer = 4 - ((b1 >> 1) & 0x3)
+    mpeg1 = version == 3
+    bitrate = _MPEG_BITRATES[(mpeg1, layer)][b2 >> 4] * 1000
+    rate = _MPEG_SAMPLE_RATES[version][(b2 >> 2) & 0x3]
+    mono = (b3 >> 6) == 3
+    channels = 1 if mono else 2
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 2 or mpeg1:
+        samples_per_frame = 1152
+    else:
+        samples_per_frame = 576
+
+    # VBR files carry the frame count in a Xing/Info or VBRI header inside
+    # the first frame.
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    xing = sync + 4 + side_info
+    frames = None
+    if head[xing:xing + 4] in (b"Xing", b"Info"):
+        (flags,) = struct.unpack_from(">I", head, xing + 4)
+        if flags & 0x1:
+            (frames,) = struct.unpack_from(">I", head, xing + 8)
+    elif head[sync + 36:sync + 40] == b"VBRI":
+        (frames,) = struct.unpack_from(">I", head, sync + 36 + 14)
+
+    if frames:
+        duration = frames * samples_per_frame / rate
+        audio_bytes = len(view) - start - sync
+        bitrate = int(audio_bytes * 8 / duration) if duration else bitrate
+    else:
+        # CBR: every frame has the same size, so bytes / bitrate is exact.
+        duration = (len(view) - start - sync) * 8 / bitrate
+    return AudioInfo("mp3", duration, rate, channels, bitrate=bitrate)
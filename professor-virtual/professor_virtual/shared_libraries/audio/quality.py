@@ -0,0 +1,78 @@
+"""Fast local checks that catch unusable recordings before a model call."""
+
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from .vad import frame_energy_db, voice_activity
+
+CLIPPING_LEVEL = 0.999
+
+
+@dataclass
+class QualityThresholds:
+    """Limits below (or above) which a recording is not worth transcribing."""
+
+    min_duration_secs: float = 0.3
+    min_rms_db: float = -45.0
+    max_clipping_ratio: float = 0.05
+    min_speech_fraction: float = 0.05
+
+
+@dataclass
+class AudioQualityReport:
+    duration_secs: float
+    rms_db: float
+    peak: float
+    clipping_ratio: float
+    speech_fraction: float
+    problems: list[str] = field(default_factory=list)
+
+    @property
+    def usable(self) -> bool:
+        return not self.problems
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        for key in ("duration_secs", "rms_db", "peak", "speech_fraction"):
+            data[key] = round(data[key], 3)
+        data["clipping_ratio"] = round(data["clipping_ratio"], 4)
+        return data
+
+
+def analyze_quality(samples: np.ndarray, sample_rate: int,
+                    thresholds: QualityThresholds = QualityThresholds()
+                    ) -> AudioQualityReport:
+    """Measures level, clipping and speech activity of mono float samples.
+
+    Problem codes: "empty", "too_short", "too_quiet", "clipped", "no_speech".
+    """
+    if len(samples) == 0 or not sample_rate:
+        return AudioQualityReport(0.0, -200.0, 0.0, 0.0, 0.0, ["empty"])
+
+    duration = len(samples) / sample_rate
+    magnitude = np.abs(samples)
+    peak = float(magnitude.max())
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    rms_db = 20 * np.log10(max(rms, 1e-10))
+    clipping_ratio = float(np.count_nonzero(magnitude >= CLIPPING_LEVEL)) / len(samples)
+    voiced = voice_activity(frame_energy_db(samples, sample_rate))
+    speech_fraction = float(voiced.mean()) if len(voiced) else 0.0
+
+    problems = []
+    if duration < thresholds.min_duration_secs:
+        problems.append("too_short")
+    if rms_db < thresholds.min_rms_db:
+        problems.append("too_quiet")
+    if clipping_ratio > thresholds.max_clipping_ratio:
+        problems.append("clipped")
+    if speech_fraction < thresholds.min_speech_fraction:
+        problems.append("no_speech")
+    return AudioQualityReport(
+        duration_secs=duration,
+        rms_db=float(rms_db),
+        peak=peak,
+        clipping_ratio=clipping_ratio,
+        speech_fraction=speech_fraction,
+        problems=problems,
+    )
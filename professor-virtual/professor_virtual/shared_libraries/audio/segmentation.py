@@ -0,0 +1,51 @@
+"""Splits long recordings into bounded segments at pauses in speech."""
+
+from typing import Optional
+
+import numpy as np
+
+from .vad import FRAME_MS, frame_energy_db, voice_activity
+
+
+def _longest_silence_midpoint(voiced: np.ndarray) -> Optional[int]:
+    silent = ~voiced
+    if not silent.any():
+        return None
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    longest = int(np.argmax(ends - starts))
+    return int((starts[longest] + ends[longest]) // 2)
+
+
+def split_at_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    max_segment_secs: float = 30.0,
+    min_segment_secs: float = 5.0,
+) -> list[tuple[int, int]]:
+    """Returns (start, end) sample ranges no longer than `max_segment_secs`.
+
+    Each cut lands in the middle of the longest pause found between
+    `min_segment_secs` and `max_segment_secs` into the current segment, so
+    words are not split; without any pause it falls back to a hard cut.
+    """
+    frame_len = max(1, sample_rate * FRAME_MS // 1000)
+    voiced = voice_activity(frame_energy_db(samples, sample_rate))
+    max_frames = max(1, int(max_segment_secs * 1000 / FRAME_MS))
+    min_frames = min(max_frames - 1, int(min_segment_secs * 1000 / FRAME_MS))
+
+    bounds = []
+    start = 0
+    while len(voiced) - start > max_frames:
+        window = voiced[start + min_frames:start + max_frames]
+        midpoint = _longest_silence_midpoint(window)
+        cut = start + max_frames if midpoint is None else start + min_frames + midpoint
+        bounds.append((start * frame_len, cut * frame_len))
+        start = cut
+    bounds.append((start * frame_len, len(samples)))
+    return bounds
+
+
+def has_speech(samples: np.ndarray, sample_rate: int) -> bool:
+    return bool(voice_activity(frame_energy_db(samples, sample_rate)).any())
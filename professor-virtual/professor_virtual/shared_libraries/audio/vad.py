@@ -0,0 +1,34 @@
+"""Energy-based voice activity detection over fixed-length frames."""
+
+import numpy as np
+
+FRAME_MS = 20
+
+
+def frame_energy_db(samples: np.ndarray, sample_rate: int,
+                    frame_ms: int = FRAME_MS) -> np.ndarray:
+    """RMS level of consecutive frames, in dBFS."""
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    frames = len(samples) // frame_len
+    if frames == 0:
+        return np.array([], dtype=np.float32)
+    framed = samples[: frames * frame_len].reshape(frames, frame_len)
+    rms = np.sqrt(np.mean(np.square(framed, dtype=np.float64), axis=1))
+    return (20 * np.log10(np.maximum(rms, 1e-10))).astype(np.float32)
+
+
+def voice_activity(energy_db: np.ndarray, min_threshold_db: float = -50.0,
+                   margin_db: float = 10.0) -> np.ndarray:
+    """Energy VAD: frames clearly louder than the background.
+
+    The noise floor is the 10th percentile of frame energy, so the threshold
+    adapts to background noise. It is capped at `margin_db` below the loudest
+    frame so recordings without any pause still count as speech, and never
+    drops below `min_threshold_db`.
+    """
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = float(np.percentile(energy_db, 10))
+    peak = float(energy_db.max())
+    threshold = max(min_threshold_db, min(noise_floor + margin_db, peak - margin_db))
+    return energy_db > threshold
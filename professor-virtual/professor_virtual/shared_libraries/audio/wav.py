@@ -0,0 +1,158 @@
+"""Minimal RIFF/WAVE parsing and PCM encoding on top of NumPy."""
+
+import struct
+from dataclasses import dataclass
+from typing import Iterable, Union
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavFormatError(ValueError):
+    """The bytes are not a WAV file this module can decode."""
+
+
+@dataclass
+class WavInfo:
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // (self.channels * self.bits_per_sample // 8)
+
+    @property
+    def duration_secs(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+
+def is_wav(data: bytes) -> bool:
+    return len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def parse_wav_header(data: bytes) -> WavInfo:
+    """Walks the RIFF chunks up to `data` and returns the stream layout."""
+    if not is_wav(data):
+        raise WavFormatError("not a RIFF/WAVE file")
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", data, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from(
+                "<HHIIHH", data, body
+            )
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                # The real format is the first two bytes of the SubFormat GUID.
+                (format_tag,) = struct.unpack_from("<H", data, body + 24)
+            fmt = (format_tag, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise WavFormatError("data chunk before fmt chunk")
+            available = len(data) - body
+            # Streamed WAVs often carry 0 or 0xFFFFFFFF as the data size.
+            size = chunk_size if 0 < chunk_size <= available else available
+            return WavInfo(*fmt, data_offset=body, data_size=size)
+        offset = body + chunk_size + (chunk_size & 1)
+    raise WavFormatError("missing fmt or data chunk")
+
+
+def decode_wav(data: bytes) -> tuple[np.ndarray, int]:
+    """Decodes PCM/float WAV into float32 samples in [-1, 1].
+
+    Returns:
+      (samples with shape (frames, channels), sample_rate)
+    """
+    info = parse_wav_header(data)
+    width = info.bits_per_sample // 8
+    size = info.data_size - info.data_size % (width * info.channels)
+    raw = np.frombuffer(data, dtype=np.uint8, count=size, offset=info.data_offset)
+
+    if info.format_tag == WAVE_FORMAT_IEEE_FLOAT and width == 4:
+        samples = raw.view("<f4").astype(np.float32)
+    elif info.format_tag != WAVE_FORMAT_PCM:
+        raise WavFormatError(f"unsupported WAV format tag {info.format_tag:#06x}")
+    elif width == 1:
+        samples = (raw.astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = raw.view("<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        triplets = raw.reshape(-1, 3).astype(np.int32)
+        ints = triplets[:, 0] | (triplets[:, 1] << 8) | (triplets[:, 2] << 16)
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        samples = ints.astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        samples = raw.view("<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise WavFormatError(f"unsupported sample width {info.bits_per_sample}")
+    return samples.reshape(-1, info.channels), info.sample_rate
+
+
+def float_to_pcm16(samples: np.ndarray) -> np.ndarray:
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).round().astype("<i2")
+
+
+# Size written in the RIFF and data chunks when the length is not known yet
+STREAMING_DATA_SIZE = 0xFFFFFFFF
+
+
+def wav_header(data_size: int, sample_rate: int, channels: int = 1,
+               bits_per_sample: int = 16) -> bytes:
+    """44-byte canonical PCM WAV header."""
+    block_align = channels * bits_per_sample // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        min(36 + data_size, STREAMING_DATA_SIZE),
+        b"WAVE",
+        b"fmt ",
+        16,
+        WAVE_FORMAT_PCM,
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        bits_per_sample,
+        b"data",
+        data_size,
+    )
+
+
+def streaming_wav_header(sample_rate: int, channels: int = 1,
+                         bits_per_sample: int = 16) -> bytes:
+    """WAV header for audio of unknown length, sent before the first sample.
+
+    Both chunk sizes are 0xFFFFFFFF, which browsers and ffmpeg read as "until
+    end of stream".
+    """
+    return wav_header(STREAMING_DATA_SIZE, sample_rate, channels, bits_per_sample)
+
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def build_wav(pcm: Union[Buffer, Iterable[Buffer]], sample_rate: int, channels: int = 1,
+              bits_per_sample: int = 16) -> bytes:
+    """Wraps PCM (one buffer or a sequence of chunks) in a canonical WAV file.
+
+    The header and every chunk are joined straight into the output, so the
+    PCM is copied exactly once: chunks are never concatenated on their own
+    first and no intermediate writer buffer is used.
+    """
+    chunks = [pcm] if isinstance(pcm, (bytes, bytearray, memoryview)) else list(pcm)
+    size = sum(memoryview(chunk).nbytes for chunk in chunks)
+    return b"".join([wav_header(size, sample_rate, channels, bits_per_sample), *chunks])
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encodes mono float samples as 16-bit PCM WAV."""
+    return build_wav(float_to_pcm16(samples.reshape(-1)).data, sample_rate)
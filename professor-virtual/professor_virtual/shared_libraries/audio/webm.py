@@ -0,0 +1,256 @@
+"""WebM/Opus parsing and lossless remuxing to Ogg/Opus.
+
+Browsers record audio as Opus inside WebM (MediaRecorder). Gemini accepts
+Opus in an Ogg container, so the Opus packets are copied into Ogg pages as
+they are, without decoding or re-encoding.
+"""
+
+import struct
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+_SEGMENT = 0x18538067
+_INFO = 0x1549A966
+_TIMECODE_SCALE = 0x2AD7B1
+_DURATION = 0x4489
+_TRACKS = 0x1654AE6B
+_TRACK_ENTRY = 0xAE
+_TRACK_NUMBER = 0xD7
+_CODEC_ID = 0x86
+_CODEC_PRIVATE = 0x63A2
+_AUDIO = 0xE1
+_SAMPLING_FREQUENCY = 0xB5
+_CHANNELS = 0x9F
+_CLUSTER = 0x1F43B675
+_CLUSTER_TIMECODE = 0xE7
+_SIMPLE_BLOCK = 0xA3
+_BLOCK_GROUP = 0xA0
+_BLOCK = 0xA1
+
+# Elements whose children are walked; everything else is skipped by size.
+_MASTERS = {_SEGMENT, _INFO, _TRACKS, _TRACK_ENTRY, _AUDIO, _CLUSTER, _BLOCK_GROUP}
+
+OPUS_RATE = 48000
+
+
+class WebmError(ValueError):
+    """The WebM payload cannot be parsed or holds no Opus track."""
+
+
+@dataclass
+class WebmAudio:
+    codec: Optional[str] = None
+    track_number: Optional[int] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    codec_private: bytes = b""
+    duration_secs: Optional[float] = None
+    packets: list[bytes] = field(default_factory=list)
+
+
+def is_webm(data: bytes) -> bool:
+    return data[:4] == EBML_MAGIC
+
+
+def _read_vint(data: bytes, pos: int, keep_marker: bool) -> tuple[int, int, bool]:
+    """Returns (value, new position, is the all-ones 'unknown size')."""
+    first = data[pos]
+    if first == 0:
+        raise WebmError(f"invalid EBML variable-length integer at {pos}")
+    length = 9 - first.bit_length()
+    value = first if keep_marker else first & (0xFF >> length)
+    for b in data[pos + 1:pos + length]:
+        value = (value << 8) | b
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, pos + length, unknown
+
+
+def _elements(data: bytes) -> Iterator[tuple[int, int, int]]:
+    """Flat walk yielding (id, body start, body end) in file order.
+
+    Master elements are entered rather than skipped, which also handles the
+    unknown-size Segment and Cluster elements live recorders emit.
+    """
+    pos, end = 0, len(data)
+    while pos < end:
+        element_id, pos, _ = _read_vint(data, pos, keep_marker=True)
+        size, pos, unknown = _read_vint(data, pos, keep_marker=False)
+        body_end = end if unknown else min(end, pos + size)
+        yield element_id, pos, body_end
+        if element_id not in _MASTERS:
+            pos = body_end
+
+
+def _uint(raw: bytes) -> int:
+    return int.from_bytes(raw, "big")
+
+
+def _float(raw: bytes) -> float:
+    return struct.unpack(">f" if len(raw) == 4 else ">d", raw)[0]
+
+
+def opus_packet_samples(packet: bytes) -> int:
+    """Samples (at 48kHz) in an Opus packet, from its TOC byte (RFC 6716)."""
+    if not packet:
+        return 0
+    toc = packet[0]
+    config = toc >> 3
+    if config < 12:
+        frame = (480, 960, 1920, 2880)[config % 4]
+    elif config < 16:
+        frame = (480, 960)[config % 2]
+    else:
+        frame = (120, 240, 480, 960)[config % 4]
+    count = toc & 0x3
+    if count == 0:
+        frames = 1
+    elif count < 3:
+        frames = 2
+    else:
+        frames = packet[1] & 0x3F if len(packet) > 1 else 0
+    return frames * frame
+
+
+def parse_webm(data: bytes, with_packets: bool = True) -> WebmAudio:
+    """Reads the first audio track; collects its packets when asked to.
+
+    Without packets, parsing stops once Tracks is read and Info has a
+    Duration; clusters are only walked to count samples when it is missing.
+    Only leaf elements are sliced, master bodies are entered by offset.
+    """
+    if not is_webm(data):
+        raise WebmError("missing EBML header")
+    audio = WebmAudio()
+    timecode_scale = 1_000_000
+    duration = None
+    tracks_end: Optional[int] = None
+    track: dict = {}
+    chosen: Optional[dict] = None
+    samples = 0
+    try:
+        for element_id, start, end in _elements(data):
+            if not with_packets and duration and tracks_end is not None and start >= tracks_end:
+                break
+            if element_id == _TRACKS:
+                tracks_end = end
+            elif element_id == _TRACK_ENTRY:
+                track = {}
+            if element_id in _MASTERS:
+                continue
+            if element_id in (_SIMPLE_BLOCK, _BLOCK):
+                number, pos, _ = _read_vint(data, start, keep_marker=False)
+                if chosen is None or number != chosen.get("number"):
+                    continue
+                if pos + 3 > end:
+                    raise IndexError(f"block at {start}")
+                if data[pos + 2] & 0x06:
+                    raise WebmError("laced blocks are not supported")
+                samples += opus_packet_samples(data[pos + 3:min(end, pos + 5)])
+                if with_packets:
+                    audio.packets.append(data[pos + 3:end])
+                continue
+            body = data[start:end]
+            if element_id == _TIMECODE_SCALE:
+                timecode_scale = _uint(body)
+            elif element_id == _DURATION:
+                duration = _float(body)
+            elif element_id == _TRACK_NUMBER:
+                track["number"] = _uint(body)
+            elif element_id == _CODEC_ID:
+                track["codec"] = body.decode("ascii", "replace")
+                if chosen is None and track["codec"].startswith("A_"):
+                    chosen = track
+            elif element_id == _CODEC_PRIVATE:
+                track["private"] = body
+            elif element_id == _SAMPLING_FREQUENCY:
+                track["rate"] = int(_float(body))
+            elif element_id == _CHANNELS:
+                track["channels"] = _uint(body)
+    except IndexError as e:
+        raise WebmError(f"truncated WebM: {e}") from e
+
+    if chosen is None:
+        raise WebmError("no audio track")
+    audio.codec = chosen["codec"]
+    audio.track_number = chosen.get("number")
+    audio.sample_rate = chosen.get("rate")
+    audio.channels = chosen.get("channels")
+    audio.codec_private = chosen.get("private", b"")
+    if duration:
+        audio.duration_secs = duration * timecode_scale / 1e9
+    elif audio.codec == "A_OPUS" and samples:
+        audio.duration_secs = samples / OPUS_RATE
+    return audio
+
+
+def _ogg_crc_table() -> list[int]:
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_OGG_CRC_TABLE = _ogg_crc_table()
+
+
+def ogg_crc(data: bytes) -> int:
+    """CRC-32 as used by Ogg (polynomial 0x04C11DB7, not reflected)."""
+    crc = 0
+    table = _OGG_CRC_TABLE
+    for b in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ table[(crc >> 24) ^ b]
+    return crc
+
+
+def _ogg_page(packets: list[bytes], granule: int, serial: int, sequence: int,
+              header_type: int) -> bytes:
+    lacing = bytearray()
+    for packet in packets:
+        lacing.extend(b"\xff" * (len(packet) // 255))
+        lacing.append(len(packet) % 255)
+    header = (
+        b"OggS" + bytes([0, header_type])
+        + struct.pack("<qIII", granule, serial, sequence, 0)
+        + bytes([len(lacing)]) + bytes(lacing)
+    )
+    page = bytearray(header + b"".join(packets))
+    struct.pack_into("<I", page, 22, ogg_crc(bytes(page)))
+    return bytes(page)
+
+
+def webm_to_ogg_opus(data: bytes, serial: int = 0x50524F46) -> bytes:
+    """Copies the Opus packets of a WebM file into an Ogg/Opus stream."""
+    audio = parse_webm(data)
+    if audio.codec != "A_OPUS":
+        raise WebmError(f"unsupported WebM audio codec {audio.codec}")
+    opus_head = audio.codec_private
+    if opus_head[:8] != b"OpusHead":
+        opus_head = b"OpusHead" + struct.pack(
+            "<BBHIhB", 1, audio.channels or 1, 312, audio.sample_rate or OPUS_RATE, 0, 0
+        )
+    (pre_skip,) = struct.unpack_from("<H", opus_head, 10)
+    vendor = b"professor-virtual"
+    opus_tags = b"OpusTags" + struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", 0)
+
+    pages = [
+        _ogg_page([opus_head], 0, serial, 0, 0x02),
+        _ogg_page([opus_tags], 0, serial, 1, 0x00),
+    ]
+    granule = pre_skip
+    batch: list[bytes] = []
+    segments = 0
+    for packet in audio.packets:
+        needed = len(packet) // 255 + 1
+        if batch and segments + needed > 255:
+            pages.append(_ogg_page(batch, granule, serial, len(pages), 0x00))
+            batch, segments = [], 0
+        batch.append(packet)
+        segments += needed
+        granule += opus_packet_samples(packet)
+    pages.append(_ogg_page(batch, granule, serial, len(pages), 0x04))
+    return b"".join(pages)
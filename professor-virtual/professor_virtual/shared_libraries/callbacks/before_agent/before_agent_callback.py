@@ -1,11 +1,22 @@
 import logging
 from google.adk.agents.invocation_context import InvocationContext
+from professor_virtual.config import Config
 from professor_virtual.entities.student import Student
+from professor_virtual.shared_libraries.deadline import DEADLINE_STATE_KEY, start_turn
 
 logger = logging.getLogger(__name__)
 
+_config = Config()
+
 
 def before_agent(callback_context: InvocationContext):
+    # The turn deadline starts with the invocation and reaches every tool
+    # and model call through the tool context.
+    invocation_id = getattr(callback_context, "invocation_id", None)
+    if invocation_id:
+        deadline = start_turn(invocation_id, _config.turn_timeout_secs)
+        callback_context.state[DEADLINE_STATE_KEY] = deadline.expires_at
+
     # In a production agent, this is set as part of the
     # session creation for the agent. 
     if "student_profile" not in callback_context.state:
@@ -1 +1 @@
-from .rate_limit_callback import rate_limit_callback
+from .rate_limit_callback import rate_limit_callback, session_scope
@@ -1,19 +1,68 @@
 import logging
-import time
+from typing import Optional
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.models import LlmRequest
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from professor_virtual.shared_libraries.deadline import (
+    DeadlineExceeded,
+    TurnCancelled,
+    get_turn_deadline,
+    run_within_turn,
+)
+from professor_virtual.shared_libraries.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
-RATE_LIMIT_SECS = 60
-RPM_QUOTA = 10
+TURN_OVER_MESSAGE = (
+    "Desculpe, não consegui terminar a tempo. Pode repetir a pergunta?"
+)
 
 
-def rate_limit_callback(
+def session_scope(callback_context: CallbackContext) -> tuple[Optional[str], Optional[str]]:
+    """(user_id, session_id) of the session the callback runs in.
+
+    ADK 1.8's CallbackContext has no public user or session, so this falls
+    back to its invocation context; releases that expose `user_id` and
+    `session` are used first. The rate limiter tests build a real
+    CallbackContext, so an ADK rename fails them instead of silently dropping
+    the user and session scopes.
+    """
+    user_id = getattr(callback_context, "user_id", None)
+    session = getattr(callback_context, "session", None)
+    if user_id is None or session is None:
+        invocation_context = getattr(callback_context, "_invocation_context", None)
+        user_id = user_id or getattr(invocation_context, "user_id", None)
+        session = session or getattr(invocation_context, "session", None)
+    if user_id is None or session is None:
+        logger.warning("rate_limit_callback: no user/session in context, global limit only")
+    return user_id, getattr(session, "id", None)
+
+
+def bound_request_to_turn(llm_request: LlmRequest, remaining_secs: float) -> None:
+    """Sets the model call's HTTP timeout to the turn's remaining budget."""
+    config = llm_request.config or types.GenerateContentConfig()
+    http_options = config.http_options or types.HttpOptions()
+    timeout_ms = max(1, int(remaining_secs * 1000))
+    if http_options.timeout is None or http_options.timeout > timeout_ms:
+        http_options = http_options.model_copy(update={"timeout": timeout_ms})
+    llm_request.config = config.model_copy(update={"http_options": http_options})
+
+
+async def rate_limit_callback(
     callback_context: CallbackContext, llm_request: LlmRequest
-) -> None:
+) -> Optional[LlmResponse]:
     """Callback function that implements a query rate limit.
 
+    Awaits a token from the process-wide limiter (session, user and global
+    scopes, see `Config.rate_limit_*_rpm`) instead of sleeping, so a throttled
+    session never blocks the event loop for the others. Nothing is written to
+    session state.
+
+    The wait and the agent's own model call are bounded by the turn deadline:
+    the call gets the remaining budget as its HTTP timeout. When the turn ran
+    out or was cancelled while waiting, the model is skipped and the student
+    gets `TURN_OVER_MESSAGE`.
+
     Args:
       callback_context: A CallbackContext obj representing the active callback
         context.
@@ -24,40 +73,23 @@ def rate_limit_callback(
             if part.text=="":
                 part.text=" "
 
-    
-    
-
-    now = time.time()
-    if "timer_start" not in callback_context.state:
+    user_id, session_id = session_scope(callback_context)
 
-        callback_context.state["timer_start"] = now
-        callback_context.state["request_count"] = 1
-        logger.debug(
-            "rate_limit_callback [timestamp: %i, "
-            "req_count: 1, elapsed_secs: 0]",
-            now,
+    limiter = get_rate_limiter()
+    try:
+        await run_within_turn(
+            callback_context,
+            lambda: limiter.acquire(user_id=user_id, session_id=session_id),
         )
-        return
-
-    request_count = callback_context.state["request_count"] + 1
-    elapsed_secs = now - callback_context.state["timer_start"]
-    logger.debug(
-        "rate_limit_callback [timestamp: %i, request_count: %i,"
-        " elapsed_secs: %i]",
-        now,
-        request_count,
-        elapsed_secs,
-    )
-
-    if request_count > RPM_QUOTA:
-        delay = RATE_LIMIT_SECS - elapsed_secs + 1
-        if delay > 0:
-            logger.debug("Sleeping for %i seconds", delay)
-            time.sleep(delay)
-        callback_context.state["timer_start"] = now
-        callback_context.state["request_count"] = 1
-    else:
-        callback_context.state["request_count"] = request_count
-
-    return
+    except (DeadlineExceeded, TurnCancelled) as e:
+        logger.warning("rate_limit_callback: turn over while waiting (%s)", e)
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=TURN_OVER_MESSAGE)])
+        )
+    logger.debug("rate_limit_callback %s", limiter.stats())
+
+    deadline = get_turn_deadline(callback_context)
+    if deadline is not None:
+        bound_request_to_turn(llm_request, deadline.remaining())
 
+    return None
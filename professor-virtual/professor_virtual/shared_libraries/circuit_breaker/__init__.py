@@ -0,0 +1,13 @@
+from .circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    get_circuit_breaker,
+    circuit_breaker_stats,
+)
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "get_circuit_breaker",
+    "circuit_breaker_stats",
+]
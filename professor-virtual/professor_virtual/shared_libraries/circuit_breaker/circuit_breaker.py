@@ -0,0 +1,153 @@
+"""Circuit breakers that fail fast while a model endpoint is unhealthy."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from google.genai import errors
+
+from professor_virtual.config import Config
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose breaker is open."""
+
+    def __init__(self, name: str, retry_after_secs: float):
+        super().__init__(
+            f"circuit for {name} is open, retry in {retry_after_secs:.0f}s"
+        )
+        self.name = name
+        self.retry_after_secs = retry_after_secs
+
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """Failures that say something about endpoint health.
+
+    Client errors (bad request, permission) are the caller's fault and do not
+    trip the breaker; quota exhaustion (429) does.
+    """
+    if isinstance(error, errors.ClientError):
+        return error.code == 429
+    return isinstance(error, (errors.APIError, asyncio.TimeoutError, OSError))
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures.
+
+    While open, calls raise `CircuitOpenError` immediately. After
+    `reset_timeout_secs` the breaker half-opens and lets one probe through:
+    success closes it, failure re-opens it for another timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_secs: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_secs = reset_timeout_secs
+        self._clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout_secs - self._clock())
+
+    def before_call(self) -> None:
+        """Raises `CircuitOpenError` unless a call may go through now."""
+        if self.state == OPEN and self._retry_after() <= 0:
+            self.state = HALF_OPEN
+            logger.info("circuit %s half-open, probing", self.name)
+        if self.state == OPEN or (self.state == HALF_OPEN and self._probe_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError(self.name, self._retry_after())
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("circuit %s closed", self.name)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    "circuit %s opened after %i failures",
+                    self.name,
+                    self.consecutive_failures,
+                )
+            self.state = OPEN
+            self.opened_at = self._clock()
+
+    def release_probe(self) -> None:
+        """Ends a call that neither succeeded nor failed at the endpoint."""
+        self._probe_in_flight = False
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.before_call()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._probe_in_flight = False
+            raise
+        except Exception as e:
+            if is_endpoint_failure(e):
+                self.record_failure()
+            else:
+                self._probe_in_flight = False
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after_secs": round(self._retry_after(), 1) if self.state == OPEN else 0,
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_config: Optional[Config] = None
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Returns the breaker guarding the model endpoint `name`."""
+    global _config
+    breaker = _breakers.get(name)
+    if breaker is None:
+        if _config is None:
+            _config = Config()
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=_config.circuit_breaker_failure_threshold,
+            reset_timeout_secs=_config.circuit_breaker_reset_timeout_secs,
+        )
+    return breaker
+
+
+def circuit_breaker_stats() -> list[dict]:
+    return [breaker.stats() for breaker in _breakers.values()]
@@ -0,0 +1,15 @@
+from .concurrency import (
+    AdaptiveConcurrencyLimiter,
+    ModelCallController,
+    is_overload_error,
+    get_model_controller,
+    model_controller_stats,
+)
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "ModelCallController",
+    "is_overload_error",
+    "get_model_controller",
+    "model_controller_stats",
+]
@@ -0,0 +1,218 @@
+"""Adaptive (AIMD) concurrency control and jittered retries for model calls."""
+
+import asyncio
+import contextlib
+import logging
+import random
+from typing import Any, Awaitable, Callable, Optional
+
+from google.genai import errors
+
+from professor_virtual.config import Config
+
+from ..hedging import HedgingPolicy
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUS_CODES = (429, 503)
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    return getattr(error, "code", None) if isinstance(error, errors.APIError) else None
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """True for quota (429) and unavailable (503) responses."""
+    return _status_code(error) in OVERLOAD_STATUS_CODES
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    return _status_code(error) in RETRYABLE_STATUS_CODES
+
+
+class AdaptiveConcurrencyLimiter:
+    """Caps in-flight calls with an additive-increase/multiplicative-decrease limit.
+
+    Every success grows the limit by roughly one slot per "window" of
+    successful calls (`+increase / limit`); an overload signal multiplies it
+    by `decrease_factor`, at most once per generation of in-flight calls: a
+    call that started before the last decrease was sent under the old limit,
+    so its 429 is already accounted for. The limit never leaves
+    [min_limit, max_limit].
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.waiting = 0
+        self.generation = 0
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Holds one in-flight slot for the duration of the block.
+
+        Yields the generation the call started in, for `on_overload`.
+        """
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+        try:
+            yield self.generation
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+
+    def on_overload(self, generation: Optional[int] = None) -> None:
+        """Shrinks the limit, unless the call predates the last decrease."""
+        if generation is not None and generation < self.generation:
+            return
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        self.generation += 1
+
+
+class ModelCallController:
+    """Concurrency limit plus jittered exponential backoff for one model.
+
+    Overload responses (429/503) shrink the concurrency limit; other 5xx are
+    retried without touching it. Delays use "full jitter": a uniform draw in
+    [0, min(max_delay, base_delay * 2**attempt)].
+    """
+
+    def __init__(
+        self,
+        model: str,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        max_attempts: int = 4,
+        base_delay_secs: float = 0.5,
+        max_delay_secs: float = 8.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.model = model
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.max_attempts = max_attempts
+        self.base_delay_secs = base_delay_secs
+        self.max_delay_secs = max_delay_secs
+        self._random = rng or random.Random()
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.overloads = 0
+
+    def backoff_delay(self, attempt: int) -> float:
+        ceiling = min(self.max_delay_secs, self.base_delay_secs * (2 ** attempt))
+        return self._random.uniform(0, ceiling)
+
+    async def _attempt(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        async with self.limiter.slot() as generation:
+            try:
+                return await fn()
+            except Exception as e:
+                if is_overload_error(e):
+                    self.overloads += 1
+                    self.limiter.on_overload(generation)
+                raise
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        hedging: Optional[HedgingPolicy] = None,
+    ) -> Any:
+        """Runs `fn` under the concurrency limit, retrying retryable errors.
+
+        With `hedging`, each attempt is hedged on its own (the hedge takes its
+        own slot), so backoff sleeps never count as a slow call.
+        """
+        self.calls += 1
+        for attempt in range(self.max_attempts):
+            try:
+                if hedging is None:
+                    result = await self._attempt(fn)
+                else:
+                    result = await hedging.run(lambda: self._attempt(fn))
+            except Exception as e:
+                if not is_retryable_error(e) or attempt == self.max_attempts - 1:
+                    self.failures += 1
+                    raise
+                delay = self.backoff_delay(attempt)
+                self.retries += 1
+                logger.warning(
+                    "%s failed with %s (attempt %i/%i), retrying in %.2fs "
+                    "[limit: %i]",
+                    self.model,
+                    _status_code(e),
+                    attempt + 1,
+                    self.max_attempts,
+                    delay,
+                    self.limiter.limit,
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.limiter.on_success()
+                self.successes += 1
+                return result
+
+    def stats(self) -> dict:
+        return {
+            "model": self.model,
+            "limit": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+            "waiting": self.limiter.waiting,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "overloads": self.overloads,
+        }
+
+
+_controllers: dict[str, ModelCallController] = {}
+
+
+def get_model_controller(model: str) -> ModelCallController:
+    """Returns the controller shared by every tool calling `model`."""
+    controller = _controllers.get(model)
+    if controller is None:
+        config = Config()
+        controller = _controllers[model] = ModelCallController(
+            model,
+            limiter=AdaptiveConcurrencyLimiter(
+                initial_limit=config.genai_concurrency_initial,
+                min_limit=config.genai_concurrency_min,
+                max_limit=config.genai_concurrency_max,
+            ),
+            max_attempts=config.genai_retry_max_attempts,
+            base_delay_secs=config.genai_retry_base_delay_secs,
+            max_delay_secs=config.genai_retry_max_delay_secs,
+        )
+    return controller
+
+
+def model_controller_stats() -> list[dict]:
+    """Current limit and retry counters of every model seen so far."""
+    return [controller.stats() for controller in _controllers.values()]
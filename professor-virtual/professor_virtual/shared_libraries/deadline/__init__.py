@@ -0,0 +1,27 @@
+from .deadline import (
+    DEADLINE_STATE_KEY,
+    DeadlineExceeded,
+    TurnCancelled,
+    TurnDeadline,
+    start_turn,
+    cancel_turn,
+    end_turn,
+    get_turn_deadline,
+    current_deadline,
+    run_within_turn,
+    stream_within_turn,
+)
+
+__all__ = [
+    "DEADLINE_STATE_KEY",
+    "DeadlineExceeded",
+    "TurnCancelled",
+    "TurnDeadline",
+    "start_turn",
+    "cancel_turn",
+    "end_turn",
+    "get_turn_deadline",
+    "current_deadline",
+    "run_within_turn",
+    "stream_within_turn",
+]
@@ -0,0 +1,210 @@
+"""Per-turn deadlines and cancellation shared by tools and model calls."""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Absolute (epoch) deadline of the current turn, visible to tools via state.
+# The "temp:" prefix keeps it out of persisted session state.
+DEADLINE_STATE_KEY = "temp:prazo_turno"
+
+
+class DeadlineExceeded(Exception):
+    """The turn ran out of time budget."""
+
+
+class TurnCancelled(Exception):
+    """The turn was cancelled, e.g. because the client disconnected."""
+
+
+class TurnDeadline:
+    """Time budget and cancellation signal of one Runner invocation."""
+
+    def __init__(self, invocation_id: str, timeout_secs: float):
+        self.invocation_id = invocation_id
+        self.expires_at = time.time() + timeout_secs
+        self.cancel_reason: Optional[str] = None
+        self._cancelled = asyncio.Event()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str = "client_disconnected") -> None:
+        self.cancel_reason = reason
+        self._cancelled.set()
+
+    async def wait_cancelled(self) -> None:
+        await self._cancelled.wait()
+
+
+_turns: dict[str, TurnDeadline] = {}
+_current_deadline: contextvars.ContextVar[Optional[TurnDeadline]] = (
+    contextvars.ContextVar("current_turn_deadline", default=None)
+)
+
+
+def start_turn(invocation_id: str, timeout_secs: float) -> TurnDeadline:
+    """Registers the deadline of a new invocation."""
+    for stale_id in [k for k, d in _turns.items() if d.expired or d.cancelled]:
+        del _turns[stale_id]
+    deadline = _turns[invocation_id] = TurnDeadline(invocation_id, timeout_secs)
+    return deadline
+
+
+def cancel_turn(invocation_id: str, reason: str = "client_disconnected") -> bool:
+    """Cancels in-flight tool work of an invocation. Returns False if unknown."""
+    deadline = _turns.get(invocation_id)
+    if deadline is None:
+        return False
+    logger.info("Cancelling turn %s: %s", invocation_id, reason)
+    deadline.cancel(reason)
+    return True
+
+
+def end_turn(invocation_id: str) -> None:
+    _turns.pop(invocation_id, None)
+
+
+def get_turn_deadline(context: Any) -> Optional[TurnDeadline]:
+    """Finds the deadline of the invocation a tool/callback context belongs to.
+
+    Falls back to the absolute deadline stored in the context state when the
+    invocation was not registered in this process.
+    """
+    invocation_id = getattr(context, "invocation_id", None)
+    if invocation_id in _turns:
+        return _turns[invocation_id]
+    state = getattr(context, "state", None)
+    expires_at = state.get(DEADLINE_STATE_KEY) if state is not None else None
+    if expires_at is None:
+        return None
+    deadline = TurnDeadline(invocation_id or "", 0)
+    deadline.expires_at = expires_at
+    return deadline
+
+
+def current_deadline() -> Optional[TurnDeadline]:
+    """Deadline of the turn the running task works for, if any."""
+    return _current_deadline.get()
+
+
+async def run_within_turn(context: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """Runs `fn` bounded by the turn's remaining budget and cancellation.
+
+    Raises:
+      DeadlineExceeded: the turn budget ran out before `fn` finished.
+      TurnCancelled: `cancel_turn()` was called for the invocation.
+    """
+    deadline = get_turn_deadline(context)
+    if deadline is None:
+        return await fn()
+    if deadline.cancelled:
+        raise TurnCancelled(deadline.cancel_reason)
+    if deadline.expired:
+        raise DeadlineExceeded("turn deadline already expired")
+
+    token = _current_deadline.set(deadline)
+    try:
+        work = asyncio.ensure_future(fn())
+    finally:
+        _current_deadline.reset(token)
+    cancelled = asyncio.ensure_future(deadline.wait_cancelled())
+    try:
+        done, _ = await asyncio.wait(
+            {work, cancelled},
+            timeout=deadline.remaining(),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        if work in done:
+            return work.result()
+        if cancelled in done:
+            raise TurnCancelled(deadline.cancel_reason)
+        raise DeadlineExceeded(
+            f"turn deadline exceeded for invocation {deadline.invocation_id}"
+        )
+    finally:
+        for task in (work, cancelled):
+            if not task.done():
+                task.cancel()
+
+
+_END = object()
+
+
+async def stream_within_turn(
+    context: Any, fn: Callable[[], AsyncIterator[Any]]
+) -> AsyncIterator[Any]:
+    """Streaming counterpart of `run_within_turn`.
+
+    Each item must arrive within the turn's remaining budget; the stream is
+    closed when the turn expires or is cancelled.
+
+    Raises:
+      DeadlineExceeded: the turn budget ran out mid-stream.
+      TurnCancelled: `cancel_turn()` was called for the invocation.
+    """
+    deadline = get_turn_deadline(context)
+    if deadline is None:
+        async for item in fn():
+            yield item
+        return
+
+    token = _current_deadline.set(deadline)
+    try:
+        iterator = fn().__aiter__()
+    finally:
+        _current_deadline.reset(token)
+
+    async def next_item():
+        try:
+            return await iterator.__anext__()
+        except StopAsyncIteration:
+            return _END
+
+    cancelled = asyncio.ensure_future(deadline.wait_cancelled())
+    work = None
+    try:
+        while True:
+            if deadline.cancelled:
+                raise TurnCancelled(deadline.cancel_reason)
+            token = _current_deadline.set(deadline)
+            try:
+                work = asyncio.ensure_future(next_item())
+            finally:
+                _current_deadline.reset(token)
+            done, _ = await asyncio.wait(
+                {work, cancelled},
+                timeout=deadline.remaining(),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if work not in done:
+                if cancelled in done:
+                    raise TurnCancelled(deadline.cancel_reason)
+                raise DeadlineExceeded(
+                    f"turn deadline exceeded for invocation {deadline.invocation_id}"
+                )
+            item = work.result()
+            if item is _END:
+                return
+            yield item
+    finally:
+        cancelled.cancel()
+        if work is not None and not work.done():
+            # The generator must unwind before it can be closed
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
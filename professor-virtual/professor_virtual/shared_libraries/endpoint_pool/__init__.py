@@ -0,0 +1,3 @@
+from .endpoint_pool import EndpointPool, parse_locations
+
+__all__ = ["EndpointPool", "parse_locations"]
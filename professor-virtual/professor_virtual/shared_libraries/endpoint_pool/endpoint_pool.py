@@ -0,0 +1,208 @@
+"""Load balancing and failover of Gemini calls across several locations."""
+
+import logging
+import random
+import time
+from typing import Callable, Optional
+
+from google.genai import errors
+
+from ..genai_backend import GenaiBackend
+
+logger = logging.getLogger(__name__)
+
+FAILOVER_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def parse_locations(value: str) -> dict[str, float]:
+    """Parses "us-central1:3,us-east4:1" into {location: weight}.
+
+    A location without an explicit weight gets weight 1.
+    """
+    locations: dict[str, float] = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        location, _, weight = item.partition(":")
+        locations[location.strip()] = float(weight) if weight else 1.0
+    return locations
+
+
+def _is_failover_error(error: BaseException) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in FAILOVER_STATUS_CODES
+    return isinstance(error, (OSError, TimeoutError))
+
+
+class _Endpoint:
+    def __init__(self, location: str, backend: GenaiBackend, weight: float):
+        self.location = location
+        self.backend = backend
+        self.weight = weight
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.cooldown_until = 0.0
+
+    def record(self, latency_secs: Optional[float], failed: bool, alpha: float):
+        self.requests += 1
+        self.errors += int(failed)
+        self.error_ewma = (1 - alpha) * self.error_ewma + alpha * float(failed)
+        if latency_secs is not None:
+            self.latency_ewma = (
+                latency_secs
+                if self.latency_ewma is None
+                else (1 - alpha) * self.latency_ewma + alpha * latency_secs
+            )
+
+    def score(self, default_latency: float) -> float:
+        latency = self.latency_ewma or default_latency
+        return self.weight / (latency * (1 + 10 * self.error_ewma))
+
+
+class EndpointPool(GenaiBackend):
+    """Backend that spreads calls over per-location backends.
+
+    Endpoints are picked at random in proportion to
+    `weight / (latency_ewma * (1 + 10 * error_ewma))`, so faster and healthier
+    regions get more traffic. A regional 429 or 5xx puts the endpoint in
+    cooldown for `cooldown_secs` and the call fails over to the next best
+    location; the last error is raised only when every location failed.
+    Streams fail over only until their first chunk; uploads fail over like
+    calls. Latency is the full call, or the time to the first chunk.
+    """
+
+    def __init__(
+        self,
+        backends: dict[str, GenaiBackend],
+        weights: Optional[dict[str, float]] = None,
+        cooldown_secs: float = 10.0,
+        ewma_alpha: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ):
+        if not backends:
+            raise ValueError("EndpointPool needs at least one location")
+        weights = weights or {}
+        self.endpoints = [
+            _Endpoint(location, backend, weights.get(location, 1.0))
+            for location, backend in backends.items()
+        ]
+        self.cooldown_secs = cooldown_secs
+        self.ewma_alpha = ewma_alpha
+        self._clock = clock
+        self._random = rng or random.Random()
+        self.failovers = 0
+
+    @property
+    def supports_files_api(self) -> bool:
+        return all(e.backend.supports_files_api for e in self.endpoints)
+
+    def _candidates(self, tried: set[str]) -> list[_Endpoint]:
+        remaining = [e for e in self.endpoints if e.location not in tried]
+        now = self._clock()
+        healthy = [e for e in remaining if e.cooldown_until <= now]
+        # When every remaining endpoint is cooling down, try them anyway.
+        return healthy or remaining
+
+    def choose(self, tried: Optional[set[str]] = None) -> Optional[_Endpoint]:
+        candidates = self._candidates(tried or set())
+        if not candidates:
+            return None
+        known = [e.latency_ewma for e in candidates if e.latency_ewma]
+        default_latency = sum(known) / len(known) if known else 1.0
+        scores = [e.score(default_latency) for e in candidates]
+        return self._random.choices(candidates, weights=scores)[0]
+
+    def _failed(self, endpoint: _Endpoint, error: BaseException, what: str) -> bool:
+        """Records a failed call; True if it should fail over to another location.
+
+        Only regional failures (429/5xx, transport errors) count against the
+        endpoint: a 400 says nothing about its health.
+        """
+        if not _is_failover_error(error):
+            endpoint.record(None, False, self.ewma_alpha)
+            return False
+        endpoint.record(None, True, self.ewma_alpha)
+        endpoint.cooldown_until = self._clock() + self.cooldown_secs
+        self.failovers += 1
+        logger.warning("%s failed in %s (%s), failing over", what, endpoint.location, error)
+        return True
+
+    async def _with_failover(self, what: str, call):
+        tried: set[str] = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            endpoint = self.choose(tried)
+            if endpoint is None:
+                raise last_error
+            tried.add(endpoint.location)
+            start = self._clock()
+            try:
+                result = await call(endpoint.backend)
+            except Exception as e:
+                if not self._failed(endpoint, e, what):
+                    raise
+                last_error = e
+                continue
+            endpoint.record(self._clock() - start, False, self.ewma_alpha)
+            return result
+
+    async def generate_content(self, *, model, contents, config=None):
+        return await self._with_failover(
+            model,
+            lambda backend: backend.generate_content(
+                model=model, contents=contents, config=config
+            ),
+        )
+
+    async def generate_content_stream(self, *, model, contents, config=None):
+        # Fails over until the first chunk arrives; after that the caller may
+        # already have used the chunks, so errors propagate.
+        async def open_stream(backend):
+            stream = backend.generate_content_stream(
+                model=model, contents=contents, config=config
+            )
+            try:
+                return stream, await stream.__anext__()
+            except StopAsyncIteration:
+                return stream, None
+
+        stream, first = await self._with_failover(model, open_stream)
+        try:
+            if first is None:
+                return
+            yield first
+            async for chunk in stream:
+                yield chunk
+        finally:
+            # Consumers that stop early must not leave the HTTP stream open
+            await stream.aclose()
+
+    async def upload_file(self, *, data, mime_type, display_name=None):
+        # Uploaded files are project-wide, so any healthy endpoint will do.
+        return await self._with_failover(
+            "upload",
+            lambda backend: backend.upload_file(
+                data=data, mime_type=mime_type, display_name=display_name
+            ),
+        )
+
+    def stats(self) -> list[dict]:
+        now = self._clock()
+        return [
+            {
+                "location": e.location,
+                "weight": e.weight,
+                "requests": e.requests,
+                "errors": e.errors,
+                "error_rate_ewma": round(e.error_ewma, 3),
+                "latency_ewma_secs": (
+                    round(e.latency_ewma, 3) if e.latency_ewma is not None else None
+                ),
+                "cooling_down": e.cooldown_until > now,
+            }
+            for e in self.endpoints
+        ]
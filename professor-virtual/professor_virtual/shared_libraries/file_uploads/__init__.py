@@ -0,0 +1,23 @@
+from .file_uploads import (
+    MediaTooLargeError,
+    UploadedFile,
+    FileUploadIndex,
+    content_hash,
+    get_file_upload_index,
+    reset_file_upload_index,
+    media_part,
+    call_with_media,
+    is_stale_file_error,
+)
+
+__all__ = [
+    "MediaTooLargeError",
+    "UploadedFile",
+    "FileUploadIndex",
+    "content_hash",
+    "get_file_upload_index",
+    "reset_file_upload_index",
+    "media_part",
+    "call_with_media",
+    "is_stale_file_error",
+]
@@ -0,0 +1,245 @@
+"""Uploads large or reused media once through the Files API.
+
+Uploaded files are indexed by content hash together with their expiry, so
+later requests for the same bytes reference the existing URI with
+`Part.from_uri` instead of resending megabytes inline. Backends without a
+Files API (Vertex AI) keep sending media inline, up to the call's limit.
+"""
+
+import datetime
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from google.genai import errors, types
+
+from professor_virtual.config import Config
+
+from ..deadline import run_within_turn
+from ..genai_backend import files_api_available, upload_file
+from ..lru_cache import LRUCache
+from ..single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Uploaded files live for 48h; without an expiry in the response assume that.
+DEFAULT_FILE_TTL_SECS = 48 * 60 * 60
+
+# What the model answers for a referenced file that expired or was deleted
+STALE_FILE_STATUS_CODES = (403, 404)
+
+T = TypeVar("T")
+
+
+class MediaTooLargeError(ValueError):
+    """Media above the inline limit, and no Files API to upload it to."""
+
+    def __init__(self, size_bytes: int, limit_bytes: int):
+        super().__init__(
+            f"{size_bytes} bytes exceed the {limit_bytes}-byte inline limit "
+            "and the backend has no Files API"
+        )
+        self.size_bytes = size_bytes
+        self.limit_bytes = limit_bytes
+
+
+@dataclass
+class UploadedFile:
+    uri: str
+    mime_type: str
+    size_bytes: int
+    expires_at: float  # wall clock (time.time())
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class FileUploadIndex:
+    """Content-hash -> uploaded file URI, with an upload policy.
+
+    Media goes through the Files API when it is larger than the inline limit
+    of the call, or when media of at least `min_reuse_bytes` was already seen
+    `reuse_threshold` times. URIs are reused until `expiry_margin_secs`
+    before they expire.
+    """
+
+    def __init__(
+        self,
+        reuse_threshold: int = 2,
+        min_reuse_bytes: int = 1024 * 1024,
+        expiry_margin_secs: float = 60 * 60,
+        max_entries: int = 4096,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.reuse_threshold = reuse_threshold
+        self.min_reuse_bytes = min_reuse_bytes
+        self.expiry_margin_secs = expiry_margin_secs
+        self._clock = clock
+        # Values are tiny; the entry cap is what bounds both maps.
+        self._files = LRUCache(max_bytes=64 * 1024 * 1024, max_entries=max_entries)
+        self._seen = LRUCache(max_bytes=64 * 1024 * 1024, max_entries=max_entries)
+        self._seen_lock = threading.Lock()
+        self._uploads_in_flight = SingleFlight("files_api")
+        self.uploads = 0
+        self.reuses = 0
+        self.upload_failures = 0
+
+    def lookup(self, digest: str) -> Optional[UploadedFile]:
+        """The indexed file for `digest`, unless it is about to expire."""
+        uploaded = self._files.get(digest)
+        if uploaded is None:
+            return None
+        if uploaded.expires_at - self.expiry_margin_secs <= self._clock():
+            self._files.pop(digest)
+            return None
+        return uploaded
+
+    def invalidate(self, digest: str) -> None:
+        self._files.pop(digest)
+
+    def should_upload(
+        self, digest: str, size_bytes: int, inline_limit_bytes: int, count: bool = True
+    ) -> bool:
+        """Counts this request and decides between inline bytes and an upload.
+
+        `count=False` decides without counting (a retry of the same request).
+        """
+        with self._seen_lock:
+            seen = (self._seen.get(digest) or 0) + int(count)
+            if count:
+                self._seen.put(digest, seen)
+        if size_bytes > inline_limit_bytes:
+            return True
+        return size_bytes >= self.min_reuse_bytes and seen >= self.reuse_threshold
+
+    async def get_or_upload(self, digest: str, data: bytes, mime_type: str) -> UploadedFile:
+        """Returns the indexed file or uploads it (concurrent uploads coalesce)."""
+        uploaded = self.lookup(digest)
+        if uploaded is not None:
+            self.reuses += 1
+            return uploaded
+        return await self._uploads_in_flight.do(
+            digest, lambda: self._upload(digest, data, mime_type)
+        )
+
+    async def _upload(self, digest: str, data: bytes, mime_type: str) -> UploadedFile:
+        try:
+            file = await upload_file(data=data, mime_type=mime_type, display_name=digest[:40])
+        except Exception:
+            self.upload_failures += 1
+            raise
+        expires_at = self._clock() + DEFAULT_FILE_TTL_SECS
+        if isinstance(file.expiration_time, datetime.datetime):
+            expires_at = file.expiration_time.timestamp()
+        uploaded = UploadedFile(
+            uri=file.uri,
+            mime_type=file.mime_type or mime_type,
+            size_bytes=len(data),
+            expires_at=expires_at,
+        )
+        self._files.put(digest, uploaded)
+        self.uploads += 1
+        logger.info("Uploaded %d bytes of %s as %s", len(data), mime_type, file.uri)
+        return uploaded
+
+    def stats(self) -> dict:
+        return {
+            "indexed_files": len(self._files),
+            "uploads": self.uploads,
+            "reuses": self.reuses,
+            "upload_failures": self.upload_failures,
+        }
+
+
+_index: Optional[FileUploadIndex] = None
+
+
+def get_file_upload_index() -> FileUploadIndex:
+    global _index
+    if _index is None:
+        config = Config()
+        _index = FileUploadIndex(
+            reuse_threshold=config.arquivos_reuso_para_upload,
+            min_reuse_bytes=config.arquivos_reuso_min_bytes,
+        )
+    return _index
+
+
+def reset_file_upload_index() -> None:
+    """Forgets every indexed URI (e.g. after switching backends)."""
+    global _index
+    _index = None
+
+
+def is_stale_file_error(error: BaseException) -> bool:
+    """The model could not read a referenced upload (expired or deleted)."""
+    return isinstance(error, errors.ClientError) and error.code in STALE_FILE_STATUS_CODES
+
+
+async def media_part(
+    data: bytes,
+    mime_type: str,
+    inline_limit_bytes: int,
+    digest: Optional[str] = None,
+    count: bool = True,
+) -> types.Part:
+    """Part for `data`: a Files API URI when large or reused, inline otherwise.
+
+    Without a Files API, media above `inline_limit_bytes` raises
+    `MediaTooLargeError` and smaller media goes inline. If an upload fails,
+    media that fits inline falls back to inline bytes; larger media re-raises.
+    `count=False` leaves the reuse counter alone (see `should_upload`).
+    """
+    if not files_api_available():
+        if len(data) > inline_limit_bytes:
+            raise MediaTooLargeError(len(data), inline_limit_bytes)
+        return types.Part.from_bytes(data=data, mime_type=mime_type)
+    index = get_file_upload_index()
+    digest = digest or content_hash(data)
+    if not index.should_upload(digest, len(data), inline_limit_bytes, count):
+        return types.Part.from_bytes(data=data, mime_type=mime_type)
+    try:
+        uploaded = await index.get_or_upload(digest, data, mime_type)
+    except Exception as e:
+        if len(data) > inline_limit_bytes:
+            raise
+        logger.warning("Files API upload failed, sending inline: %s", e)
+        return types.Part.from_bytes(data=data, mime_type=mime_type)
+    return types.Part.from_uri(file_uri=uploaded.uri, mime_type=uploaded.mime_type)
+
+
+async def call_with_media(
+    data: bytes,
+    mime_type: str,
+    inline_limit_bytes: int,
+    call: Callable[[types.Part], Awaitable[T]],
+    digest: Optional[str] = None,
+    context: Any = None,
+) -> tuple[types.Part, T]:
+    """Runs `call` with the part for `data` and returns (part, result).
+
+    Uploads run within the turn of `context` (a tool context), so a large
+    upload stops at the turn deadline or on cancellation like the call does.
+    If the model can no longer read a referenced upload (403/404: expired
+    early or deleted), the index entry is dropped and the media is uploaded
+    again and the call retried, once.
+    """
+    digest = digest or content_hash(data)
+    part = await run_within_turn(
+        context, lambda: media_part(data, mime_type, inline_limit_bytes, digest)
+    )
+    try:
+        return part, await call(part)
+    except Exception as e:
+        if part.file_data is None or not is_stale_file_error(e):
+            raise
+        logger.warning("Uploaded file %s is gone (%s), uploading again", part.file_data.file_uri, e)
+        get_file_upload_index().invalidate(digest)
+    part = await run_within_turn(
+        context, lambda: media_part(data, mime_type, inline_limit_bytes, digest, count=False)
+    )
+    return part, await call(part)
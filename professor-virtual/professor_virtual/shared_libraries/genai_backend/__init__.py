@@ -0,0 +1,27 @@
+from .genai_backend import (
+    FilesApiUnavailable,
+    GenaiBackend,
+    GeminiBackend,
+    get_genai_backend,
+    set_genai_backend,
+    reset_genai_backend,
+    generate_content,
+    generate_content_stream,
+    files_api_available,
+    upload_file,
+)
+from .fake_backend import FakeGenaiBackend
+
+__all__ = [
+    "FilesApiUnavailable",
+    "GenaiBackend",
+    "GeminiBackend",
+    "FakeGenaiBackend",
+    "get_genai_backend",
+    "set_genai_backend",
+    "reset_genai_backend",
+    "generate_content",
+    "generate_content_stream",
+    "files_api_available",
+    "upload_file",
+]
@@ -0,0 +1,250 @@
+"""Deterministic local stand-in for Gemini, for offline tests and benchmarks."""
+
+import asyncio
+import collections
+import datetime
+import hashlib
+import json
+import math
+import random
+import struct
+from typing import Any, Callable, Iterable, Optional, Union
+
+from google.genai import errors, types
+
+from .genai_backend import GenaiBackend
+
+FAKE_TTS_SAMPLE_RATE = 24000
+FAKE_TTS_MIME_TYPE = f"audio/L16;codec=pcm;rate={FAKE_TTS_SAMPLE_RATE}"
+
+DEFAULT_TRANSCRICAO = {
+    "transcricao": "Professor, quanto é sete vezes oito?",
+    "idioma_detectado": "pt-BR",
+    "confianca": "alta",
+    "observacoes": "",
+}
+
+DEFAULT_ANALISE_IMAGEM = {
+    "tipo_conteudo": "exercicio_matematica",
+    "elementos_detectados": ["texto", "numeros", "operacao de multiplicacao"],
+    "contexto_educacional": "Exercício de tabuada com multiplicações simples.",
+    "conceitos_abordados": ["multiplicacao", "tabuada"],
+    "nivel_ensino_sugerido": "fundamental_1",
+    "qualidade_adequada": True,
+    "sugestao_acao": None,
+    "perguntas_reflexao": ["O que significa multiplicar?"],
+    "aplicacoes_pedagogicas": ["Revisão da tabuada do 7"],
+    "interdisciplinaridade": [],
+    "acessibilidade": {
+        "descricao_alternativa": "Folha com a conta 7 x 8 escrita à mão.",
+        "elementos_textuais": ["7 x 8 = ?"],
+        "cores_predominantes": ["branco", "azul"],
+    },
+}
+
+
+def _tone_period(sample_rate: int, frequency: int = 400) -> bytes:
+    samples = sample_rate // frequency
+    return b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * i / samples)))
+        for i in range(samples)
+    )
+
+
+class FakeGenaiBackend(GenaiBackend):
+    """Returns canned transcription JSON, image-analysis JSON and PCM audio.
+
+    The response kind is inferred from the request: `response_modalities`
+    containing AUDIO yields PCM, an audio part yields a transcription and an
+    image part yields an image analysis. Latency and failures are injectable:
+
+    * `latency_secs`: seconds (or a zero-arg callable returning seconds) to
+      wait before answering. A call cancelled while waiting is marked
+      `"cancelled": True` in `calls`.
+    * `errors`: exceptions raised, in order, by the next calls.
+    * `error_rate`: probability of raising a 503 `ServerError`, drawn from a
+      `random.Random(seed)` so runs are reproducible.
+
+    `generate_content_stream` answers after `latency_secs` and then splits TTS
+    audio into `stream_chunk_bytes` pieces, `stream_chunk_interval_secs` apart.
+
+    `upload_file` keeps uploads in `files` (keyed by the returned URI) and
+    records them in `uploads`, after `upload_latency_secs`; requests
+    referencing an unknown URI fail with a 404 like the real Files API. `supports_files_api=False` behaves like
+    Vertex AI, which has no Files API.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_secs: Union[float, Callable[[], float]] = 0.0,
+        error_rate: float = 0.0,
+        errors: Optional[Iterable[Exception]] = None,
+        seed: int = 0,
+        transcricao: Optional[dict] = None,
+        analise_imagem: Optional[dict] = None,
+        audio_secs_por_caractere: float = 0.06,
+        stream_chunk_bytes: int = 9600,
+        stream_chunk_interval_secs: float = 0.0,
+        supports_files_api: bool = True,
+        upload_latency_secs: float = 0.0,
+    ):
+        self.latency_secs = latency_secs
+        self.error_rate = error_rate
+        self.transcricao = transcricao or dict(DEFAULT_TRANSCRICAO)
+        self.analise_imagem = analise_imagem or dict(DEFAULT_ANALISE_IMAGEM)
+        self.audio_secs_por_caractere = audio_secs_por_caractere
+        self.stream_chunk_bytes = stream_chunk_bytes
+        self.stream_chunk_interval_secs = stream_chunk_interval_secs
+        self.supports_files_api = supports_files_api
+        self.upload_latency_secs = upload_latency_secs
+        self.calls: list[dict[str, Any]] = []
+        # Files API: uri -> (bytes, mime_type)
+        self.files: dict[str, tuple[bytes, str]] = {}
+        self.uploads: list[dict[str, Any]] = []
+        self._errors = collections.deque(errors or [])
+        self._random = random.Random(seed)
+        self._tone = _tone_period(FAKE_TTS_SAMPLE_RATE)
+
+    def queue_error(self, error: Exception) -> None:
+        """Makes the next call raise `error`."""
+        self._errors.append(error)
+
+    async def generate_content(self, *, model, contents, config=None):
+        kind = self._request_kind(contents, config)
+        call = {"model": model, "kind": kind, "contents": contents}
+        self.calls.append(call)
+
+        latency = self.latency_secs() if callable(self.latency_secs) else self.latency_secs
+        if latency:
+            try:
+                await asyncio.sleep(latency)
+            except asyncio.CancelledError:
+                call["cancelled"] = True
+                raise
+
+        if self._errors:
+            raise self._errors.popleft()
+        for part in self._iter_parts(contents):
+            file_data = getattr(part, "file_data", None)
+            if file_data is not None and file_data.file_uri not in self.files:
+                raise errors.ClientError(
+                    404,
+                    {"error": {"code": 404, "message": f"{file_data.file_uri} not found",
+                               "status": "NOT_FOUND"}},
+                )
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise errors.ServerError(
+                503,
+                {"error": {"code": 503, "message": "fake backend unavailable",
+                           "status": "UNAVAILABLE"}},
+            )
+
+        if kind == "tts":
+            return self._audio_response(contents)
+        payload = self.transcricao if kind == "transcricao" else self.analise_imagem
+        return self._json_response(payload, config)
+
+    async def generate_content_stream(self, *, model, contents, config=None):
+        response = await self.generate_content(model=model, contents=contents, config=config)
+        self.calls[-1]["stream"] = True
+        parts = response.candidates[0].content.parts
+        blob = parts[0].inline_data
+        if blob is None:
+            yield response
+            return
+        for start in range(0, len(blob.data), self.stream_chunk_bytes):
+            if start and self.stream_chunk_interval_secs:
+                await asyncio.sleep(self.stream_chunk_interval_secs)
+            part = types.Part(
+                inline_data=types.Blob(
+                    data=blob.data[start:start + self.stream_chunk_bytes],
+                    mime_type=blob.mime_type,
+                )
+            )
+            yield types.GenerateContentResponse(
+                candidates=[types.Candidate(content=types.Content(role="model", parts=[part]))]
+            )
+
+    async def upload_file(self, *, data, mime_type, display_name=None):
+        upload = {"size_bytes": len(data), "mime_type": mime_type, "display_name": display_name}
+        self.uploads.append(upload)
+        if self.upload_latency_secs:
+            try:
+                await asyncio.sleep(self.upload_latency_secs)
+            except asyncio.CancelledError:
+                upload["cancelled"] = True
+                raise
+        if self._errors:
+            raise self._errors.popleft()
+        name = f"files/{hashlib.sha256(data).hexdigest()[:16]}-{len(self.uploads)}"
+        uri = f"https://generativelanguage.googleapis.com/v1beta/{name}"
+        self.files[uri] = (data, mime_type)
+        return types.File(
+            name=name,
+            uri=uri,
+            mime_type=mime_type,
+            size_bytes=len(data),
+            display_name=display_name,
+            state=types.FileState.ACTIVE,
+            expiration_time=datetime.datetime.now(datetime.timezone.utc)
+            + datetime.timedelta(hours=48),
+        )
+
+    @staticmethod
+    def _iter_parts(contents) -> Iterable[Any]:
+        if not isinstance(contents, (list, tuple)):
+            contents = [contents]
+        for item in contents:
+            if isinstance(item, types.Content):
+                yield from item.parts or []
+            else:
+                yield item
+
+    def _request_kind(self, contents, config) -> str:
+        modalities = getattr(config, "response_modalities", None) or []
+        if any(str(m).upper().endswith("AUDIO") for m in modalities):
+            return "tts"
+        for part in self._iter_parts(contents):
+            media = getattr(part, "inline_data", None) or getattr(part, "file_data", None)
+            mime_type = getattr(media, "mime_type", None) or ""
+            if mime_type.startswith("audio/"):
+                return "transcricao"
+            if mime_type.startswith("image/"):
+                return "imagem"
+        return "texto"
+
+    @staticmethod
+    def _text(contents) -> str:
+        if isinstance(contents, str):
+            return contents
+        return " ".join(
+            part if isinstance(part, str) else (getattr(part, "text", None) or "")
+            for part in FakeGenaiBackend._iter_parts(contents)
+        )
+
+    def _audio_response(self, contents) -> types.GenerateContentResponse:
+        texto = self._text(contents)
+        samples = int(len(texto) * self.audio_secs_por_caractere * FAKE_TTS_SAMPLE_RATE)
+        periods = max(1, samples * 2 // len(self._tone))
+        part = types.Part(
+            inline_data=types.Blob(data=self._tone * periods, mime_type=FAKE_TTS_MIME_TYPE)
+        )
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=[part]))]
+        )
+
+    @staticmethod
+    def _json_response(payload: dict, config) -> types.GenerateContentResponse:
+        text = json.dumps(payload, ensure_ascii=False)
+        response = types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(role="model", parts=[types.Part.from_text(text=text)])
+                )
+            ]
+        )
+        schema = getattr(config, "response_schema", None)
+        if isinstance(schema, type) and hasattr(schema, "model_validate"):
+            response.parsed = schema.model_validate(payload)
+        return response
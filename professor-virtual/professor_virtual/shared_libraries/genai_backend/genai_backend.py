@@ -0,0 +1,243 @@
+"""Backend interface the tools resolve every Gemini call through."""
+
+import abc
+import io
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from google.genai import types
+
+from professor_virtual.config import Config
+
+from ..circuit_breaker import get_circuit_breaker
+from ..circuit_breaker.circuit_breaker import is_endpoint_failure
+from ..concurrency import get_model_controller
+from ..deadline import DeadlineExceeded, current_deadline
+from ..genai_client import get_async_genai_client, uses_vertexai
+from ..hedging import get_hedging_policy
+
+logger = logging.getLogger(__name__)
+
+
+class FilesApiUnavailable(RuntimeError):
+    """The active backend cannot upload files (e.g. Vertex AI)."""
+
+
+class GenaiBackend(abc.ABC):
+    """Minimal surface of the Gemini API used by the tools.
+
+    Backends with `supports_files_api` also implement `upload_file`.
+    """
+
+    supports_files_api: bool = False
+
+    @abc.abstractmethod
+    async def generate_content(
+        self,
+        *,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+    ) -> types.GenerateContentResponse:
+        """Runs a single `generate_content` request."""
+
+    async def generate_content_stream(
+        self,
+        *,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+    ) -> AsyncIterator[types.GenerateContentResponse]:
+        """Yields the response in chunks as the model produces them.
+
+        Backends without streaming yield the whole response as one chunk.
+        """
+        yield await self.generate_content(model=model, contents=contents, config=config)
+
+
+class GeminiBackend(GenaiBackend):
+    """Real backend backed by the shared pooled `client.aio` client."""
+
+    def __init__(self, location: Optional[str] = None):
+        self.location = location
+
+    @property
+    def supports_files_api(self) -> bool:
+        # client.aio.files.upload only exists in the Gemini Developer API
+        return not uses_vertexai()
+
+    async def generate_content(self, *, model, contents, config=None):
+        client = get_async_genai_client(self.location)
+        return await client.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+    async def generate_content_stream(self, *, model, contents, config=None):
+        client = get_async_genai_client(self.location)
+        async for chunk in await client.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        ):
+            yield chunk
+
+    async def upload_file(self, *, data, mime_type, display_name=None):
+        """Uploads media through the Files API and returns the `File`."""
+        client = get_async_genai_client(self.location)
+        return await client.files.upload(
+            file=io.BytesIO(data),
+            config=types.UploadFileConfig(mime_type=mime_type, display_name=display_name),
+        )
+
+
+_backend: Optional[GenaiBackend] = None
+
+
+def get_genai_backend() -> GenaiBackend:
+    """Returns the active backend, creating it from Config on first use.
+
+    `Config.genai_backend == "fake"` selects the local `FakeGenaiBackend`, so
+    the agent can run and be load-tested without network access. With Vertex
+    AI, `Config.CLOUD_LOCATIONS` spreads calls over several weighted regions
+    through an `EndpointPool`; the Gemini Developer API has no regions, so
+    there it is ignored with a warning.
+    """
+    global _backend
+    if _backend is None:
+        config = Config()
+        if config.genai_backend == "fake":
+            from .fake_backend import FakeGenaiBackend
+
+            _backend = FakeGenaiBackend()
+        elif config.CLOUD_LOCATIONS and uses_vertexai():
+            from ..endpoint_pool import EndpointPool, parse_locations
+
+            weights = parse_locations(config.CLOUD_LOCATIONS)
+            _backend = EndpointPool(
+                {location: GeminiBackend(location) for location in weights},
+                weights,
+            )
+        else:
+            if config.CLOUD_LOCATIONS:
+                logger.warning(
+                    "GOOGLE_CLOUD_LOCATIONS ignored: regional endpoints need "
+                    "GOOGLE_GENAI_USE_VERTEXAI"
+                )
+            _backend = GeminiBackend()
+    return _backend
+
+
+def set_genai_backend(backend: GenaiBackend) -> None:
+    """Replaces the active backend (e.g. with `FakeGenaiBackend` offline)."""
+    global _backend
+    logger.debug("Using genai backend %s", type(backend).__name__)
+    _backend = backend
+
+
+def reset_genai_backend() -> None:
+    """Restores the default Gemini backend."""
+    global _backend
+    _backend = None
+
+
+async def generate_content(
+    *,
+    model: str,
+    contents: Any,
+    config: Optional[types.GenerateContentConfig] = None,
+    hedge: bool = False,
+) -> types.GenerateContentResponse:
+    """Entry point for tool model calls.
+
+    Resolves the active backend and runs the request under the model's shared
+    adaptive concurrency limit, with jittered retries on 429/5xx. With
+    `hedge=True` and `Config.hedging_enabled`, a slow attempt is re-issued
+    once and the first response wins. Calls made after the turn deadline expired
+    fail fast with `DeadlineExceeded`, and calls to a model whose circuit
+    breaker is open fail fast with `CircuitOpenError`.
+    """
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(f"no time budget left for {model}")
+
+    backend = get_genai_backend()
+    controller = get_model_controller(model)
+    policy = get_hedging_policy(model) if hedge else None
+    return await get_circuit_breaker(model).call(
+        lambda: controller.call(
+            lambda: backend.generate_content(
+                model=model, contents=contents, config=config
+            ),
+            hedging=policy,
+        )
+    )
+
+
+async def generate_content_stream(
+    *,
+    model: str,
+    contents: Any,
+    config: Optional[types.GenerateContentConfig] = None,
+) -> AsyncIterator[types.GenerateContentResponse]:
+    """Streaming counterpart of `generate_content`.
+
+    Holds one of the model's concurrency slots until the stream ends and
+    reports the outcome to its circuit breaker. Nothing is retried or hedged:
+    chunks already yielded cannot be taken back.
+    """
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(f"no time budget left for {model}")
+
+    backend = get_genai_backend()
+    breaker = get_circuit_breaker(model)
+    breaker.before_call()
+    completed = False
+    async with get_model_controller(model).limiter.slot():
+        try:
+            async for chunk in backend.generate_content_stream(
+                model=model, contents=contents, config=config
+            ):
+                yield chunk
+            completed = True
+        except Exception as e:
+            if is_endpoint_failure(e):
+                breaker.record_failure()
+            raise
+        finally:
+            # Consumers may stop early (client gone); that says nothing
+            # about the endpoint
+            if completed:
+                breaker.record_success()
+            else:
+                breaker.release_probe()
+
+
+def files_api_available() -> bool:
+    """Whether the active backend can upload media through the Files API."""
+    return get_genai_backend().supports_files_api
+
+
+async def upload_file(
+    *,
+    data: bytes,
+    mime_type: str,
+    display_name: Optional[str] = None,
+) -> types.File:
+    """Entry point for Files API uploads, bounded by the turn deadline.
+
+    Uploads share a circuit breaker named "files_api", so an outage of the
+    upload endpoint fails fast instead of stalling every large request.
+    Raises `FilesApiUnavailable` when the backend has no Files API.
+    """
+    backend = get_genai_backend()
+    if not backend.supports_files_api:
+        raise FilesApiUnavailable(f"{type(backend).__name__} has no Files API")
+
+    deadline = current_deadline()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded("no time budget left for a Files API upload")
+
+    return await get_circuit_breaker("files_api").call(
+        lambda: backend.upload_file(
+            data=data, mime_type=mime_type, display_name=display_name
+        )
+    )
@@ -0,0 +1,15 @@
+from .genai_client import (
+    GenaiClientRegistry,
+    get_genai_client,
+    get_async_genai_client,
+    close_genai_clients,
+    uses_vertexai,
+)
+
+__all__ = [
+    "GenaiClientRegistry",
+    "get_genai_client",
+    "get_async_genai_client",
+    "close_genai_clients",
+    "uses_vertexai",
+]
@@ -0,0 +1,124 @@
+"""Process-wide registry of pooled Gemini clients shared by all tools."""
+
+import logging
+import threading
+from typing import Optional
+
+import httpx
+from google import genai
+from google.genai import types
+
+from professor_virtual.config import Config
+
+logger = logging.getLogger(__name__)
+
+_VERTEXAI_TRUE_VALUES = ("1", "true", "True")
+
+
+class GenaiClientRegistry:
+    """Hands out long-lived `genai.Client` instances, one per backend target.
+
+    Each client keeps its own httpx connection pool, so reusing it across tool
+    calls avoids paying TLS handshakes and auth setup on every request. Clients
+    are keyed by backend (Vertex AI or API key) and location.
+    """
+
+    def __init__(self, config: Optional[Config] = None):
+        self._config = config
+        self._clients: dict[tuple, genai.Client] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> Config:
+        if self._config is None:
+            self._config = Config()
+        return self._config
+
+    def uses_vertexai(self) -> bool:
+        return self.config.GENAI_USE_VERTEXAI in _VERTEXAI_TRUE_VALUES
+
+    def _http_options(self) -> types.HttpOptions:
+        config = self.config
+        limits = httpx.Limits(
+            max_connections=config.genai_max_connections,
+            max_keepalive_connections=config.genai_max_keepalive_connections,
+            keepalive_expiry=config.genai_keepalive_expiry_secs,
+        )
+        return types.HttpOptions(
+            client_args={"limits": limits},
+            async_client_args={"limits": limits},
+        )
+
+    def _create_client(self, location: str) -> genai.Client:
+        if self.uses_vertexai():
+            logger.debug("Creating Vertex AI genai client for %s", location)
+            return genai.Client(
+                vertexai=True,
+                project=self.config.CLOUD_PROJECT,
+                location=location,
+                http_options=self._http_options(),
+            )
+        logger.debug("Creating Gemini Developer API genai client")
+        return genai.Client(
+            api_key=self.config.API_KEY,
+            http_options=self._http_options(),
+        )
+
+    def get_client(self, location: Optional[str] = None) -> genai.Client:
+        """Returns the shared client for `location` (default: CLOUD_LOCATION)."""
+        location = location or self.config.CLOUD_LOCATION
+        key = ("vertexai", location) if self.uses_vertexai() else ("api_key",)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._create_client(location)
+                    self._clients[key] = client
+        return client
+
+    def get_async_client(self, location: Optional[str] = None):
+        """Returns the `client.aio` facet of the shared client."""
+        return self.get_client(location).aio
+
+    async def aclose(self) -> None:
+        """Closes every pooled connection. Safe to call more than once."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            api_client = getattr(client, "_api_client", None)
+            if api_client is None:
+                continue
+            try:
+                sync_client = getattr(api_client, "_httpx_client", None)
+                if sync_client is not None:
+                    sync_client.close()
+                async_client = getattr(api_client, "_async_httpx_client", None)
+                if async_client is not None:
+                    await async_client.aclose()
+            except Exception as e:
+                logger.warning("Error closing genai client: %s", e)
+
+
+_registry = GenaiClientRegistry()
+
+
+def get_genai_client(location: Optional[str] = None) -> genai.Client:
+    """Returns the process-wide pooled genai client."""
+    return _registry.get_client(location)
+
+
+def get_async_genai_client(location: Optional[str] = None):
+    """Returns the process-wide pooled async (`client.aio`) genai client."""
+    return _registry.get_async_client(location)
+
+
+def uses_vertexai() -> bool:
+    """True when clients target Vertex AI rather than the Gemini Developer API."""
+    return _registry.uses_vertexai()
+
+
+async def close_genai_clients() -> None:
+    """Shutdown hook: releases the pooled connections of every client."""
+    await _registry.aclose()
@@ -0,0 +1,3 @@
+from .hedging import LatencyTracker, HedgingPolicy, get_hedging_policy, hedging_stats
+
+__all__ = ["LatencyTracker", "HedgingPolicy", "get_hedging_policy", "hedging_stats"]
@@ -0,0 +1,159 @@
+"""Hedged requests: re-issue slow calls and keep whichever answers first."""
+
+import asyncio
+import collections
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from professor_virtual.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples: collections.deque[float] = collections.deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency_secs: float) -> None:
+        self._samples.append(latency_secs)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class HedgingPolicy:
+    """Sends a second identical request when the first is slower than usual.
+
+    The hedge fires once a call has been running longer than the
+    `percentile`-th latency of the recent window. At most `max_fraction` of
+    requests may be hedged. The first successful response wins and the other
+    attempt is cancelled; a failed attempt just leaves the other one running.
+
+    `fn` should be a single attempt: retries and their backoff belong outside,
+    or every sleep would look like a slow call. The primary's elapsed time is
+    recorded however it ends, so slow primaries that lose to the hedge (or
+    fail) still push the percentile up; a hedge is only recorded when it wins.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 95.0,
+        max_fraction: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.max_fraction = max_fraction
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker(window)
+        self.requests = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None when hedging is not allowed."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        if self.hedges_sent + 1 > self.max_fraction * self.requests:
+            return None
+        return self.latencies.percentile(self.percentile)
+
+    async def _timed(self, fn: Callable[[], Awaitable[Any]], always: bool) -> Any:
+        start = time.monotonic()
+        succeeded = False
+        try:
+            result = await fn()
+            succeeded = True
+            return result
+        finally:
+            if always or succeeded:
+                self.latencies.record(time.monotonic() - start)
+
+    async def run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.requests += 1
+        primary = asyncio.ensure_future(self._timed(fn, always=True))
+        hedge = None
+        delay = self.hedge_delay()
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or delay is None:
+                self.primary_wins += 1
+                return await primary
+
+            self.hedges_sent += 1
+            logger.debug("%s: hedging request after %.2fs", self.name, delay)
+            hedge = asyncio.ensure_future(self._timed(fn, always=False))
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                succeeded = [
+                    task for task in done
+                    if not task.cancelled() and task.exception() is None
+                ]
+                if succeeded or not pending:
+                    winner = succeeded[0] if succeeded else done.pop()
+                    if winner is hedge:
+                        self.hedge_wins += 1
+                    else:
+                        self.primary_wins += 1
+                    return winner.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "requests": self.requests,
+            "hedges_sent": self.hedges_sent,
+            "hedge_wins": self.hedge_wins,
+            "primary_wins": self.primary_wins,
+            "hedge_win_rate": (
+                round(self.hedge_wins / self.hedges_sent, 3) if self.hedges_sent else 0.0
+            ),
+            "hedge_delay_secs": self.hedge_delay(),
+        }
+
+
+_policies: dict[str, HedgingPolicy] = {}
+_config: Optional[Config] = None
+
+
+def get_hedging_policy(model: str) -> Optional[HedgingPolicy]:
+    """Returns the model's hedging policy, or None when hedging is disabled."""
+    global _config
+    if _config is None:
+        _config = Config()
+    if not _config.hedging_enabled:
+        return None
+    policy = _policies.get(model)
+    if policy is None:
+        policy = _policies[model] = HedgingPolicy(
+            model,
+            percentile=_config.hedging_percentile,
+            max_fraction=_config.hedging_max_fraction,
+            min_samples=_config.hedging_min_samples,
+        )
+    return policy
+
+
+def hedging_stats() -> list[dict]:
+    """How often hedges were sent and won, per model."""
+    return [policy.stats() for policy in _policies.values()]
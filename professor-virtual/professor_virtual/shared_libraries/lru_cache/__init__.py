@@ -0,0 +1,3 @@
+from .lru_cache import LRUCache, estimate_size
+
+__all__ = ["LRUCache", "estimate_size"]
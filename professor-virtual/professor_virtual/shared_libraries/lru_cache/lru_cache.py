@@ -0,0 +1,126 @@
+"""Thread-safe LRU cache bounded by bytes, with TTL and hit-rate counters."""
+
+import collections
+import sys
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size in bytes of JSON-like values (dict/list/str/bytes)."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """O(1) get/put cache evicting least-recently-used entries.
+
+    Capacity is a byte budget (`max_bytes`, measured with `size_fn`) and an
+    optional entry cap; entries older than `ttl_secs` are treated as misses.
+    All operations take a lock, so the cache can be shared across threads and
+    tasks.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_secs: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        size_fn: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_secs = ttl_secs
+        self.max_entries = max_entries
+        self._size_fn = size_fn
+        self._clock = clock
+        # key -> (value, size, stored_at); order = recency (oldest first)
+        self._entries: collections.OrderedDict[Hashable, tuple[Any, int, float]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry: tuple[Any, int, float]) -> bool:
+        return self.ttl_secs is not None and self._clock() - entry[2] > self.ttl_secs
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> bool:
+        """Stores `value`. Returns False if it alone exceeds the byte budget."""
+        size = self._size_fn(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, self._clock())
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes or (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,3 @@
+from .rate_limiter import TokenBucket, RateLimiter, get_rate_limiter
+
+__all__ = ["TokenBucket", "RateLimiter", "get_rate_limiter"]
@@ -0,0 +1,176 @@
+"""Async token-bucket rate limiting with global, per-user and per-session scopes."""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from professor_virtual.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Idle buckets are pruned once a scope tracks more keys than this.
+_MAX_IDLE_BUCKETS = 1000
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rpm` tokens per minute.
+
+    `acquire()` awaits until a token is available instead of sleeping the
+    thread, so waiting on one bucket never stalls unrelated sessions. Waiters
+    on the same bucket are served in FIFO order.
+    """
+
+    def __init__(
+        self,
+        rpm: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate_per_sec = rpm / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rpm)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.waiters = 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_sec)
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    @property
+    def idle(self) -> bool:
+        return self.waiters == 0 and self.tokens >= self.capacity
+
+    def try_acquire(self) -> bool:
+        """Takes a token without waiting. Returns False if none is available."""
+        if self.waiters:
+            return False
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> float:
+        """Waits for a token and returns the number of seconds waited."""
+        if self.try_acquire():
+            return 0.0
+        start = self._clock()
+        self.waiters += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return self._clock() - start
+                    await asyncio.sleep((1 - self._tokens) / self.rate_per_sec)
+        finally:
+            self.waiters -= 1
+
+
+class RateLimiter:
+    """Applies session, user and global (project RPM) buckets in that order.
+
+    Narrow scopes are acquired first so a student who exhausted their own
+    quota waits without holding a global token. A scope whose RPM is 0 or
+    None is disabled. Bookkeeping lives in memory, never in session state.
+    """
+
+    def __init__(
+        self,
+        global_rpm: Optional[float] = None,
+        user_rpm: Optional[float] = None,
+        session_rpm: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self.global_rpm = global_rpm
+        self.user_rpm = user_rpm
+        self.session_rpm = session_rpm
+        self._global = TokenBucket(global_rpm, clock=clock) if global_rpm else None
+        self._users: dict[str, TokenBucket] = {}
+        self._sessions: dict[str, TokenBucket] = {}
+        self.total_acquired = 0
+        self.total_wait_secs = 0.0
+
+    def _bucket(self, buckets: dict, key: str, rpm: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= _MAX_IDLE_BUCKETS:
+                for idle_key in [k for k, b in buckets.items() if b.idle]:
+                    del buckets[idle_key]
+            bucket = buckets[key] = TokenBucket(rpm, clock=self._clock)
+        return bucket
+
+    def _buckets_for(self, user_id: Optional[str], session_id: Optional[str]):
+        if self.session_rpm and session_id:
+            yield self._bucket(self._sessions, session_id, self.session_rpm)
+        if self.user_rpm and user_id:
+            yield self._bucket(self._users, user_id, self.user_rpm)
+        if self._global is not None:
+            yield self._global
+
+    async def acquire(
+        self, user_id: Optional[str] = None, session_id: Optional[str] = None
+    ) -> float:
+        """Waits until every applicable scope grants a token.
+
+        Returns:
+          Total seconds spent waiting.
+        """
+        waited = 0.0
+        for bucket in self._buckets_for(user_id, session_id):
+            waited += await bucket.acquire()
+        self.total_acquired += 1
+        self.total_wait_secs += waited
+        if waited:
+            logger.debug(
+                "rate limited [user: %s, session: %s, waited_secs: %.2f]",
+                user_id,
+                session_id,
+                waited,
+            )
+        return waited
+
+    def queue_depth(self) -> dict[str, int]:
+        """Number of requests currently waiting, per scope."""
+        return {
+            "global": self._global.waiters if self._global is not None else 0,
+            "user": sum(b.waiters for b in self._users.values()),
+            "session": sum(b.waiters for b in self._sessions.values()),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "total_acquired": self.total_acquired,
+            "total_wait_secs": round(self.total_wait_secs, 3),
+            "tracked_users": len(self._users),
+            "tracked_sessions": len(self._sessions),
+        }
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Returns the process-wide limiter configured from `Config`."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        config = Config()
+        _rate_limiter = RateLimiter(
+            global_rpm=config.rate_limit_global_rpm,
+            user_rpm=config.rate_limit_user_rpm,
+            session_rpm=config.rate_limit_session_rpm,
+        )
+    return _rate_limiter
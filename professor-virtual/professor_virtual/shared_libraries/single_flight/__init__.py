@@ -0,0 +1,3 @@
+from .single_flight import SingleFlight, make_key
+
+__all__ = ["SingleFlight", "make_key"]
@@ -0,0 +1,78 @@
+"""Single-flight coalescing of identical concurrent async requests."""
+
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Union
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts: Union[bytes, str, int, float, bool, None]) -> str:
+    """Builds a stable key from request content (e.g. media bytes) and params."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else repr(part).encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; duplicates await its result.
+
+    The call runs in its own task, so a caller that gets cancelled (e.g. the
+    student who double-tapped closes the app) does not cancel the work other
+    callers are waiting on. When the last waiting caller is cancelled (turn
+    deadline, client gone), the call itself is cancelled, so it stops holding
+    its concurrency slot and quota.
+    """
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            # Marks the exception as retrieved when every caller went away.
+            task.exception()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+            logger.debug("%s: coalescing duplicate request %s", self.name, key[:12])
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Nobody is waiting any more: stop the work itself
+                    self.abandoned += 1
+                    if self._in_flight.get(key) is task:
+                        del self._in_flight[key]
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
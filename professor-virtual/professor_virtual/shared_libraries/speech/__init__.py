@@ -0,0 +1,49 @@
+from .chunking import split_for_synthesis
+from .engines import (
+    FasterWhisperEngine,
+    PiperEngine,
+    SpeechEngineUnavailable,
+    SpeechToTextEngine,
+    SynthesizedSpeech,
+    TextToSpeechEngine,
+    Transcript,
+    get_local_stt_engine,
+    get_local_tts_engine,
+    reset_local_engines,
+    set_local_stt_engine,
+    set_local_tts_engine,
+)
+from .routing import (
+    GEMINI,
+    LOCAL,
+    Route,
+    SpeechRouter,
+    get_speech_router,
+    normalize_phrase,
+    quota_pressure,
+    set_speech_router,
+)
+
+__all__ = [
+    "split_for_synthesis",
+    "FasterWhisperEngine",
+    "PiperEngine",
+    "SpeechEngineUnavailable",
+    "SpeechToTextEngine",
+    "SynthesizedSpeech",
+    "TextToSpeechEngine",
+    "Transcript",
+    "get_local_stt_engine",
+    "get_local_tts_engine",
+    "reset_local_engines",
+    "set_local_stt_engine",
+    "set_local_tts_engine",
+    "GEMINI",
+    "LOCAL",
+    "Route",
+    "SpeechRouter",
+    "get_speech_router",
+    "normalize_phrase",
+    "quota_pressure",
+    "set_speech_router",
+]
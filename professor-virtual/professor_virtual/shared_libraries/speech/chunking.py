@@ -0,0 +1,46 @@
+"""Splits long texts into sentence-aligned chunks for parallel synthesis."""
+
+import re
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?…;:])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def _pieces(sentence: str, max_chars: int) -> list[str]:
+    """Breaks an over-long sentence at clause boundaries, then at spaces."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    pieces = []
+    for clause in _CLAUSE_END.split(sentence):
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars + 1)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(clause[:cut].strip())
+            clause = clause[cut:].strip()
+        if clause:
+            pieces.append(clause)
+    return pieces
+
+
+def split_for_synthesis(text: str, max_chars: int = 300) -> list[str]:
+    """Chunks of at most `max_chars`, cut only between sentences.
+
+    Sentences are packed greedily into chunks so short ones do not become
+    separate requests; paragraphs always start a new chunk. A sentence longer
+    than `max_chars` is split at commas or semicolons (or, failing that, at
+    spaces).
+    """
+    chunks = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        current = ""
+        for sentence in _SENTENCE_END.split(" ".join(paragraph.split())):
+            for piece in _pieces(sentence, max_chars):
+                if current and len(current) + 1 + len(piece) > max_chars:
+                    chunks.append(current)
+                    current = piece
+                else:
+                    current = f"{current} {piece}" if current else piece
+        if current:
+            chunks.append(current)
+    return chunks
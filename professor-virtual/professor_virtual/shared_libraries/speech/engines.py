@@ -0,0 +1,216 @@
+"""Local CPU speech engines that can stand in for Gemini on cheap requests.
+
+Both engines are optional dependencies (`poetry install -E local-speech`).
+They load their model lazily, once per process, and run inference in a
+worker thread so the event loop keeps serving other sessions.
+"""
+
+import abc
+import asyncio
+import io
+import logging
+import math
+import threading
+import wave
+from dataclasses import dataclass
+from typing import Optional
+
+from professor_virtual.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechEngineUnavailable(RuntimeError):
+    """The engine's package or model is not installed."""
+
+
+@dataclass
+class Transcript:
+    text: str
+    language: Optional[str] = None
+    # Mean probability of the decoded tokens, when the engine reports it
+    confidence: Optional[float] = None
+
+
+@dataclass
+class SynthesizedSpeech:
+    """16-bit little-endian PCM."""
+
+    pcm: bytes
+    sample_rate: int
+    channels: int = 1
+
+
+class SpeechToTextEngine(abc.ABC):
+    name: str
+
+    @abc.abstractmethod
+    async def transcribe(
+        self, audio: bytes, mime_type: str, language: str = "pt"
+    ) -> Transcript:
+        """Transcribes one complete recording."""
+
+
+class TextToSpeechEngine(abc.ABC):
+    name: str
+
+    @abc.abstractmethod
+    async def synthesize(self, text: str) -> SynthesizedSpeech:
+        """Synthesizes `text` with the engine's configured voice."""
+
+
+class _LazyModel:
+    """Loads a model on first use, exactly once, from any thread."""
+
+    def __init__(self, load):
+        self._load = load
+        self._model = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load()
+        return self._model
+
+
+class FasterWhisperEngine(SpeechToTextEngine):
+    """Whisper on CPU through `faster-whisper` (CTranslate2, int8)."""
+
+    name = "faster_whisper"
+
+    def __init__(self, model_size: str = "small", compute_type: str = "int8", threads: int = 0):
+        self.model_size = model_size
+        self._model = _LazyModel(
+            lambda: self._load(model_size, compute_type, threads)
+        )
+
+    @staticmethod
+    def _load(model_size, compute_type, threads):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise SpeechEngineUnavailable("faster-whisper is not installed") from e
+        logger.info("Loading faster-whisper model %s", model_size)
+        return WhisperModel(
+            model_size, device="cpu", compute_type=compute_type, cpu_threads=threads
+        )
+
+    def _transcribe(self, audio: bytes, language: str) -> Transcript:
+        segments, info = self._model.get().transcribe(
+            io.BytesIO(audio), language=language, beam_size=1, vad_filter=True
+        )
+        # `segments` is a generator: decoding happens while it is consumed
+        segments = list(segments)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        confidence = None
+        if segments:
+            confidence = math.exp(
+                sum(segment.avg_logprob for segment in segments) / len(segments)
+            )
+        return Transcript(text=text, language=info.language, confidence=confidence)
+
+    async def transcribe(self, audio, mime_type, language="pt"):
+        return await asyncio.to_thread(self._transcribe, audio, language)
+
+
+class PiperEngine(TextToSpeechEngine):
+    """Piper neural TTS (ONNX) on CPU with a single local voice model."""
+
+    name = "piper"
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self._voice = _LazyModel(lambda: self._load(model_path))
+
+    @staticmethod
+    def _load(model_path):
+        try:
+            from piper import PiperVoice
+        except ImportError as e:
+            raise SpeechEngineUnavailable("piper-tts is not installed") from e
+        logger.info("Loading Piper voice %s", model_path)
+        return PiperVoice.load(model_path)
+
+    def _synthesize(self, text: str) -> SynthesizedSpeech:
+        voice = self._voice.get()
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            # piper-tts >= 1.3 renamed synthesize(text, wav) to synthesize_wav
+            if hasattr(voice, "synthesize_wav"):
+                voice.synthesize_wav(text, wav_file)
+            else:
+                voice.synthesize(text, wav_file)
+        buffer.seek(0)
+        with wave.open(buffer, "rb") as wav_file:
+            return SynthesizedSpeech(
+                pcm=wav_file.readframes(wav_file.getnframes()),
+                sample_rate=wav_file.getframerate(),
+                channels=wav_file.getnchannels(),
+            )
+
+    async def synthesize(self, text):
+        return await asyncio.to_thread(self._synthesize, text)
+
+
+_UNSET = object()
+_stt_engine = _UNSET
+_tts_engine = _UNSET
+
+
+def get_local_stt_engine() -> Optional[SpeechToTextEngine]:
+    """The configured local speech-to-text engine, or None if there is none.
+
+    `Config.stt_local_motor == "faster_whisper"` enables faster-whisper with
+    `Config.stt_local_modelo`.
+    """
+    global _stt_engine
+    if _stt_engine is _UNSET:
+        config = Config()
+        if config.stt_local_motor == "faster_whisper":
+            _stt_engine = FasterWhisperEngine(config.stt_local_modelo)
+        else:
+            if config.stt_local_motor:
+                logger.warning("Unknown local STT engine %r", config.stt_local_motor)
+            _stt_engine = None
+    return _stt_engine
+
+
+def get_local_tts_engine() -> Optional[TextToSpeechEngine]:
+    """The configured local TTS engine, or None if there is none.
+
+    `Config.tts_local_motor == "piper"` enables Piper with the voice model at
+    `Config.tts_local_modelo`.
+    """
+    global _tts_engine
+    if _tts_engine is _UNSET:
+        config = Config()
+        if config.tts_local_motor == "piper" and config.tts_local_modelo:
+            _tts_engine = PiperEngine(config.tts_local_modelo)
+        else:
+            if config.tts_local_motor:
+                logger.warning(
+                    "Local TTS engine %r not enabled (engine or model missing)",
+                    config.tts_local_motor,
+                )
+            _tts_engine = None
+    return _tts_engine
+
+
+def set_local_stt_engine(engine: Optional[SpeechToTextEngine]) -> None:
+    """Replaces the local STT engine (None disables local transcription)."""
+    global _stt_engine
+    _stt_engine = engine
+
+
+def set_local_tts_engine(engine: Optional[TextToSpeechEngine]) -> None:
+    """Replaces the local TTS engine (None disables local synthesis)."""
+    global _tts_engine
+    _tts_engine = engine
+
+
+def reset_local_engines() -> None:
+    """Goes back to the engines configured in Config."""
+    global _stt_engine, _tts_engine
+    _stt_engine = _tts_engine = _UNSET
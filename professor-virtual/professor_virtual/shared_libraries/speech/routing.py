@@ -0,0 +1,151 @@
+"""Chooses between Gemini and a local engine for each speech request."""
+
+import collections
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from professor_virtual.config import Config
+
+from ..circuit_breaker import get_circuit_breaker
+from ..circuit_breaker.circuit_breaker import OPEN
+from ..concurrency import get_model_controller
+
+logger = logging.getLogger(__name__)
+
+GEMINI = "gemini"
+LOCAL = "local"
+
+
+@dataclass(frozen=True)
+class Route:
+    engine: str
+    reason: str
+
+    @property
+    def local(self) -> bool:
+        return self.engine == LOCAL
+
+
+def normalize_phrase(text: str) -> str:
+    """Case-, accent- and punctuation-insensitive form used for the whitelist."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def quota_pressure(model: str) -> float:
+    """How close `model` is to its limits, from 0 (idle) to 1 (saturated).
+
+    An open circuit breaker counts as fully saturated; otherwise this is the
+    share of the model's adaptive concurrency limit that is in flight or
+    queued. The limit itself shrinks on 429s, so quota errors raise the
+    pressure even at constant traffic.
+    """
+    if get_circuit_breaker(model).state == OPEN:
+        return 1.0
+    limiter = get_model_controller(model).limiter
+    return min(1.0, (limiter.in_flight + limiter.waiting) / max(1, limiter.limit))
+
+
+class SpeechRouter:
+    """Routing policy for transcription and synthesis.
+
+    Cheap requests go to the local engine: recordings up to `local_max_secs`
+    and texts in the `local_phrases` whitelist. When Gemini's quota pressure
+    reaches `pressure_threshold`, the local engine also takes recordings up
+    to `pressure_max_secs` and texts up to `pressure_max_chars`. `mode`
+    "gemini" or "local" pins every request to one side. Whatever the policy
+    says, requests go to Gemini when no local engine is configured.
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        local_max_secs: float = 3.0,
+        local_phrases: Iterable[str] = (),
+        pressure_threshold: float = 0.8,
+        pressure_max_secs: float = 15.0,
+        pressure_max_chars: int = 200,
+    ):
+        self.mode = mode
+        self.local_max_secs = local_max_secs
+        self.local_phrases = {normalize_phrase(p) for p in local_phrases if p.strip()}
+        self.pressure_threshold = pressure_threshold
+        self.pressure_max_secs = pressure_max_secs
+        self.pressure_max_chars = pressure_max_chars
+        self.decisions: collections.Counter = collections.Counter()
+
+    def _decide(self, route: Route) -> Route:
+        self.decisions[(route.engine, route.reason)] += 1
+        logger.debug("speech route: %s (%s)", route.engine, route.reason)
+        return route
+
+    def _pinned(self, has_local: bool) -> Optional[Route]:
+        if not has_local:
+            return Route(GEMINI, "no_local_engine")
+        if self.mode in (GEMINI, LOCAL):
+            return Route(self.mode, "pinned")
+        return None
+
+    def route_transcription(
+        self, duration_secs: Optional[float], model: str, has_local: bool
+    ) -> Route:
+        route = self._pinned(has_local)
+        if route is None:
+            if not duration_secs:
+                route = Route(GEMINI, "unknown_duration")
+            elif duration_secs <= self.local_max_secs:
+                route = Route(LOCAL, "short_audio")
+            elif (
+                duration_secs <= self.pressure_max_secs
+                and quota_pressure(model) >= self.pressure_threshold
+            ):
+                route = Route(LOCAL, "quota_pressure")
+            else:
+                route = Route(GEMINI, "default")
+        return self._decide(route)
+
+    def route_synthesis(self, text: str, model: str, has_local: bool) -> Route:
+        route = self._pinned(has_local)
+        if route is None:
+            if normalize_phrase(text) in self.local_phrases:
+                route = Route(LOCAL, "whitelisted_phrase")
+            elif (
+                len(text) <= self.pressure_max_chars
+                and quota_pressure(model) >= self.pressure_threshold
+            ):
+                route = Route(LOCAL, "quota_pressure")
+            else:
+                route = Route(GEMINI, "default")
+        return self._decide(route)
+
+    def stats(self) -> dict:
+        return {f"{engine}:{reason}": n for (engine, reason), n in self.decisions.items()}
+
+
+_router: Optional[SpeechRouter] = None
+
+
+def get_speech_router() -> SpeechRouter:
+    """Returns the process-wide router built from Config."""
+    global _router
+    if _router is None:
+        config = Config()
+        _router = SpeechRouter(
+            mode=config.fala_roteamento,
+            local_max_secs=config.stt_local_max_secs,
+            local_phrases=config.tts_local_frases.split("|"),
+            pressure_threshold=config.fala_pressao_cota_limite,
+            pressure_max_secs=config.stt_local_pressao_max_secs,
+            pressure_max_chars=config.tts_local_pressao_max_caracteres,
+        )
+    return _router
+
+
+def set_speech_router(router: Optional[SpeechRouter]) -> None:
+    """Replaces the router (None rebuilds it from Config on next use)."""
+    global _router
+    _router = router
@@ -0,0 +1,33 @@
+from .tts_cache import (
+    STORED_AUDIO_STATE_PREFIX,
+    STORED_KEY_STATE_PREFIX,
+    CachedSpeech,
+    StoredAudio,
+    TtsCache,
+    audio_artifact_name,
+    audio_digest,
+    get_tts_cache,
+    normalize_speech_text,
+    reset_tts_cache,
+    speech_key,
+    store_audio,
+    stored_audio,
+    tts_cache_stats,
+)
+
+__all__ = [
+    "STORED_AUDIO_STATE_PREFIX",
+    "STORED_KEY_STATE_PREFIX",
+    "CachedSpeech",
+    "StoredAudio",
+    "TtsCache",
+    "audio_artifact_name",
+    "audio_digest",
+    "get_tts_cache",
+    "normalize_speech_text",
+    "reset_tts_cache",
+    "speech_key",
+    "store_audio",
+    "stored_audio",
+    "tts_cache_stats",
+]
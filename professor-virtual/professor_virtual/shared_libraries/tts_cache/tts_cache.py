@@ -0,0 +1,250 @@
+"""Cross-session TTS cache over a content-addressed, user-scoped audio store.
+
+Synthesized audio is saved once as a `user:` artifact named after the sha256
+of its bytes, so it outlives the session and identical audio is never stored
+twice. The user's state keeps the digests already stored for them, and which
+request produced each one, so "does this user have it?" is a dictionary
+lookup instead of artifact I/O, on any server instance. Each digest and each
+request gets its own state key, so storing one audio only adds that entry to
+the session's state delta.
+
+`TtsCache` maps a synthesis request (normalized text, voice, model and any
+output options) to the digest of its audio. It also keeps recently produced
+audio in memory, bounded by bytes, so a phrase first synthesized for one user
+is copied into another user's store without calling the model again.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+from google.genai import types
+
+from professor_virtual.config import Config
+
+from ..lru_cache import LRUCache
+from ..single_flight import make_key
+
+logger = logging.getLogger(__name__)
+
+# prefix + digest -> {"arquivo", "versao", "tamanho_bytes", "mime_type",
+# "motor", "perfil", "criado_em"} of the audio stored for the user
+STORED_AUDIO_STATE_PREFIX = "user:tts_audio:"
+# prefix + request key -> {"digest", "criado_em"}, for requests whose audio
+# the user has stored
+STORED_KEY_STATE_PREFIX = "user:tts_chave:"
+
+_EXTENSIONS = {"audio/wav": "wav", "audio/basic": "au"}
+
+
+def normalize_speech_text(text: str) -> str:
+    """Unicode-normalized text with runs of whitespace collapsed.
+
+    Case and punctuation are kept: they change intonation.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def speech_key(text: str, voice: str, model: str, *options: Union[str, int, float, None]) -> str:
+    """Cache key of a synthesis request."""
+    return make_key(normalize_speech_text(text), voice, model, *options)
+
+
+def audio_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def audio_artifact_name(digest: str, mime_type: str = "audio/wav") -> str:
+    return f"user:tts_{digest[:32]}.{_EXTENSIONS.get(mime_type, 'bin')}"
+
+
+@dataclass(frozen=True)
+class CachedSpeech:
+    digest: str
+    mime_type: str
+    size_bytes: int
+    engine: str
+    # Output profile (rate, width, container) the audio was encoded with
+    profile: Optional[dict] = None
+
+
+@dataclass(frozen=True)
+class StoredAudio:
+    artifact_name: str
+    version: int
+    size_bytes: int
+    # False when the user already had these exact bytes stored
+    written: bool
+
+
+def _entry(context: Any, prefix: str, name: str) -> Optional[dict]:
+    return (getattr(context, "state", None) or {}).get(prefix + name)
+
+
+def _entries(context: Any, prefix: str) -> dict[str, dict]:
+    state = getattr(context, "state", None) or {}
+    items = state.to_dict() if hasattr(state, "to_dict") else state
+    return {k: v for k, v in items.items() if k.startswith(prefix) and v is not None}
+
+
+def _set_capped(context: Any, prefix: str, name: str, value: dict, max_refs: int) -> None:
+    entries = _entries(context, prefix)
+    entries.pop(prefix + name, None)
+    context.state[prefix + name] = {**value, "criado_em": time.time()}
+    # Oldest references go first; their artifacts stay, they just stop being
+    # reused. State keys can't be deleted, so they are cleared to None.
+    excess = len(entries) + 1 - max_refs
+    if excess > 0:
+        for key in sorted(entries, key=lambda k: entries[k].get("criado_em", 0))[:excess]:
+            context.state[key] = None
+
+
+def stored_audio(context: Any, digest: str) -> Optional[StoredAudio]:
+    """The user's stored copy of `digest`, if any."""
+    ref = _entry(context, STORED_AUDIO_STATE_PREFIX, digest)
+    if ref is None:
+        return None
+    return StoredAudio(ref["arquivo"], ref["versao"], ref["tamanho_bytes"], written=False)
+
+
+async def store_audio(
+    context: Any,
+    data: bytes,
+    mime_type: str,
+    engine: str,
+    key: Optional[str] = None,
+    max_refs: int = 500,
+    profile: Optional[dict] = None,
+) -> StoredAudio:
+    """Saves `data` to the user's content-addressed store unless already there.
+
+    With `key`, also remembers that this request produced `data`; `profile`
+    is recorded next to the artifact reference. Raises whatever
+    `save_artifact` raises (ValueError without an artifact service).
+    """
+    digest = audio_digest(data)
+    stored = stored_audio(context, digest)
+    if stored is None:
+        name = audio_artifact_name(digest, mime_type)
+        version = await context.save_artifact(
+            filename=name, artifact=types.Part.from_bytes(data=data, mime_type=mime_type)
+        )
+        _set_capped(
+            context,
+            STORED_AUDIO_STATE_PREFIX,
+            digest,
+            {"arquivo": name, "versao": version, "tamanho_bytes": len(data),
+             "mime_type": mime_type, "motor": engine, "perfil": profile},
+            max_refs,
+        )
+        stored = StoredAudio(name, version, len(data), written=True)
+    if key is not None:
+        _set_capped(context, STORED_KEY_STATE_PREFIX, key, {"digest": digest}, max_refs)
+    return stored
+
+
+class TtsCache:
+    """Request -> audio digest index plus a byte-bounded audio buffer.
+
+    Counters: `hits` (no model call, nothing written), `shared_hits` (no model
+    call, audio copied to this user's store), `misses` and `bytes_saved`
+    (audio bytes neither synthesized nor written).
+    """
+
+    def __init__(self, max_entries: int = 10_000, audio_max_bytes: int = 64 * 1024 * 1024):
+        self._index = LRUCache(max_bytes=max_entries * 1024, max_entries=max_entries)
+        self._audio = LRUCache(max_bytes=audio_max_bytes, size_fn=len)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def lookup(self, key: str) -> Optional[CachedSpeech]:
+        return self._index.get(key)
+
+    def audio(self, digest: str) -> Optional[bytes]:
+        return self._audio.get(digest)
+
+    def remember(self, key: str, data: bytes, mime_type: str, engine: str,
+                 profile: Optional[dict] = None) -> CachedSpeech:
+        """Indexes freshly synthesized audio under its request key."""
+        entry = CachedSpeech(audio_digest(data), mime_type, len(data), engine, profile)
+        self._index.put(key, entry)
+        self._audio.put(entry.digest, data)
+        return entry
+
+    def record_hit(self, entry: CachedSpeech, written: bool) -> None:
+        with self._lock:
+            if written:
+                self.shared_hits += 1
+            else:
+                self.hits += 1
+                self.bytes_saved += entry.size_bytes
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    async def fetch(self, key: str, context: Any) -> Optional[tuple[CachedSpeech, StoredAudio]]:
+        """Resolves `key` to audio in the user's store, or None on a miss.
+
+        The user's own record of the request wins; otherwise audio produced
+        for someone else in this process is copied into the user's store.
+        """
+        request = _entry(context, STORED_KEY_STATE_PREFIX, key)
+        digest = request["digest"] if request else None
+        ref = _entry(context, STORED_AUDIO_STATE_PREFIX, digest) if digest else None
+        if ref is not None:
+            entry = CachedSpeech(
+                digest, ref["mime_type"], ref["tamanho_bytes"], ref["motor"], ref.get("perfil")
+            )
+            stored = stored_audio(context, digest)
+        else:
+            entry = self.lookup(key)
+            data = self.audio(entry.digest) if entry is not None else None
+            if data is None:
+                self.record_miss()
+                return None
+            stored = await store_audio(
+                context, data, entry.mime_type, entry.engine, key, profile=entry.profile
+            )
+        self.record_hit(entry, stored.written)
+        return entry, stored
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "entries": len(self._index),
+            "audio_bytes": self._audio.current_bytes,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.shared_hits) / lookups, 3) if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+_cache: Optional[TtsCache] = None
+
+
+def get_tts_cache() -> TtsCache:
+    """Returns the process-wide cache sized from Config."""
+    global _cache
+    if _cache is None:
+        config = Config()
+        _cache = TtsCache(config.tts_cache_max_entradas, config.tts_cache_audio_max_bytes)
+    return _cache
+
+
+def reset_tts_cache() -> None:
+    global _cache
+    _cache = None
+
+
+def tts_cache_stats() -> dict:
+    return get_tts_cache().stats()
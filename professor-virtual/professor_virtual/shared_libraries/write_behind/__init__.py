@@ -0,0 +1,13 @@
+from .write_behind import (
+    WriteBehindQueue,
+    get_write_behind_queue,
+    write_behind_stats,
+    flush_write_behind,
+)
+
+__all__ = [
+    "WriteBehindQueue",
+    "get_write_behind_queue",
+    "write_behind_stats",
+    "flush_write_behind",
+]
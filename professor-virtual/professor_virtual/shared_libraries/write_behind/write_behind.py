@@ -0,0 +1,119 @@
+"""Bounded background queue for writes that must not delay tool results."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Runs submitted writes on background workers, in submission order.
+
+    At most `max_pending` writes wait at a time; when the queue is full new
+    writes are dropped (and counted) instead of blocking the caller. Failures
+    are logged and counted in `stats()`; they never reach the submitter.
+    The queue binds to the running event loop on first use and rebinds if
+    that loop changes.
+    """
+
+    def __init__(self, name: str, max_pending: int = 256, workers: int = 1):
+        self.name = name
+        self.max_pending = max_pending
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: list[asyncio.Task] = []
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(self.max_pending)
+            self._tasks = [
+                loop.create_task(self._worker(self._queue)) for _ in range(self.workers)
+            ]
+        return self._queue
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            fn, description = await queue.get()
+            try:
+                await fn()
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning("%s: background write failed (%s): %s", self.name, description, e)
+            finally:
+                queue.task_done()
+
+    def submit(self, fn: Callable[[], Awaitable[Any]], description: str = "") -> bool:
+        """Queues `fn`; returns False if it was dropped because the queue is full."""
+        queue = self._ensure_started()
+        try:
+            queue.put_nowait((fn, description))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("%s: queue full, dropping write (%s)", self.name, description)
+            return False
+        self.submitted += 1
+        return True
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits for every queued write; False if `timeout` expired first."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning("%s: %d writes still pending at flush timeout", self.name, self.pending)
+            return False
+
+    async def close(self, timeout: Optional[float] = None) -> bool:
+        """Flushes, then stops the workers."""
+        flushed = await self.flush(timeout)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+        return flushed
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+_queues: dict[str, WriteBehindQueue] = {}
+
+
+def get_write_behind_queue(name: str, max_pending: int = 256) -> WriteBehindQueue:
+    """Process-wide queue per name (e.g. one per tool)."""
+    queue = _queues.get(name)
+    if queue is None:
+        queue = _queues[name] = WriteBehindQueue(name, max_pending)
+    return queue
+
+
+def write_behind_stats() -> dict[str, dict]:
+    return {name: queue.stats() for name, queue in _queues.items()}
+
+
+async def flush_write_behind(timeout: Optional[float] = None) -> bool:
+    """Shutdown hook: persists every queued write before the process exits."""
+    results = [await queue.close(timeout) for queue in list(_queues.values())]
+    return all(results)
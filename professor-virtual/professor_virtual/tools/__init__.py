@@ -1,4 +1,4 @@
-from .transcrever_audio import transcrever_audio
+from .transcrever_audio import transcrever_audio, transcrever_audio_avancado
 from .analisar_necessidade_visual import analisar_necessidade_visual
 from .analisar_imagem_educacional import analisar_imagem_educacional
 from .gerar_audio_tts import gerar_audio_tts
@@ -6,6 +6,7 @@ from .upload_arquivo import upload_arquivo
 
 __all__ = [
     "transcrever_audio",
+    "transcrever_audio_avancado",
     "analisar_necessidade_visual",
     "analisar_imagem_educacional",
     "gerar_audio_tts",
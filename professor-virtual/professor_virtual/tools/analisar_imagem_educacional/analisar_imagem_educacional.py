@@ -3,7 +3,6 @@
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from google.adk.tools import ToolContext
-from google import genai
 from google.genai import types
 import os
 import json
@@ -12,7 +11,22 @@ import base64
 # Nota: Certifique-se de que as seguintes dependências estejam instaladas:
 # pip install google-adk>=1.5.0 google-genai>=0.3.0 python-dotenv
 
-from dotenv import load_dotenv
+from ...shared_libraries.file_uploads import MediaTooLargeError, call_with_media
+from ...shared_libraries.genai_backend import generate_content
+from ...shared_libraries.circuit_breaker import CircuitOpenError
+from ...shared_libraries.deadline import (
+    DeadlineExceeded,
+    TurnCancelled,
+    run_within_turn,
+)
+from ...shared_libraries.single_flight import SingleFlight, make_key
+
+# Análises idênticas em andamento compartilham a mesma chamada ao modelo
+_analises_em_voo = SingleFlight("analisar_imagem_educacional")
+
+_MODELO_VISAO = 'gemini-2.5-flash'
+
+_LIMITE_INLINE_BYTES = 5 * 1024 * 1024
 
 
 @dataclass
@@ -26,21 +40,6 @@ class AnaliseImagemResult:
     sugestao_acao: Optional[str]
 
 
-def _get_genai_client():
-    """Obtém cliente genai configurado para ambiente local ou Vertex AI"""
-    # Carregar variáveis de ambiente se ainda não carregadas
-    load_dotenv()
-    
-    if os.getenv('GOOGLE_GENAI_USE_VERTEXAI') in ['1', 'True']:
-        return genai.Client(
-            vertexai=True,
-            project=os.getenv('GOOGLE_CLOUD_PROJECT'),
-            location=os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
-        )
-    else:
-        return genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
-
-
 async def analisar_imagem_educacional(nome_artefato_imagem: str, contexto_pergunta: str, tool_context: ToolContext) -> Dict[str, Any]:
     """Extrai informações educacionais relevantes de uma imagem.
     
@@ -67,17 +66,6 @@ async def analisar_imagem_educacional(nome_artefato_imagem: str, contexto_pergun
                 "qualidade_adequada": False
             }
         
-        # Validação de tamanho - mantém limite original
-        if len(imagem_bytes) > 5 * 1024 * 1024:
-            return {
-                "erro": "Imagem muito grande (máximo 5MB)", 
-                "sucesso": False, 
-                "qualidade_adequada": False
-            }
-        
-        # Configurar cliente
-        client = _get_genai_client()
-        
         # Preparar imagem para análise
         # Determinar MIME type do artifact
         mime_type = "image/jpeg"  # padrão
@@ -90,12 +78,6 @@ async def analisar_imagem_educacional(nome_artefato_imagem: str, contexto_pergun
         elif nome_artefato_imagem.lower().endswith('.webp'):
             mime_type = "image/webp"
         
-        # Criar parte da imagem
-        image_part = types.Part.from_bytes(
-            data=imagem_bytes,
-            mime_type=mime_type
-        )
-        
         # Prompt estruturado para análise educacional
         prompt = f"""Analise esta imagem do ponto de vista educacional considerando o contexto: {contexto_pergunta}
 
@@ -122,16 +104,40 @@ async def analisar_imagem_educacional(nome_artefato_imagem: str, contexto_pergun
         
         Analise cuidadosamente TODOS os elementos visuais, textos, diagramas, símbolos e contexto geral."""
         
-        # Fazer chamada para o modelo
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=[image_part, prompt],
-            config=types.GenerateContentConfig(
-                temperature=0.2,  # Baixa temperatura para análise mais precisa
-                max_output_tokens=2000,
-                response_mime_type='application/json'
+        # Fazer chamada para o modelo dentro do prazo do turno (duplicatas em voo
+        # aguardam a mesma chamada). A imagem vai inline até o limite original
+        # de 5MB; imagens maiores ou reenviadas vão uma vez pela Files API
+        # (sem Files API, como no Vertex AI, o limite de 5MB continua)
+        chave_requisicao = make_key(imagem_bytes, mime_type, _MODELO_VISAO, prompt)
+        try:
+            _, response = await call_with_media(
+                imagem_bytes,
+                mime_type,
+                _LIMITE_INLINE_BYTES,
+                lambda image_part: run_within_turn(
+                    tool_context,
+                    lambda: _analises_em_voo.do(
+                        chave_requisicao,
+                        lambda: generate_content(
+                            model=_MODELO_VISAO,
+                            contents=[image_part, prompt],
+                            config=types.GenerateContentConfig(
+                                temperature=0.2,  # Baixa temperatura para análise mais precisa
+                                max_output_tokens=2000,
+                                response_mime_type='application/json'
+                            ),
+                            hedge=True
+                        )
+                    )
+                ),
+                context=tool_context,
             )
-        )
+        except MediaTooLargeError as e:
+            return {
+                "erro": f"Imagem muito grande (máximo {e.limit_bytes // (1024 * 1024)}MB)",
+                "sucesso": False,
+                "qualidade_adequada": False
+            }
         
         # Processar resposta
         try:
@@ -208,6 +214,31 @@ async def analisar_imagem_educacional(nome_artefato_imagem: str, contexto_pergun
         
         return resultado
         
+    except CircuitOpenError as e:
+        # Modelo de visão indisponível: pede o reenvio da foto sem esperar timeout
+        tool_context.state["temp:tipo_erro"] = "processar_imagem"
+        return {
+            "erro": "Análise de imagem temporariamente indisponível.",
+            "sucesso": False,
+            "degradado": True,
+            "qualidade_adequada": False,
+            "sugestao_acao": "Peça para o aluno reenviar a foto em alguns instantes.",
+            "tentar_novamente_em_segundos": round(e.retry_after_secs)
+        }
+    except DeadlineExceeded:
+        return {
+            "erro": "A análise da imagem não terminou dentro do tempo do turno.",
+            "status": "tempo_esgotado",
+            "sucesso": False,
+            "qualidade_adequada": False
+        }
+    except TurnCancelled:
+        return {
+            "erro": "A análise da imagem foi cancelada porque o turno foi encerrado.",
+            "status": "cancelado",
+            "sucesso": False,
+            "qualidade_adequada": False
+        }
     except Exception as e:
         # Mantém estrutura de erro original
         import traceback
@@ -1,3 +1,3 @@
-from .gerar_audio_tts import gerar_audio_tts
+from .gerar_audio_tts import ErroTtsStream, gerar_audio_tts, gerar_audio_tts_stream
 
-__all__ = ["gerar_audio_tts"]
+__all__ = ["ErroTtsStream", "gerar_audio_tts", "gerar_audio_tts_stream"]
@@ -1,61 +1,320 @@
 """Ferramenta para gerar um artefato de áudio TTS a partir de um texto."""
 
-import uuid
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Iterable, Optional, Tuple, Union
 from google.adk.tools import ToolContext
-from google import genai
 from google.genai import types
+import asyncio
 import os
-import wave
-import io
 import logging
 
 # Nota: Certifique-se de que as seguintes dependências estejam instaladas:
 # pip install google-adk>=1.5.0 google-genai>=0.3.0 python-dotenv
 
-from dotenv import load_dotenv
+from ...config import Config
+from ...shared_libraries.audio import (
+    DEFAULT_PROFILE,
+    OutputProfile,
+    encode_output,
+    streaming_wav_header,
+)
+from ...shared_libraries.audio.output import CONTAINERS, SAMPLE_RATES, SAMPLE_WIDTHS
+from ...shared_libraries.genai_backend import generate_content, generate_content_stream
+from ...shared_libraries.circuit_breaker import CircuitOpenError
+from ...shared_libraries.deadline import (
+    DeadlineExceeded,
+    TurnCancelled,
+    run_within_turn,
+    stream_within_turn,
+)
+from ...shared_libraries.lru_cache import LRUCache
+from ...shared_libraries.single_flight import SingleFlight, make_key
+from ...shared_libraries.speech import (
+    get_local_tts_engine,
+    get_speech_router,
+    split_for_synthesis,
+)
+from ...shared_libraries.tts_cache import get_tts_cache, speech_key, store_audio
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+# Sínteses idênticas em andamento compartilham a mesma chamada ao modelo
+_sinteses_em_voo = SingleFlight("gerar_audio_tts")
 
-def _get_genai_client():
-    """Obtém cliente genai configurado para ambiente local ou Vertex AI"""
-    # Carregar variáveis de ambiente se ainda não carregadas
-    load_dotenv()
+_MODELO_TTS = "gemini-2.5-flash-preview-tts"
+
+_config = Config()
+
+# PCM de trechos de textos longos, por texto e voz: uma nova tentativa após
+# falha parcial só sintetiza os trechos que faltaram
+_trechos_cache = LRUCache(
+    max_bytes=_config.tts_trechos_cache_max_bytes,
+    size_fn=lambda trecho: len(trecho[0]),
+)
+
+_VOZES_VALIDAS = {
+    "Zephyr", "Puck", "Charon", "Kore", "Fenrir", "Leda", "Orus", "Aoede",
+    "Callirrhoe", "Autonoe", "Enceladus", "Iapetus", "Umbriel", "Algieba",
+    "Despina", "Erinome", "Algenib", "Rasalgethi", "Laomedeia", "Achernar",
+    "Alnilam", "Schedar", "Gacrux", "Pulcherrima", "Achird", "Zubenelgenubi",
+    "Vindemiatrix", "Sadachbia", "Sadaltager", "Sulafat"
+}
+
+
+class ErroTtsStream(Exception):
+    """Pedido de stream recusado antes do primeiro byte.
     
-    if os.getenv('GOOGLE_GENAI_USE_VERTEXAI') == 'True':
-        return genai.Client(
-            vertexai=True,
-            project=os.getenv('GOOGLE_CLOUD_PROJECT'),
-            location=os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
-        )
-    else:
-        return genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
+    `resultado` traz o mesmo retorno de erro da tool.
+    """
+
+    def __init__(self, resultado: Dict[str, Any]):
+        super().__init__(resultado["erro"])
+        self.resultado = resultado
 
 
-def _create_wav_from_pcm(pcm_data: bytes, mime_type: str = "audio/pcm") -> bytes:
-    """Converte dados PCM brutos em formato WAV
+def _create_wav_from_pcm(
+    pcm_data: Union[bytes, Iterable[bytes]],
+    rate: int = 24000,
+    channels: int = 1,
+    perfil: OutputProfile = DEFAULT_PROFILE
+) -> Tuple[bytes, OutputProfile]:
+    """Converte dados PCM brutos no áudio de saída (WAV 16-bit por padrão)
+    
+    No perfil padrão o PCM é copiado uma única vez, direto para o WAV final:
+    blocos de stream ou de trechos não são concatenados antes, e o bytes
+    devolvido segue sem cópia para o artifact (`types.Part.from_bytes`) e
+    para o cache. Outros perfis reamostram (NumPy) e recodificam o PCM.
     
     Args:
-        pcm_data: Dados PCM brutos
-        mime_type: MIME type dos dados (para futuras otimizações)
+        pcm_data: Dados PCM brutos (16-bit), inteiros ou em blocos na ordem
+        rate: Taxa de amostragem (padrão do ADK: 24kHz; ver `_taxa_do_mime`)
+        channels: Número de canais (padrão: mono)
+        perfil: Perfil de saída pedido pelo cliente
+    
+    Returns:
+        O áudio e o perfil efetivamente produzido (a taxa nunca sobe além da
+        original)
+    """
+    return encode_output(pcm_data, rate, perfil, channels), perfil.at_most(rate)
+
+
+def _validar_pedido(
+    texto: str, voz: str, perfil: OutputProfile = DEFAULT_PROFILE
+) -> Optional[Dict[str, Any]]:
+    """Retorno de erro da tool para pedidos inválidos, ou None."""
+    # Validações existentes - mantidas integralmente
+    if not texto or len(texto.strip()) == 0:
+        return {"erro": "Texto vazio fornecido", "sucesso": False}
+    
+    # Nota: A API tem limite de contexto de 32k tokens, não caracteres
+    # Removendo validação arbitrária de caracteres
+    
+    # Validar se a voz fornecida é uma voz Gemini válida
+    if voz not in _VOZES_VALIDAS:
+        return {
+            "erro": f"Voz '{voz}' não é válida. Use uma das vozes Gemini oficiais.",
+            "vozes_validas": sorted(list(_VOZES_VALIDAS)),
+            "sucesso": False
+        }
+    
+    try:
+        perfil.validate()
+    except ValueError:
+        return {
+            "erro": "Perfil de saída de áudio inválido.",
+            "taxas_validas": list(SAMPLE_RATES),
+            "bits_validos": list(SAMPLE_WIDTHS),
+            "conteineres_validos": list(CONTAINERS),
+            "sucesso": False
+        }
+    return None
+
+
+def _config_tts(voz: str) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        response_modalities=["AUDIO"],
+        speech_config=types.SpeechConfig(
+            voice_config=types.VoiceConfig(
+                prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                    voice_name=voz
+                )
+            )
+        )
+    )
+
+
+def _rotear(texto: str):
+    """Motor local configurado (ou None) e a rota escolhida para o texto.
+    
+    Frases curtas e repetidas (ou qualquer texto curto, com a cota do Gemini
+    sob pressão) são sintetizadas no motor local, se houver um.
+    """
+    motor_local = get_local_tts_engine()
+    rota = get_speech_router().route_synthesis(texto, _MODELO_TTS, motor_local is not None)
+    return motor_local, rota
+
+
+def _chave_cache(
+    texto: str, voz: str, motor: str, perfil: OutputProfile = DEFAULT_PROFILE
+) -> str:
+    """Chave do pedido; o perfil padrão mantém as chaves anteriores a ele."""
+    return speech_key(texto, voz, motor, *perfil.cache_options())
+
+
+def _motor_da_rota(motor_local, rota) -> str:
+    return motor_local.name if rota.local else _MODELO_TTS
+
+
+def _taxa_do_mime(mime_type: Optional[str], padrao: int = 24000) -> int:
+    """Taxa de amostragem de um MIME PCM como "audio/L16;codec=pcm;rate=24000"."""
+    for parametro in (mime_type or "").split(";")[1:]:
+        nome, _, valor = parametro.strip().partition("=")
+        if nome == "rate" and valor.isdigit():
+            return int(valor)
+    return padrao
+
+
+def _blocos_de_audio(resposta: types.GenerateContentResponse):
+    """Blobs de áudio de uma resposta ou de um pedaço dela em stream."""
+    if not resposta.candidates or not resposta.candidates[0].content:
+        return
+    for parte in resposta.candidates[0].content.parts or []:
+        if parte.inline_data and parte.inline_data.data:
+            yield parte.inline_data
+
+
+def _trechos_do_texto(texto: str) -> list[str]:
+    """Trechos de frases de um texto longo; vazio para textos de uma chamada só."""
+    if len(texto) < _config.tts_texto_longo_caracteres:
+        return []
+    trechos = split_for_synthesis(texto, _config.tts_trecho_max_caracteres)
+    return trechos if len(trechos) > 1 else []
+
+
+async def _sintetizar_trecho(trecho: str, voz: str, tool_context: ToolContext):
+    """PCM e MIME de um trecho, do cache de trechos ou do modelo."""
+    chave = speech_key(trecho, voz, _MODELO_TTS)
+    em_cache = _trechos_cache.get(chave)
+    if em_cache is not None:
+        return em_cache
+    resposta = await run_within_turn(
+        tool_context,
+        lambda: _sinteses_em_voo.do(
+            make_key(trecho, voz, _MODELO_TTS),
+            lambda: generate_content(
+                model=_MODELO_TTS, contents=trecho, config=_config_tts(voz)
+            )
+        )
+    )
+    blocos = list(_blocos_de_audio(resposta))
+    if not blocos:
+        raise ErroTtsStream(
+            {"erro": "Resposta do modelo não contém dados de áudio", "sucesso": False}
+        )
+    audio = (b"".join(bloco.data for bloco in blocos), blocos[0].mime_type or "audio/pcm")
+    _trechos_cache.put(chave, audio)
+    return audio
+
+
+async def _sintetizar_em_trechos(trechos: list[str], voz: str, tool_context: ToolContext):
+    """PCM e MIME de cada trecho, na ordem do texto.
+
+    Até `tts_trechos_paralelos` trechos são sintetizados ao mesmo tempo, então
+    a espera total fica perto da de um trecho, não da soma deles. Cada trecho
+    sai assim que ele e os anteriores ficam prontos.
     """
-    # Parâmetros padrão do ADK: 24kHz, 16-bit, mono
-    channels = 1
-    rate = 24000
-    sample_width = 2
+    vagas = asyncio.Semaphore(_config.tts_trechos_paralelos)
+
+    async def sintetizar(trecho: str):
+        async with vagas:
+            return await _sintetizar_trecho(trecho, voz, tool_context)
+
+    tarefas = [asyncio.ensure_future(sintetizar(trecho)) for trecho in trechos]
+    try:
+        for tarefa in tarefas:
+            yield await tarefa
+    finally:
+        # Falha, prazo esgotado ou cliente desconectado: nada fica rodando solto
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+
+async def _sintetizar_localmente(
+    motor, texto: str, tool_context: ToolContext, perfil: OutputProfile = DEFAULT_PROFILE
+):
+    """Sintetiza no motor local e devolve o áudio e o perfil; None devolve o
+    texto ao Gemini."""
+    try:
+        fala = await run_within_turn(tool_context, lambda: motor.synthesize(texto))
+    except (DeadlineExceeded, TurnCancelled):
+        raise
+    except Exception as e:
+        logger.warning(f"Motor local {motor.name} falhou, usando Gemini: {e}")
+        return None
+    return _create_wav_from_pcm(
+        fala.pcm, rate=fala.sample_rate, channels=fala.channels, perfil=perfil
+    )
+
+
+def _erro_salvar_artifact(e: ValueError) -> Dict[str, Any]:
+    return {
+        "erro": f"Erro ao salvar artifact: {e}. Artifact service não configurado?",
+        "sucesso": False
+    }
+
+
+def _resultado_tts(
+    tool_context: ToolContext,
+    texto: str,
+    voz: str,
+    armazenado,
+    motor: str,
+    roteamento: str,
+    perfil: Optional[Dict[str, Any]] = None,
+    **extras: Any
+) -> Dict[str, Any]:
+    """Registra o último áudio no estado e monta o retorno da tool."""
+    perfil = perfil or DEFAULT_PROFILE.describe()
+    # Adicionar metadados ao estado da sessão se disponível
+    if hasattr(tool_context, 'state'):
+        try:
+            tool_context.state["ultimo_audio_tts"] = {
+                "arquivo": armazenado.artifact_name,
+                "texto_original": texto[:100] + "..." if len(texto) > 100 else texto,
+                "voz_utilizada": voz,
+                "tamanho_bytes": armazenado.size_bytes,
+                "motor": motor,
+                "perfil_saida": perfil
+            }
+        except:
+            # Se falhar ao salvar estado, continua sem erro
+            pass
     
-    wav_buffer = io.BytesIO()
-    with wave.open(wav_buffer, 'wb') as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(sample_width)
-        wf.setframerate(rate)
-        wf.writeframes(pcm_data)
-    return wav_buffer.getvalue()
+    # Retornar resposta no formato original esperado
+    return {
+        "sucesso": True, 
+        "nome_artefato_gerado": armazenado.artifact_name, 
+        "tamanho_caracteres": len(texto),
+        "tamanho_bytes": armazenado.size_bytes,
+        "voz_utilizada": voz,
+        "motor": motor,
+        "roteamento": roteamento,
+        "perfil_saida": perfil,
+        "versao_artefato": armazenado.version,  # NOVO CAMPO
+        "fonte_cache": extras.pop("fonte_cache", False),
+        **extras
+    }
 
 
-async def gerar_audio_tts(texto: str, tool_context: ToolContext, voz: str = "Kore") -> Dict[str, Any]:
+async def gerar_audio_tts(
+    texto: str,
+    tool_context: ToolContext,
+    voz: str = "Kore",
+    taxa_amostragem: int = 24000,
+    bits_por_amostra: int = 16,
+    conteiner: str = "wav"
+) -> Dict[str, Any]:
     """Gera um artefato de áudio TTS a partir de um texto usando a API Gemini.
     
     Args:
@@ -67,136 +326,148 @@ async def gerar_audio_tts(texto: str, tool_context: ToolContext, voz: str = "Kor
              Erinome, Algenib, Rasalgethi, Laomedeia, Achernar, Alnilam, Schedar,
              Gacrux, Pulcherrima, Achird, Zubenelgenubi, Vindemiatrix, Sadachbia,
              Sadaltager, Sulafat
+        taxa_amostragem: Taxa máxima de amostragem em Hz (8000, 11025, 16000,
+             22050 ou 24000). Use 16000 ou menos para conexões lentas
+        bits_por_amostra: 16 (PCM linear) ou 8 (μ-law G.711, metade do tamanho)
+        conteiner: "wav" ou "au" (audio/basic)
     
     Returns:
         Dict com informações sobre o áudio gerado ou erro
     """
     try:
-        # Validações existentes - mantidas integralmente
-        if not texto or len(texto.strip()) == 0:
-            return {"erro": "Texto vazio fornecido", "sucesso": False}
-        
-        # Nota: A API tem limite de contexto de 32k tokens, não caracteres
-        # Removendo validação arbitrária de caracteres
-        
-        # Validar se a voz fornecida é uma voz Gemini válida
-        vozes_validas = {
-            "Zephyr", "Puck", "Charon", "Kore", "Fenrir", "Leda", "Orus", "Aoede",
-            "Callirrhoe", "Autonoe", "Enceladus", "Iapetus", "Umbriel", "Algieba",
-            "Despina", "Erinome", "Algenib", "Rasalgethi", "Laomedeia", "Achernar",
-            "Alnilam", "Schedar", "Gacrux", "Pulcherrima", "Achird", "Zubenelgenubi",
-            "Vindemiatrix", "Sadachbia", "Sadaltager", "Sulafat"
-        }
-        
-        if voz not in vozes_validas:
-            return {
-                "erro": f"Voz '{voz}' não é válida. Use uma das vozes Gemini oficiais.",
-                "vozes_validas": sorted(list(vozes_validas)),
-                "sucesso": False
-            }
-        
-        # Configurar cliente
-        client = _get_genai_client()
+        perfil = OutputProfile(taxa_amostragem, bits_por_amostra, conteiner)
+        erro = _validar_pedido(texto, voz, perfil)
+        if erro:
+            return erro
         
         # Usar texto diretamente (SSML não é documentado para TTS API)
         texto_processado = texto
         
         # Configuração para TTS
-        config = types.GenerateContentConfig(
-            response_modalities=["AUDIO"],
-            speech_config=types.SpeechConfig(
-                voice_config=types.VoiceConfig(
-                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                        voice_name=voz
-                    )
-                )
-            )
-        )
+        config = _config_tts(voz)
+        
+        motor_local, rota = _rotear(texto_processado)
         
-        # Gerar áudio
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-preview-tts",
-            contents=texto_processado,
-            config=config
+        # Mesmo texto, voz, rota e perfil de saída: reaproveita o áudio já
+        # guardado para o usuário (ou produzido nesta instância) sem chamar o
+        # modelo. O áudio é guardado sob esta mesma chave, mesmo quando o
+        # motor local falha e o Gemini sintetiza no lugar dele.
+        chave_cache = _chave_cache(
+            texto_processado, voz, _motor_da_rota(motor_local, rota), perfil
         )
+        cache_tts = get_tts_cache()
+        try:
+            em_cache = await cache_tts.fetch(chave_cache, tool_context)
+        except ValueError as e:
+            return _erro_salvar_artifact(e)
+        if em_cache is not None:
+            entrada, armazenado = em_cache
+            return _resultado_tts(
+                tool_context, texto, voz, armazenado, entrada.engine, rota.reason,
+                entrada.profile, fonte_cache=True
+            )
         
-        # Extrair dados do áudio
-        mime_type = 'audio/pcm'  # Valor padrão
+        saida_local = None
+        if rota.local:
+            saida_local = await _sintetizar_localmente(
+                motor_local, texto_processado, tool_context, perfil
+            )
+        trechos = [] if saida_local is not None else _trechos_do_texto(texto_processado)
         
-        if (response.candidates and 
-            len(response.candidates) > 0 and 
-            response.candidates[0].content and 
-            response.candidates[0].content.parts and 
-            len(response.candidates[0].content.parts) > 0):
-            
-            audio_part = response.candidates[0].content.parts[0]
-            
-            # Verificar se tem dados inline
-            if hasattr(audio_part, 'inline_data') and audio_part.inline_data:
-                # Dados já vêm como bytes PCM diretos
-                pcm_data = audio_part.inline_data.data
-                
-                # Verificar e capturar mime_type se disponível
-                mime_type = getattr(audio_part.inline_data, 'mime_type', 'audio/pcm')
-                
-                # Log para debug
-                logger.debug(f"Áudio recebido - MIME: {mime_type}, Tamanho: {len(pcm_data)} bytes")
-                
-                # Converter PCM para WAV (formato mais compatível)
-                wav_data = _create_wav_from_pcm(pcm_data, mime_type)
-                
-                # Usar formato WAV conforme gerado
-                audio_bytes = wav_data
-            else:
-                return {"erro": "Resposta do modelo não contém dados de áudio", "sucesso": False}
+        if saida_local is not None:
+            motor = motor_local.name
+            mime_type = "audio/pcm"
+            audio_bytes, perfil_efetivo = saida_local
+        elif trechos:
+            motor = "gemini"
+            # Texto longo: trechos de frases sintetizados em paralelo e unidos
+            # na ordem do texto em um único WAV
+            partes = [
+                parte async for parte in _sintetizar_em_trechos(trechos, voz, tool_context)
+            ]
+            mime_type = partes[0][1]
+            audio_bytes, perfil_efetivo = _create_wav_from_pcm(
+                [pcm for pcm, _ in partes], _taxa_do_mime(mime_type), perfil=perfil
+            )
         else:
-            return {"erro": "Resposta do modelo inválida ou vazia", "sucesso": False}
-        
-        # Gerar nome do artefato com extensão correta
-        nome_artefato = f"resposta_tts_{uuid.uuid4()}.wav"
+            motor = "gemini"
+            # Gerar áudio dentro do prazo do turno (duplicatas em voo aguardam a
+            # mesma chamada)
+            response = await run_within_turn(
+                tool_context,
+                lambda: _sinteses_em_voo.do(
+                    make_key(texto_processado, voz, _MODELO_TTS),
+                    lambda: generate_content(
+                        model=_MODELO_TTS,
+                        contents=texto_processado,
+                        config=config
+                    )
+                )
+            )
         
-        # Criar Part do artifact
-        audio_artifact = types.Part.from_bytes(
-            data=audio_bytes,
-            mime_type="audio/wav"
-        )
+            # Extrair dados do áudio: o modelo pode dividir o PCM em várias
+            # partes, unidas na ordem como nos trechos
+            if not (response.candidates and response.candidates[0].content
+                    and response.candidates[0].content.parts):
+                return {"erro": "Resposta do modelo inválida ou vazia", "sucesso": False}
+            blocos = list(_blocos_de_audio(response))
+            if not blocos:
+                return {"erro": "Resposta do modelo não contém dados de áudio", "sucesso": False}
+            mime_type = blocos[0].mime_type or "audio/pcm"
+            logger.debug(
+                f"Áudio recebido - MIME: {mime_type}, {len(blocos)} parte(s), "
+                f"{sum(len(bloco.data) for bloco in blocos)} bytes"
+            )
+
+            # Converter PCM para o perfil de saída (WAV 16-bit por padrão)
+            audio_bytes, perfil_efetivo = _create_wav_from_pcm(
+                [bloco.data for bloco in blocos], _taxa_do_mime(mime_type), perfil=perfil
+            )
         
-        # Salvar usando método ADK
+        # Salvar no acervo de áudio do usuário (artifact "user:", endereçado
+        # pelo conteúdo) e indexar pelo pedido para as próximas sessões
+        descricao_perfil = perfil_efetivo.describe()
         try:
-            version = await tool_context.save_artifact(
-                filename=nome_artefato,
-                artifact=audio_artifact
+            armazenado = await store_audio(
+                tool_context, audio_bytes, perfil.mime_type, motor, chave_cache,
+                profile=descricao_perfil
             )
         except ValueError as e:
-            return {
-                "erro": f"Erro ao salvar artifact: {e}. Artifact service não configurado?",
-                "sucesso": False
-            }
+            return _erro_salvar_artifact(e)
+        cache_tts.remember(
+            chave_cache, audio_bytes, perfil.mime_type, motor, descricao_perfil
+        )
         
-        # Adicionar metadados ao estado da sessão se disponível
-        if hasattr(tool_context, 'state'):
-            try:
-                tool_context.state["ultimo_audio_tts"] = {
-                    "arquivo": nome_artefato,
-                    "texto_original": texto[:100] + "..." if len(texto) > 100 else texto,
-                    "voz_utilizada": voz,
-                    "tamanho_bytes": len(audio_bytes)
-                }
-            except:
-                # Se falhar ao salvar estado, continua sem erro
-                pass
+        extras = {"trechos": len(trechos)} if trechos else {}
+        return _resultado_tts(
+            tool_context, texto, voz, armazenado, motor, rota.reason, descricao_perfil,
+            mime_type_original=mime_type,  # opcional, para debug
+            **extras
+        )
         
-        # Retornar resposta no formato original esperado
+    except ErroTtsStream as e:
+        return e.resultado
+    except CircuitOpenError as e:
+        # TTS indisponível: o agente segue com a resposta apenas em texto
         return {
-            "sucesso": True, 
-            "nome_artefato_gerado": nome_artefato, 
-            "tamanho_caracteres": len(texto),
-            "tamanho_bytes": len(audio_bytes),
-            "voz_utilizada": voz,
-            "versao_artefato": version,  # NOVO CAMPO
-            "mime_type_original": mime_type  # NOVO CAMPO (opcional, para debug)
+            "erro": "Áudio temporariamente indisponível. Responda apenas em texto.",
+            "sucesso": False,
+            "degradado": True,
+            "modo_resposta": "somente_texto",
+            "tentar_novamente_em_segundos": round(e.retry_after_secs)
+        }
+    except DeadlineExceeded:
+        return {
+            "erro": "A geração de áudio não terminou dentro do tempo do turno.",
+            "status": "tempo_esgotado",
+            "sucesso": False
+        }
+    except TurnCancelled:
+        return {
+            "erro": "A geração de áudio foi cancelada porque o turno foi encerrado.",
+            "status": "cancelado",
+            "sucesso": False
         }
-        
     except Exception as e:
         # Log detalhado para debug em desenvolvimento
         import traceback
@@ -210,4 +481,115 @@ async def gerar_audio_tts(texto: str, tool_context: ToolContext, voz: str = "Kor
         if os.getenv('DEBUG') == 'True':
             error_details["traceback"] = traceback.format_exc()
         
-        return error_details
\ No newline at end of file
+        return error_details
+
+
+async def gerar_audio_tts_stream(
+    texto: str,
+    tool_context: ToolContext,
+    voz: str = "Kore",
+    resultado: Optional[Dict[str, Any]] = None,
+    perfil: OutputProfile = DEFAULT_PROFILE
+) -> AsyncIterator[bytes]:
+    """Versão em stream de `gerar_audio_tts`, para o frontend.
+    
+    Produz um cabeçalho WAV de tamanho indefinido e, em seguida, os blocos PCM
+    conforme o modelo os envia: o áudio começa a tocar na primeira sílaba, não
+    ao fim da síntese. Ao final, o áudio completo é salvo como na tool (acervo
+    do usuário e cache) e `resultado`, se passado, recebe o mesmo retorno da
+    tool. Textos longos saem trecho a trecho, sintetizados em paralelo. Áudio
+    em cache ou do motor local sai de uma vez, assim como qualquer `perfil`
+    diferente do padrão: a reamostragem e o μ-law precisam do PCM inteiro.
+    
+    Raises:
+        ErroTtsStream: pedido inválido, antes de qualquer byte.
+        CircuitOpenError, DeadlineExceeded, TurnCancelled e erros do modelo.
+    """
+    erro = _validar_pedido(texto, voz, perfil)
+    if erro:
+        raise ErroTtsStream(erro)
+    if resultado is None:
+        resultado = {}
+    progressivo = perfil.is_default
+    
+    motor_local, rota = _rotear(texto)
+    cache_tts = get_tts_cache()
+    chave_cache = _chave_cache(texto, voz, _motor_da_rota(motor_local, rota), perfil)
+    em_cache = await cache_tts.fetch(chave_cache, tool_context)
+    if em_cache is not None:
+        entrada, armazenado = em_cache
+        artifact = await tool_context.load_artifact(
+            armazenado.artifact_name, version=armazenado.version
+        )
+        if artifact is not None and artifact.inline_data:
+            yield artifact.inline_data.data
+            resultado.update(_resultado_tts(
+                tool_context, texto, voz, armazenado, entrada.engine, rota.reason,
+                entrada.profile, fonte_cache=True
+            ))
+            return
+    
+    saida_local = None
+    if rota.local:
+        saida_local = await _sintetizar_localmente(motor_local, texto, tool_context, perfil)
+    trechos = [] if saida_local is not None else _trechos_do_texto(texto)
+    if saida_local is not None:
+        motor, mime_type = motor_local.name, "audio/pcm"
+        audio_bytes, perfil_efetivo = saida_local
+        yield audio_bytes
+    elif trechos:
+        motor, mime_type = "gemini", None
+        blocos = []
+        async for pcm, mime_trecho in _sintetizar_em_trechos(trechos, voz, tool_context):
+            if mime_type is None:
+                mime_type = mime_trecho
+                if progressivo:
+                    yield streaming_wav_header(_taxa_do_mime(mime_type))
+            blocos.append(pcm)
+            if progressivo:
+                yield pcm
+        audio_bytes, perfil_efetivo = _create_wav_from_pcm(
+            blocos, _taxa_do_mime(mime_type), perfil=perfil
+        )
+        if not progressivo:
+            yield audio_bytes
+    else:
+        motor, mime_type = "gemini", None
+        blocos = []
+        async for resposta in stream_within_turn(
+            tool_context,
+            lambda: generate_content_stream(
+                model=_MODELO_TTS, contents=texto, config=_config_tts(voz)
+            )
+        ):
+            for bloco in _blocos_de_audio(resposta):
+                if mime_type is None:
+                    # O cabeçalho sai com o primeiro bloco, quando a taxa é conhecida
+                    mime_type = bloco.mime_type or "audio/pcm"
+                    if progressivo:
+                        yield streaming_wav_header(_taxa_do_mime(mime_type))
+                blocos.append(bloco.data)
+                if progressivo:
+                    yield bloco.data
+        if mime_type is None:
+            raise ErroTtsStream(
+                {"erro": "Resposta do modelo não contém dados de áudio", "sucesso": False}
+            )
+        audio_bytes, perfil_efetivo = _create_wav_from_pcm(
+            blocos, _taxa_do_mime(mime_type), perfil=perfil
+        )
+        if not progressivo:
+            yield audio_bytes
+    
+    # Áudio completo: salvo e indexado exatamente como na tool
+    descricao_perfil = perfil_efetivo.describe()
+    armazenado = await store_audio(
+        tool_context, audio_bytes, perfil.mime_type, motor, chave_cache,
+        profile=descricao_perfil
+    )
+    cache_tts.remember(chave_cache, audio_bytes, perfil.mime_type, motor, descricao_perfil)
+    extras = {"trechos": len(trechos)} if trechos else {}
+    resultado.update(_resultado_tts(
+        tool_context, texto, voz, armazenado, motor, rota.reason, descricao_perfil,
+        mime_type_original=mime_type, stream=True, **extras
+    ))
@@ -1,3 +1,15 @@
-from .transcrever_audio import transcrever_audio
+from .transcrever_audio import (
+    transcrever_audio,
+    transcrever_audio_avancado,
+    transcrever_audio_avancado_stream,
+    transcrever_bytes,
+    transcrever_segmentos,
+)
 
-__all__ = ["transcrever_audio"]
+__all__ = [
+    "transcrever_audio",
+    "transcrever_audio_avancado",
+    "transcrever_audio_avancado_stream",
+    "transcrever_bytes",
+    "transcrever_segmentos",
+]
@@ -1,22 +1,95 @@
 """Ferramenta para transcrever áudio para texto usando Google ADK e Gemini."""
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, Optional
 from google.adk.tools import ToolContext
-from google import genai
 from google.genai import types
 from pydantic import BaseModel
-import os
+import asyncio
 import json
 import hashlib
+import struct
+import time
+import uuid
 from datetime import datetime
 import logging
 
+from ...config import Config
+from ...shared_libraries.audio import (
+    QualityThresholds,
+    WavFormatError,
+    analyze_quality,
+    decode_wav,
+    downmix,
+    encode_wav,
+    has_speech,
+    is_wav,
+    is_webm,
+    preprocess_for_transcription,
+    probe_audio,
+    resample,
+    split_at_silence,
+    WebmError,
+    webm_to_ogg_opus,
+)
+from ...shared_libraries.file_uploads import MediaTooLargeError, call_with_media
+from ...shared_libraries.genai_backend import generate_content
+from ...shared_libraries.lru_cache import LRUCache
+from ...shared_libraries.circuit_breaker import CircuitOpenError
+from ...shared_libraries.deadline import (
+    DeadlineExceeded,
+    TurnCancelled,
+    run_within_turn,
+)
+from ...shared_libraries.single_flight import SingleFlight, make_key
+from ...shared_libraries.speech import get_local_stt_engine, get_speech_router
+from ...shared_libraries.write_behind import get_write_behind_queue
+
 # Configurar logging
 logger = logging.getLogger(__name__)
 
-# Cache simples para transcrições
-_transcription_cache = {}
-_cache_max_size = 50
+_config = Config()
+
+# Cache LRU de transcrições por hash do áudio (O(1), limitado por bytes e TTL)
+_transcription_cache = LRUCache(
+    max_bytes=_config.transcricao_cache_max_bytes,
+    ttl_secs=_config.transcricao_cache_ttl_secs,
+)
+
+# Limites do portão de qualidade aplicado antes da chamada ao modelo
+_limites_qualidade = QualityThresholds(
+    min_duration_secs=_config.transcricao_min_duracao_secs,
+    min_rms_db=_config.transcricao_min_rms_db,
+    max_clipping_ratio=_config.transcricao_max_clipping,
+    min_speech_fraction=_config.transcricao_min_fracao_fala,
+)
+
+_PROBLEMAS_AUDIO = {
+    "empty": "o áudio está vazio",
+    "too_short": "o áudio é curto demais",
+    "too_quiet": "o volume está muito baixo",
+    "clipped": "o áudio está distorcido (volume alto demais)",
+    "no_speech": "não foi detectada fala",
+}
+
+# Gravação dos artifacts de transcrição fora do caminho crítico
+_fila_persistencia = get_write_behind_queue(
+    "transcricoes", _config.transcricao_persistencia_fila_max
+)
+
+# Transcrições idênticas em andamento compartilham a mesma chamada ao modelo
+_transcricoes_em_voo = SingleFlight("transcrever_audio")
+
+_MODELO_TRANSCRICAO = 'gemini-2.5-flash'  # Modelo compatível com transcrição de áudio.
+
+# Limite de dados inline por requisição; acima disso o áudio vai pela Files API
+_LIMITE_INLINE_BYTES = 20 * 1024 * 1024
+
+# Orçamento de tokens: o Gemini cobra 32 tokens por segundo de áudio de
+# entrada; a fala transcrita rende bem menos que isso na saída.
+_TOKENS_AUDIO_POR_SEGUNDO = 32
+_TOKENS_SAIDA_POR_SEGUNDO = 8
+_TOKENS_SAIDA_MINIMO = 512
+_TOKENS_SAIDA_MAXIMO = 8000
 
 
 # Schema para resposta estruturada do Gemini
@@ -32,33 +105,241 @@ class TranscricaoGeminiResponse(BaseModel):
     observacoes: str = ""
 
 
-def _get_genai_client():
-    """Obtém cliente genai configurado para ambiente local ou Vertex AI."""
-    if os.getenv('GOOGLE_GENAI_USE_VERTEXAI') == 'True':
-        return genai.Client(
-            vertexai=True,
-            project=os.getenv('GOOGLE_CLOUD_PROJECT'),
-            location=os.getenv('GOOGLE_CLOUD_LOCATION', 'us-central1')
-        )
-    else:
-        return genai.Client(api_key=os.getenv('GOOGLE_API_KEY'))
-
-
 def _get_audio_hash(audio_bytes: bytes) -> str:
     """Gera hash único para o áudio (usado no cache)."""
     return hashlib.md5(audio_bytes).hexdigest()
 
 
-def _limpar_cache_se_necessario():
-    """Remove entradas antigas do cache se ultrapassar o limite."""
-    global _transcription_cache
-    if len(_transcription_cache) > _cache_max_size:
-        # Remove 20% das entradas mais antigas
-        items = sorted(_transcription_cache.items(), 
-                      key=lambda x: x[1].get('timestamp', 0))
-        remove_count = int(_cache_max_size * 0.2)
-        for key, _ in items[:remove_count]:
-            del _transcription_cache[key]
+async def transcrever_bytes(
+    audio_bytes: bytes,
+    mime_type: str,
+    contexto: Any = None
+) -> Dict[str, Any]:
+    """Núcleo da transcrição, sem dependência de ToolContext.
+    
+    Valida formato e duração, consulta o cache, pré-processa, aplica o
+    portão de qualidade e chama o modelo. Usado pela tool e pelo modo em
+    lote (`professor_virtual.batch`).
+    
+    Args:
+        audio_bytes: Conteúdo do áudio
+        mime_type: MIME type declarado do áudio
+        contexto: Contexto do turno (limita a chamada ao prazo), opcional
+    
+    Returns:
+        Dict no mesmo formato da tool (sem os campos de persistência)
+    
+    Raises:
+        CircuitOpenError, DeadlineExceeded, TurnCancelled e erros do modelo.
+    """
+    # Validar formato
+    formato = _formato_do_mime(mime_type)
+    formatos_suportados = [
+        "wav", "mp3", "m4a", "ogg", "flac", "aac", "mpeg", "aiff", "webm", "opus"
+    ]
+    
+    if formato not in formatos_suportados:
+        return {
+            "sucesso": False,
+            "erro": f"Formato '{formato}' não suportado. Use: {', '.join(formatos_suportados)}"
+        }
+    
+    # Metadados exatos do cabeçalho (sem decodificar o arquivo)
+    info_audio = probe_audio(audio_bytes)
+    duracao_cabecalho = info_audio.duration_secs if info_audio else None
+    if duracao_cabecalho and duracao_cabecalho > _config.transcricao_max_duracao_secs:
+        return {
+            "sucesso": False,
+            "erro": (
+                f"Áudio muito longo ({duracao_cabecalho:.0f}s). "
+                f"Máximo: {_config.transcricao_max_duracao_secs:.0f}s."
+            ),
+            "sugestao": "Peça para o aluno gravar uma pergunta mais curta.",
+            "audio": info_audio.to_dict()
+        }
+    
+    # Verificar cache
+    audio_hash = _get_audio_hash(audio_bytes)
+    cached = _transcription_cache.get(audio_hash)
+    if cached is not None:
+        cached = cached.copy()
+        cached["fonte_cache"] = True
+        return cached
+    
+    # Reduzir o payload (mono, 16kHz, sem silêncio nas pontas) e medir a
+    # qualidade fora do event loop; formatos comprimidos seguem como vieram.
+    # Sem pré-processamento, o portão de qualidade roda mesmo assim.
+    preprocessado = None
+    if _config.transcricao_preprocessamento:
+        preprocessado = await asyncio.to_thread(
+            preprocess_for_transcription,
+            audio_bytes,
+            _config.transcricao_sample_rate,
+            thresholds=_limites_qualidade,
+        )
+        qualidade = preprocessado.quality if preprocessado else None
+    else:
+        qualidade = await asyncio.to_thread(_qualidade_do_wav, audio_bytes)
+    
+    # Gravação inutilizável: pedir para repetir sem gastar uma chamada
+    if qualidade and not qualidade.usable:
+        return _resultado_audio_inutilizavel(qualidade)
+    audio_envio, mime_envio = (
+        (preprocessado.data, preprocessado.mime_type)
+        if preprocessado else (audio_bytes, mime_type)
+    )
+    
+    # Duração exata: do WAV decodificado ou do cabeçalho do contêiner
+    if preprocessado:
+        duracao_segundos = preprocessado.original_secs
+        duracao_enviada = preprocessado.processed_secs
+    else:
+        duracao_segundos = duracao_enviada = duracao_cabecalho or 0.0
+    
+    # Gravações curtas (ou todas até um limite, com a cota do Gemini sob
+    # pressão) vão ao motor local, se houver um configurado
+    motor_local = get_local_stt_engine()
+    rota = get_speech_router().route_transcription(
+        duracao_enviada, _MODELO_TRANSCRICAO, motor_local is not None
+    )
+    transcricao_local = None
+    if rota.local:
+        transcricao_local = await _transcrever_localmente(
+            motor_local, audio_envio, mime_envio, contexto
+        )
+    
+    audio_part = None
+    if transcricao_local is not None:
+        texto_transcrito, idioma_detectado, confianca, observacoes = transcricao_local
+    else:
+        if is_webm(audio_bytes):
+            # WebM/Opus do navegador: os pacotes Opus são copiados para Ogg,
+            # que o Gemini aceita, sem transcodificar
+            try:
+                audio_envio = await asyncio.to_thread(webm_to_ogg_opus, audio_bytes)
+                mime_envio = "audio/ogg"
+            except WebmError as e:
+                logger.warning(f"WebM não reempacotado, enviando como veio: {e}")
+        elif formato == "opus":
+            mime_envio = "audio/ogg"
+        
+        # Criar Part do áudio: inline até 20MB; acima disso, ou quando o mesmo
+        # áudio é reenviado, vai uma vez pela Files API e é referenciado pela
+        # URI (sem Files API, como no Vertex AI, o limite de 20MB continua).
+        # Fazer transcrição usando método correto, limitada ao prazo do turno.
+        # Requisições duplicadas em voo (reenvio do frontend, tool chamada de
+        # novo) aguardam a mesma chamada.
+        try:
+            audio_part, response = await call_with_media(
+                audio_envio,
+                mime_envio,
+                _LIMITE_INLINE_BYTES,
+                lambda parte: run_within_turn(
+                    contexto,
+                    lambda: _chamar_modelo(audio_hash, parte, _montar_prompt(), duracao_enviada)
+                ),
+                context=contexto,
+            )
+        except MediaTooLargeError as e:
+            return {
+                "sucesso": False,
+                "erro": (
+                    f"Arquivo muito grande ({e.size_bytes / (1024 * 1024):.1f}MB). "
+                    f"Máximo: {e.limit_bytes // (1024 * 1024)}MB."
+                ),
+                "sugestao": "Peça para o aluno gravar uma pergunta mais curta."
+            }
+        
+        # Processar resposta
+        texto_transcrito, idioma_detectado, confianca, observacoes = _interpretar_resposta(response)
+    
+    # Calcular estatísticas
+    palavras = len(texto_transcrito.split())
+    caracteres = len(texto_transcrito)
+    
+    # Preparar resultado compatível
+    resultado = {
+        # Campos obrigatórios para compatibilidade
+        "sucesso": True,
+        "texto": texto_transcrito,
+        
+        # Metadados compatíveis com implementação anterior
+        "duracao_segundos": round(duracao_segundos, 1),
+        "formato": formato,
+        "tamanho_bytes": len(audio_bytes),
+        "idioma_detectado": idioma_detectado,
+        "tokens_audio_estimados": (
+            round(duracao_enviada * _TOKENS_AUDIO_POR_SEGUNDO) if audio_part else 0
+        ),
+        "envio": (
+            "local" if audio_part is None
+            else "files_api" if audio_part.file_data else "inline"
+        ),
+        "motor": motor_local.name if audio_part is None else "gemini",
+        "roteamento": rota.reason,
+        
+        # Estatísticas adicionais
+        "estatisticas": {
+            "total_palavras": palavras,
+            "total_caracteres": caracteres,
+            "palavras_por_minuto": round((palavras / duracao_segundos) * 60) if duracao_segundos > 0 else 0
+        },
+        
+        # Qualidade da transcrição
+        "qualidade": {
+            "confianca": confianca,
+            "observacoes": observacoes
+        }
+    }
+    
+    if info_audio:
+        resultado["audio"] = info_audio.to_dict()
+    
+    if preprocessado:
+        resultado["preprocessamento"] = {
+            "bytes_enviados": len(preprocessado.data),
+            "bytes_economizados": preprocessado.bytes_saved,
+            "segundos_enviados": round(preprocessado.processed_secs, 1),
+            "segundos_economizados": round(preprocessado.secs_saved, 1),
+            "sample_rate": preprocessado.sample_rate,
+        }
+    
+    # Adicionar ao cache (evicção LRU automática pelo orçamento de bytes)
+    _transcription_cache.put(audio_hash, resultado.copy())
+    
+    return resultado
+
+
+async def _transcrever_localmente(motor, audio: bytes, mime_type: str, contexto: Any):
+    """Transcreve no motor local; None devolve o áudio para o Gemini.
+    
+    Falhas do motor (pacote ou modelo ausente, erro de decodificação) e
+    transcrições vazias não derrubam a tool: o Gemini fica com o caso.
+    """
+    try:
+        transcricao = await run_within_turn(
+            contexto, lambda: motor.transcribe(audio, mime_type, language="pt")
+        )
+    except (DeadlineExceeded, TurnCancelled):
+        raise
+    except Exception as e:
+        logger.warning(f"Motor local {motor.name} falhou, usando Gemini: {e}")
+        return None
+    if not transcricao.text:
+        return None
+    
+    if transcricao.confidence is None:
+        confianca = "media"
+    elif transcricao.confidence >= 0.8:
+        confianca = "alta"
+    elif transcricao.confidence >= 0.5:
+        confianca = "media"
+    else:
+        confianca = "baixa"
+    idioma = transcricao.language or "pt-BR"
+    if idioma == "pt":
+        idioma = "pt-BR"
+    return transcricao.text, idioma, confianca, ""
 
 
 async def transcrever_audio(
@@ -98,158 +379,196 @@ async def transcrever_audio(
                 "erro": "Não foi possível extrair dados de áudio do artefato."
             }
         
-        # Validar formato
-        formato = mime_type.split('/')[-1] if '/' in mime_type else "desconhecido"
-        formatos_suportados = ["wav", "mp3", "m4a", "ogg", "flac", "aac", "mpeg", "aiff"]
+        resultado = await transcrever_bytes(audio_bytes, mime_type, tool_context)
         
-        if formato not in formatos_suportados:
-            return {
-                "sucesso": False,
-                "erro": f"Formato '{formato}' não suportado. Use: {', '.join(formatos_suportados)}"
-            }
-        
-        # Validar tamanho (20MB limite para inline data)
-        tamanho_mb = len(audio_bytes) / (1024 * 1024)
-        if tamanho_mb > 20:
-            return {
-                "sucesso": False,
-                "erro": f"Arquivo muito grande ({tamanho_mb:.1f}MB). Máximo: 20MB.",
-                "sugestao": "Use a Files API para arquivos grandes."
-            }
+        if resultado.get("status") == "audio_inutilizavel":
+            tool_context.state["temp:tipo_erro"] = "entender_audio"
         
-        # Verificar cache
-        audio_hash = _get_audio_hash(audio_bytes)
-        if audio_hash in _transcription_cache:
-            cached = _transcription_cache[audio_hash].copy()
-            cached["fonte_cache"] = True
-            return cached
+        # Persistir transcrição como artifact (fora do caminho crítico por padrão)
+        if resultado.get("sucesso") and not resultado.get("fonte_cache"):
+            resultado.update(await _persistir_transcricao(tool_context, resultado["texto"]))
         
-        # Configurar cliente Gemini
-        client = _get_genai_client()
+        return resultado
         
-        # Criar Part do áudio (método correto da documentação)
-        audio_part = types.Part.from_bytes(
-            data=audio_bytes,
-            mime_type=mime_type
-        )
+    except CircuitOpenError as e:
+        # Modelo indisponível: responde rápido pedindo para repetir mais tarde
+        logger.warning(f"Transcrição em modo degradado: {e}")
+        tool_context.state["temp:tipo_erro"] = "entender_audio"
+        return {
+            "sucesso": False,
+            "degradado": True,
+            "erro": "Serviço de transcrição temporariamente indisponível.",
+            "sugestao": "Peça para o aluno repetir a pergunta em instantes ou digitá-la.",
+            "tentar_novamente_em_segundos": round(e.retry_after_secs)
+        }
+    except DeadlineExceeded as e:
+        logger.warning(f"Transcrição excedeu o prazo do turno: {e}")
+        return {
+            "sucesso": False,
+            "status": "tempo_esgotado",
+            "erro": "A transcrição não terminou dentro do tempo do turno."
+        }
+    except TurnCancelled as e:
+        logger.info(f"Transcrição cancelada: {e}")
+        return {
+            "sucesso": False,
+            "status": "cancelado",
+            "erro": "A transcrição foi cancelada porque o turno foi encerrado."
+        }
+    except Exception as e:
+        logger.error(f"Erro na transcrição: {str(e)}", exc_info=True)
         
-        # Prompt em português para transcrição
-        prompt = """Transcreva o áudio a seguir para português brasileiro.
+        return {
+            "sucesso": False,
+            "erro": f"Erro ao transcrever áudio: {str(e)}",
+            "detalhes_erro": {
+                "tipo": type(e).__name__,
+                "mensagem": str(e)
+            }
+        }
+
+
+def _nome_arquivo_transcricao() -> str:
+    """Nome único mesmo para transcrições salvas no mesmo segundo."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"transcricao_{timestamp}_{uuid.uuid4().hex[:8]}.txt"
+
+
+async def _persistir_transcricao(tool_context: ToolContext, texto: str) -> Dict[str, Any]:
+    """Salva a transcrição como artifact conforme `Config.transcricao_persistencia`.
+    
+    - "background": agenda a gravação na fila write-behind e retorna na hora
+      com `arquivo_agendado`; falhas vão para as métricas da fila.
+    - "sync": aguarda a gravação e retorna `arquivo_salvo` e `versao`.
+    - "off": não salva.
+    
+    Falhas nunca interrompem a tool.
+    """
+    modo = _config.transcricao_persistencia
+    if modo == "off" or not texto:
+        return {}
+    filename = _nome_arquivo_transcricao()
+    transcript_artifact = types.Part.from_text(text=texto)
+    
+    if modo == "sync":
+        try:
+            versao_salva = await tool_context.save_artifact(filename, transcript_artifact)
+            return {"arquivo_salvo": filename, "versao": versao_salva}
+        except Exception as e:
+            logger.warning(f"Não foi possível salvar transcrição: {e}")
+            return {}
+    
+    agendado = _fila_persistencia.submit(
+        lambda: tool_context.save_artifact(filename, transcript_artifact),
+        filename
+    )
+    return {"arquivo_agendado": filename} if agendado else {}
+
+
+def _montar_prompt(idioma: str = "pt-BR", identificar_falantes: bool = True) -> str:
+    """Prompt de transcrição com resposta estruturada em JSON."""
+    destino = "português brasileiro" if idioma == "pt-BR" else idioma
+    prompt = f"""Transcreva o áudio a seguir para {destino}.
 
 Forneça a resposta APENAS em formato JSON com:
-{
+{{
   "transcricao": "texto completo transcrito",
   "idioma_detectado": "código do idioma (pt-BR, en-US, etc)",
   "confianca": "alta, media ou baixa",
   "observacoes": "qualquer observação relevante"
-}
+}}"""
+    if identificar_falantes:
+        prompt += """
 
 Se houver múltiplos falantes, indique com "Falante 1:", "Falante 2:", etc."""
-        
-        # Fazer transcrição usando método correto
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',  # Modelo compatível com transcrição de áudio.
+    return prompt
+
+
+async def _chamar_modelo(
+    audio_hash: str,
+    audio_part: types.Part,
+    prompt: str,
+    duracao_segundos: float
+) -> types.GenerateContentResponse:
+    """Chamada de transcrição com orçamento de saída e coalescência em voo."""
+    max_tokens_saida = _orcamento_tokens_saida(duracao_segundos)
+    midia = audio_part.inline_data or audio_part.file_data
+    mime_type = midia.mime_type if midia else ""
+    chave_requisicao = make_key(
+        audio_hash, mime_type, _MODELO_TRANSCRICAO, prompt, max_tokens_saida
+    )
+    return await _transcricoes_em_voo.do(
+        chave_requisicao,
+        lambda: generate_content(
+            model=_MODELO_TRANSCRICAO,
             contents=[prompt, audio_part],
             config=types.GenerateContentConfig(
                 temperature=0.1,
-                max_output_tokens=8000,
+                max_output_tokens=max_tokens_saida,
                 response_mime_type='application/json',
                 response_schema=TranscricaoGeminiResponse
+            ),
+            hedge=True
+        )
+    )
+
+
+def _interpretar_resposta(response) -> tuple[str, str, str, str]:
+    """Extrai (texto, idioma, confiança, observações) da resposta do modelo."""
+    try:
+        # Usar response.parsed para obter objeto Pydantic validado
+        if hasattr(response, 'parsed') and response.parsed:
+            gemini_response = response.parsed
+            return (
+                gemini_response.transcricao,
+                gemini_response.idioma_detectado,
+                gemini_response.confianca,
+                gemini_response.observacoes,
             )
+        # Fallback para parsing manual se parsed não estiver disponível
+        resultado_json = json.loads(response.text)
+        return (
+            resultado_json.get("transcricao", ""),
+            resultado_json.get("idioma_detectado", "pt-BR"),
+            resultado_json.get("confianca", "media"),
+            resultado_json.get("observacoes", ""),
         )
-        
-        # Processar resposta
-        try:
-            # Usar response.parsed para obter objeto Pydantic validado
-            if hasattr(response, 'parsed') and response.parsed:
-                gemini_response = response.parsed
-                texto_transcrito = gemini_response.transcricao
-                idioma_detectado = gemini_response.idioma_detectado
-                confianca = gemini_response.confianca
-                observacoes = gemini_response.observacoes
-            else:
-                # Fallback para parsing manual se parsed não estiver disponível
-                resultado_json = json.loads(response.text)
-                texto_transcrito = resultado_json.get("transcricao", "")
-                idioma_detectado = resultado_json.get("idioma_detectado", "pt-BR")
-                confianca = resultado_json.get("confianca", "media")
-                observacoes = resultado_json.get("observacoes", "")
-        except (json.JSONDecodeError, AttributeError) as e:
-            # Fallback se resposta não for estruturada
-            logger.warning(f"Resposta não estruturada do modelo: {e}")
-            texto_transcrito = response.text
-            idioma_detectado = "desconhecido"
-            confianca = "baixa"
-            observacoes = "Resposta não estruturada do modelo"
-        
-        # Calcular estatísticas
-        palavras = len(texto_transcrito.split())
-        caracteres = len(texto_transcrito)
-        
-        # Estimar duração baseada no tamanho e formato
-        duracao_segundos = _estimar_duracao(audio_bytes, formato)
-        
-        # Salvar transcrição como artifact (opcional)
-        arquivo_salvo = None
-        versao_salva = None
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            transcript_artifact = types.Part.from_text(text=texto_transcrito)
-            filename = f"transcricao_{timestamp}.txt"
-            versao_salva = await tool_context.save_artifact(filename, transcript_artifact)
-            arquivo_salvo = filename
-        except Exception as e:
-            logger.warning(f"Não foi possível salvar transcrição: {e}")
-        
-        # Preparar resultado compatível
-        resultado = {
-            # Campos obrigatórios para compatibilidade
-            "sucesso": True,
-            "texto": texto_transcrito,
-            
-            # Metadados compatíveis com implementação anterior
-            "duracao_segundos": round(duracao_segundos, 1),
-            "formato": formato,
-            "tamanho_bytes": len(audio_bytes),
-            "idioma_detectado": idioma_detectado,
-            
-            # Estatísticas adicionais
-            "estatisticas": {
-                "total_palavras": palavras,
-                "total_caracteres": caracteres,
-                "palavras_por_minuto": round((palavras / duracao_segundos) * 60) if duracao_segundos > 0 else 0
-            },
-            
-            # Qualidade da transcrição
-            "qualidade": {
-                "confianca": confianca,
-                "observacoes": observacoes
-            }
-        }
-        
-        # Adicionar campos opcionais se disponíveis
-        if arquivo_salvo and versao_salva:
-            resultado["arquivo_salvo"] = arquivo_salvo
-            resultado["versao"] = versao_salva
-        
-        # Adicionar ao cache
-        _limpar_cache_se_necessario()
-        _transcription_cache[audio_hash] = resultado.copy()
-        _transcription_cache[audio_hash]["timestamp"] = datetime.now().timestamp()
-        
-        return resultado
-        
-    except Exception as e:
-        logger.error(f"Erro na transcrição: {str(e)}", exc_info=True)
-        
-        return {
-            "sucesso": False,
-            "erro": f"Erro ao transcrever áudio: {str(e)}",
-            "detalhes_erro": {
-                "tipo": type(e).__name__,
-                "mensagem": str(e)
-            }
-        }
+    except (json.JSONDecodeError, AttributeError) as e:
+        # Fallback se resposta não for estruturada
+        logger.warning(f"Resposta não estruturada do modelo: {e}")
+        return response.text, "desconhecido", "baixa", "Resposta não estruturada do modelo"
+
+
+def _qualidade_do_wav(audio_bytes: bytes):
+    """Relatório do portão de qualidade de um WAV; None se não decodificável."""
+    if not is_wav(audio_bytes):
+        return None
+    try:
+        samples, sample_rate = decode_wav(audio_bytes)
+    except (WavFormatError, struct.error) as e:
+        logger.debug(f"WAV não decodificável, sem portão de qualidade: {e}")
+        return None
+    return analyze_quality(downmix(samples), sample_rate, _limites_qualidade)
+
+
+def _resultado_audio_inutilizavel(qualidade) -> Dict[str, Any]:
+    """Resposta estruturada de "repita, por favor" para áudio rejeitado localmente."""
+    motivos = [_PROBLEMAS_AUDIO.get(p, p) for p in qualidade.problems]
+    logger.info(f"Áudio rejeitado pelo portão de qualidade: {qualidade.problems}")
+    return {
+        "sucesso": False,
+        "status": "audio_inutilizavel",
+        "erro": f"Não foi possível entender o áudio: {', '.join(motivos)}.",
+        "sugestao": "Peça para o aluno gravar a pergunta de novo, mais perto do microfone e em um lugar silencioso.",
+        "problemas": qualidade.problems,
+        "qualidade_audio": qualidade.to_dict(),
+    }
+
+
+def _formato_do_mime(mime_type: str) -> str:
+    """'audio/webm;codecs=opus' -> 'webm'."""
+    base = mime_type.split(';')[0].strip().lower()
+    return base.split('/')[-1] if '/' in base else "desconhecido"
 
 
 def _extrair_dados_do_artifact(artifact) -> tuple[bytes, str]:
@@ -273,6 +592,12 @@ def _extrair_dados_do_artifact(artifact) -> tuple[bytes, str]:
             # Tentar detectar formato pelos magic bytes
             if artifact[:4] == b'RIFF':
                 return artifact, 'audio/wav'
+            elif is_webm(artifact):
+                return artifact, 'audio/webm'
+            elif artifact[:4] == b'OggS':
+                return artifact, 'audio/ogg'
+            elif artifact[:4] == b'fLaC':
+                return artifact, 'audio/flac'
             elif artifact[:3] == b'ID3' or artifact[:2] == b'\xff\xfb':
                 return artifact, 'audio/mpeg'
             else:
@@ -303,24 +628,308 @@ async def _buscar_audio_na_mensagem(tool_context: ToolContext) -> Optional[Any]:
     return None
 
 
-def _estimar_duracao(audio_bytes: bytes, formato: str) -> float:
-    """Estima duração do áudio baseada no tamanho e formato."""
-    # Estimativas baseadas em bitrates típicos
-    estimativas = {
-        "mp3": (len(audio_bytes) * 8) / (128 * 1000),      # 128kbps
-        "mpeg": (len(audio_bytes) * 8) / (128 * 1000),     # 128kbps
-        "wav": len(audio_bytes) / (44100 * 2 * 2),         # 44.1kHz, 16-bit, stereo
-        "m4a": (len(audio_bytes) * 8) / (96 * 1000),       # 96kbps
-        "aac": (len(audio_bytes) * 8) / (128 * 1000),      # 128kbps
-        "ogg": (len(audio_bytes) * 8) / (160 * 1000),      # 160kbps
-        "flac": len(audio_bytes) / (44100 * 2 * 2 * 0.6),  # ~60% compressão
-        "aiff": len(audio_bytes) / (44100 * 2 * 2),        # 44.1kHz, 16-bit, stereo (similar ao WAV)
-    }
+def _orcamento_tokens_saida(duracao_segundos: float) -> int:
+    """Limite de tokens de saída proporcional à duração (teto quando desconhecida)."""
+    if duracao_segundos <= 0:
+        return _TOKENS_SAIDA_MAXIMO
+    estimado = _TOKENS_SAIDA_MINIMO + int(duracao_segundos * _TOKENS_SAIDA_POR_SEGUNDO)
+    return min(estimado, _TOKENS_SAIDA_MAXIMO)
+
+
+def _decodificar_mono(audio_bytes: bytes) -> Optional[tuple[Any, int]]:
+    """PCM WAV -> amostras mono na taxa de transcrição; None se não for WAV."""
+    if not is_wav(audio_bytes):
+        return None
+    try:
+        samples, sample_rate = decode_wav(audio_bytes)
+    except (WavFormatError, struct.error) as e:
+        logger.debug(f"WAV não decodificável, sem segmentação: {e}")
+        return None
+    taxa = min(_config.transcricao_sample_rate, sample_rate)
+    return resample(downmix(samples), sample_rate, taxa), taxa
+
+
+async def transcrever_segmentos(
+    samples,
+    sample_rate: int,
+    prompt: str,
+    contexto: Any = None,
+    paralelismo: Optional[int] = None,
+    max_segmento_segundos: Optional[float] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Transcreve áudio mono em segmentos cortados nos silêncios.
+
+    Os segmentos rodam em paralelo (no máximo `paralelismo` chamadas por vez)
+    e são entregues na ordem em que terminam, cada um com `indice` e tempos
+    de início/fim. `contexto` limita as chamadas ao prazo do turno.
+    """
+    limites = await asyncio.to_thread(
+        split_at_silence,
+        samples,
+        sample_rate,
+        max_segmento_segundos or _config.transcricao_segmento_max_secs,
+    )
+    semaforo = asyncio.Semaphore(paralelismo or _config.transcricao_segmentos_paralelos)
+
+    async def transcrever_segmento(indice: int, inicio: int, fim: int) -> Dict[str, Any]:
+        trecho = samples[inicio:fim]
+        segmento = {
+            "indice": indice,
+            "inicio_segundos": round(inicio / sample_rate, 2),
+            "fim_segundos": round(fim / sample_rate, 2),
+        }
+        if not has_speech(trecho, sample_rate):
+            return {**segmento, "sucesso": True, "texto": "", "silencio": True}
+        async with semaforo:
+            dados = encode_wav(trecho, sample_rate)
+            audio_part = types.Part.from_bytes(data=dados, mime_type="audio/wav")
+            try:
+                response = await run_within_turn(
+                    contexto,
+                    lambda: _chamar_modelo(
+                        _get_audio_hash(dados), audio_part, prompt, len(trecho) / sample_rate
+                    )
+                )
+            except (CircuitOpenError, DeadlineExceeded, TurnCancelled):
+                raise
+            except Exception as e:
+                logger.warning(f"Falha no segmento {indice}: {e}")
+                return {**segmento, "sucesso": False, "texto": "", "erro": str(e)}
+        texto, idioma, confianca, _ = _interpretar_resposta(response)
+        return {
+            **segmento,
+            "sucesso": True,
+            "texto": texto.strip(),
+            "idioma_detectado": idioma,
+            "confianca": confianca,
+        }
+
+    tarefas = [
+        asyncio.ensure_future(transcrever_segmento(i, inicio, fim))
+        for i, (inicio, fim) in enumerate(limites)
+    ]
+    try:
+        for proxima in asyncio.as_completed(tarefas):
+            resultado = await proxima
+            resultado["total_segmentos"] = len(tarefas)
+            yield resultado
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+
+def _juntar_segmentos(segmentos: list[Dict[str, Any]], incluir_timestamps: bool) -> str:
+    """Texto contínuo na ordem do áudio, opcionalmente com marcas [mm:ss]."""
+    partes = []
+    for segmento in segmentos:
+        if not segmento.get("texto"):
+            continue
+        if incluir_timestamps:
+            minutos, segundos = divmod(int(segmento["inicio_segundos"]), 60)
+            partes.append(f"[{minutos:02d}:{segundos:02d}] {segmento['texto']}")
+        else:
+            partes.append(segmento["texto"])
+    return ("\n" if incluir_timestamps else " ").join(partes)
+
+
+def _prefixo_concluido(concluidos: Dict[int, Dict[str, Any]]) -> list[Dict[str, Any]]:
+    """Segmentos já prontos desde o início do áudio, sem lacunas."""
+    prefixo = []
+    while len(prefixo) in concluidos:
+        prefixo.append(concluidos[len(prefixo)])
+    return prefixo
+
+
+async def transcrever_audio_avancado_stream(
+    nome_artefato_audio: str,
+    tool_context: ToolContext,
+    incluir_timestamps: bool = False,
+    identificar_speakers: bool = False,
+    idioma_preferencial: str = "pt-BR",
+    resultado: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """Versão em stream de `transcrever_audio_avancado`, para o frontend.
     
-    return estimativas.get(formato, len(audio_bytes) / (16000 * 2))  # Padrão: 16kHz mono
+    A cada segmento concluído produz o texto pronto desde o início do áudio
+    (`texto`, `segmentos_concluidos`, `total_segmentos`). Ao final,
+    `resultado`, se passado, recebe o mesmo retorno da tool, inclusive os de
+    erro. Áudios que seguem pelo caminho de `transcrever_audio` não produzem
+    texto parcial.
+    """
+    if resultado is None:
+        resultado = {}
+    configuracoes = {
+        "timestamps_solicitados": incluir_timestamps,
+        "identificacao_falantes_solicitada": identificar_speakers,
+        "idioma_preferencial": idioma_preferencial,
+    }
+    try:
+        audio_artifact = await tool_context.load_artifact(nome_artefato_audio)
+        if not audio_artifact:
+            audio_artifact = await _buscar_audio_na_mensagem(tool_context)
+        audio_bytes, mime_type = (
+            _extrair_dados_do_artifact(audio_artifact) if audio_artifact else (None, None)
+        )
+        decodificado = (
+            await asyncio.to_thread(_decodificar_mono, audio_bytes) if audio_bytes else None
+        )
+        if (
+            decodificado is None
+            or len(decodificado[0]) / decodificado[1] <= _config.transcricao_segmento_max_secs
+        ):
+            resultado.update(await transcrever_audio(nome_artefato_audio, tool_context))
+            if resultado.get("sucesso"):
+                resultado["configuracoes_avancadas"] = configuracoes
+            return
+        samples, sample_rate = decodificado
+        duracao_segundos = len(samples) / sample_rate
+        
+        if duracao_segundos > _config.transcricao_max_duracao_secs:
+            resultado.update({
+                "sucesso": False,
+                "erro": (
+                    f"Áudio muito longo ({duracao_segundos:.0f}s). "
+                    f"Máximo: {_config.transcricao_max_duracao_secs:.0f}s."
+                )
+            })
+            return
+        
+        chave_cache = make_key(
+            _get_audio_hash(audio_bytes), "avancado",
+            incluir_timestamps, identificar_speakers, idioma_preferencial
+        )
+        cached = _transcription_cache.get(chave_cache)
+        if cached is not None:
+            resultado.update(cached)
+            resultado["fonte_cache"] = True
+            return
+        
+        qualidade = await asyncio.to_thread(
+            analyze_quality, samples, sample_rate, _limites_qualidade
+        )
+        if not qualidade.usable:
+            tool_context.state["temp:tipo_erro"] = "entender_audio"
+            resultado.update(_resultado_audio_inutilizavel(qualidade))
+            return
+        
+        # Transcrever segmentos em paralelo, entregando o texto pronto desde o
+        # início do áudio a cada segmento concluído
+        prompt = _montar_prompt(idioma_preferencial, identificar_speakers)
+        inicio = time.monotonic()
+        tempo_primeiro_texto = None
+        concluidos: Dict[int, Dict[str, Any]] = {}
+        async for segmento in transcrever_segmentos(samples, sample_rate, prompt, tool_context):
+            concluidos[segmento["indice"]] = segmento
+            if tempo_primeiro_texto is None and segmento.get("texto"):
+                tempo_primeiro_texto = time.monotonic() - inicio
+            prefixo = _prefixo_concluido(concluidos)
+            yield {
+                "texto": _juntar_segmentos(prefixo, incluir_timestamps),
+                "segmentos_concluidos": len(concluidos),
+                "total_segmentos": segmento["total_segmentos"],
+            }
+        
+        segmentos = [concluidos[i] for i in sorted(concluidos)]
+        falhas = [s["indice"] for s in segmentos if not s["sucesso"]]
+        if len(falhas) == len(segmentos):
+            resultado.update({
+                "sucesso": False,
+                "erro": "Nenhum segmento do áudio pôde ser transcrito.",
+                "detalhes_erro": {"segmentos": [s.get("erro") for s in segmentos]}
+            })
+            return
+        
+        texto_transcrito = _juntar_segmentos(segmentos, incluir_timestamps)
+        falados = [s for s in segmentos if s.get("texto")]
+        idiomas = [s["idioma_detectado"] for s in falados]
+        idioma_detectado = max(set(idiomas), key=idiomas.count) if idiomas else idioma_preferencial
+        niveis = ["baixa", "media", "alta"]
+        confianca = min(
+            (s["confianca"] for s in falados if s["confianca"] in niveis),
+            key=niveis.index,
+            default="media"
+        )
+        palavras = len(_juntar_segmentos(segmentos, False).split())
+        
+        persistencia = await _persistir_transcricao(tool_context, texto_transcrito)
+        
+        resultado.update({
+            "sucesso": True,
+            "texto": texto_transcrito,
+            "duracao_segundos": round(duracao_segundos, 1),
+            "formato": _formato_do_mime(mime_type),
+            "tamanho_bytes": len(audio_bytes),
+            "idioma_detectado": idioma_detectado,
+            "segmentos": [
+                {
+                    "indice": s["indice"],
+                    "inicio_segundos": s["inicio_segundos"],
+                    "fim_segundos": s["fim_segundos"],
+                    "texto": s["texto"],
+                }
+                for s in segmentos
+            ],
+            "estatisticas": {
+                "total_palavras": palavras,
+                "total_caracteres": len(texto_transcrito),
+                "palavras_por_minuto": round((palavras / duracao_segundos) * 60),
+                "total_segmentos": len(segmentos),
+                "tempo_primeiro_texto_segundos": (
+                    round(tempo_primeiro_texto, 2) if tempo_primeiro_texto is not None else None
+                ),
+            },
+            "qualidade": {
+                "confianca": confianca,
+                "observacoes": (
+                    f"Segmentos sem transcrição: {falhas}" if falhas else ""
+                )
+            },
+            "configuracoes_avancadas": configuracoes,
+        })
+        if falhas:
+            resultado["segmentos_com_falha"] = falhas
+        resultado.update(persistencia)
+        
+        # Resultados parciais não entram no cache
+        if not falhas:
+            _transcription_cache.put(chave_cache, resultado.copy())
+        
+    except CircuitOpenError as e:
+        logger.warning(f"Transcrição segmentada em modo degradado: {e}")
+        tool_context.state["temp:tipo_erro"] = "entender_audio"
+        resultado.update({
+            "sucesso": False,
+            "degradado": True,
+            "erro": "Serviço de transcrição temporariamente indisponível.",
+            "sugestao": "Peça para o aluno repetir a pergunta em instantes ou digitá-la.",
+            "tentar_novamente_em_segundos": round(e.retry_after_secs)
+        })
+    except DeadlineExceeded as e:
+        logger.warning(f"Transcrição segmentada excedeu o prazo do turno: {e}")
+        resultado.update({
+            "sucesso": False,
+            "status": "tempo_esgotado",
+            "erro": "A transcrição não terminou dentro do tempo do turno."
+        })
+    except TurnCancelled as e:
+        logger.info(f"Transcrição segmentada cancelada: {e}")
+        resultado.update({
+            "sucesso": False,
+            "status": "cancelado",
+            "erro": "A transcrição foi cancelada porque o turno foi encerrado."
+        })
+    except Exception as e:
+        logger.error(f"Erro na transcrição segmentada: {str(e)}", exc_info=True)
+        resultado.update({
+            "sucesso": False,
+            "erro": f"Erro ao transcrever áudio: {str(e)}",
+            "detalhes_erro": {
+                "tipo": type(e).__name__,
+                "mensagem": str(e)
+            }
+        })
 
 
-# Versão avançada com parâmetros opcionais (para futuro)
 async def transcrever_audio_avancado(
     nome_artefato_audio: str,
     tool_context: ToolContext,
@@ -328,21 +937,17 @@ async def transcrever_audio_avancado(
     identificar_speakers: bool = False,
     idioma_preferencial: str = "pt-BR"
 ) -> Dict[str, Any]:
-    """Versão avançada com funcionalidades extras.
+    """Transcreve gravações longas em segmentos paralelos cortados nos silêncios.
     
     Mantém compatibilidade total - pode ser usada no lugar da função básica.
+    Áudios curtos, ou comprimidos (sem decodificação local), seguem pelo
+    caminho de `transcrever_audio`. O texto parcial só chega ao frontend pela
+    versão em stream (`GET /transcricao/stream/eventos`).
     """
-    # Por enquanto, redireciona para função básica
-    # Funcionalidades avançadas serão implementadas posteriormente
-    resultado = await transcrever_audio(nome_artefato_audio, tool_context)
-    
-    # Adicionar informação sobre configurações usadas
-    if resultado.get("sucesso"):
-        resultado["configuracoes_avancadas"] = {
-            "timestamps_solicitados": incluir_timestamps,
-            "identificacao_falantes_solicitada": identificar_speakers,
-            "idioma_preferencial": idioma_preferencial,
-            "nota": "Funcionalidades avançadas em desenvolvimento"
-        }
-    
-    return resultado
\ No newline at end of file
+    resultado: Dict[str, Any] = {}
+    async for _ in transcrever_audio_avancado_stream(
+        nome_artefato_audio, tool_context, incluir_timestamps,
+        identificar_speakers, idioma_preferencial, resultado
+    ):
+        pass
+    return resultado
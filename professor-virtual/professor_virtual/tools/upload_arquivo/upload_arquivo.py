@@ -8,14 +8,9 @@ Agora usa ToolContext que possui os métodos necessários para artifacts.
 import base64
 from typing import Dict, Any
 from google.genai import types
-from google.adk.tools import tool
 from google.adk.tools.tool_context import ToolContext
 
 
-@tool(
-    name="upload_arquivo",
-    description="Processa upload de arquivo do frontend e cria artifact no ADK"
-)
 async def upload_arquivo(
     file_data: Dict[str, Any],
     context: ToolContext
@@ -0,0 +1,92 @@
+"""Endpoint HTTP de transcrição segmentada em stream para o frontend.
+
+A tool `transcrever_audio_avancado` só devolve o texto depois que todos os
+segmentos terminam. Este endpoint entrega o texto pronto desde o início do
+áudio a cada segmento concluído e, no fim, o mesmo retorno da tool. Monte-o no
+app FastAPI que serve o Runner, ao lado do TTS em stream:
+
+    from professor_virtual.agent import runner
+    from professor_virtual.transcricao_streaming import criar_router_transcricao_stream
+
+    app.include_router(criar_router_transcricao_stream(runner))
+
+GET /transcricao/stream/eventos?user_id=...&session_id=...&nome_artefato_audio=...
+    `text/event-stream`: eventos "parcial" com `texto`, `segmentos_concluidos`
+    e `total_segmentos`, depois "fim" com o retorno da tool (que pode ser de
+    erro) ou "erro" se a transcrição for interrompida.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from .config import Config
+from .contexto_sessao import ContextoSessao
+from .shared_libraries.deadline import end_turn, start_turn
+from .tools.transcrever_audio import transcrever_audio_avancado_stream
+
+logger = logging.getLogger(__name__)
+
+_config = Config()
+
+
+def _evento(nome: str, dados: Dict[str, Any]) -> str:
+    return f"event: {nome}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+async def _transcrever(
+    contexto: ContextoSessao,
+    nome_artefato_audio: str,
+    incluir_timestamps: bool,
+    identificar_speakers: bool,
+    idioma_preferencial: str,
+) -> AsyncIterator[str]:
+    resultado: Dict[str, Any] = {}
+    start_turn(contexto.invocation_id, _config.turn_timeout_secs)
+    try:
+        async for parcial in transcrever_audio_avancado_stream(
+            nome_artefato_audio, contexto, incluir_timestamps,
+            identificar_speakers, idioma_preferencial, resultado
+        ):
+            yield _evento("parcial", parcial)
+        await contexto.salvar_estado()
+    except Exception as e:
+        logger.warning(f"Transcrição em stream interrompida: {e}")
+        yield _evento("erro", {"erro": str(e), "sucesso": False})
+        return
+    finally:
+        end_turn(contexto.invocation_id)
+    yield _evento("fim", resultado)
+
+
+def criar_router_transcricao_stream(runner) -> APIRouter:
+    """Router com o endpoint de transcrição em stream sobre os serviços de `runner`."""
+    router = APIRouter()
+
+    @router.get("/transcricao/stream/eventos")
+    async def transcricao_stream_eventos(
+        user_id: str,
+        session_id: str,
+        nome_artefato_audio: str,
+        incluir_timestamps: bool = False,
+        identificar_speakers: bool = False,
+        idioma_preferencial: str = "pt-BR",
+    ):
+        session = await runner.session_service.get_session(
+            app_name=runner.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada")
+        eventos = _transcrever(
+            ContextoSessao(runner, session, "transcricao-stream"),
+            nome_artefato_audio, incluir_timestamps, identificar_speakers,
+            idioma_preferencial,
+        )
+        return StreamingResponse(
+            eventos, media_type="text/event-stream", headers={"Cache-Control": "no-store"}
+        )
+
+    return router
@@ -0,0 +1,175 @@
+"""Endpoints HTTP de TTS em stream para o frontend.
+
+A tool `gerar_audio_tts` só devolve o nome do artifact depois que a síntese
+inteira termina. Estes endpoints entregam o áudio enquanto o modelo o gera e
+salvam o artifact completo no fim, igual à tool. Monte-os no app FastAPI que
+serve o Runner:
+
+    from professor_virtual.agent import runner
+    from professor_virtual.tts_streaming import criar_router_tts_stream
+
+    app.include_router(criar_router_tts_stream(runner))
+
+GET /tts/stream?user_id=...&session_id=...&texto=...&voz=Kore
+    `audio/wav` em transferência chunked (cabeçalho WAV de tamanho
+    indefinido + PCM); pode ir direto no `src` de um `<audio>`.
+
+GET /tts/stream/eventos?user_id=...&session_id=...&texto=...&voz=Kore
+    `text/event-stream`: eventos "audio" com blocos em base64 (o primeiro é
+    o cabeçalho WAV), depois "fim" com o retorno da tool (nome do artifact
+    salvo) ou "erro".
+
+Os dois aceitam o perfil de saída da tool (`taxa_amostragem`,
+`bits_por_amostra`, `conteiner`). Fora do perfil padrão o áudio sai inteiro,
+em um único bloco, quando a síntese termina.
+"""
+
+import base64
+import json
+import logging
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .config import Config
+from .contexto_sessao import ContextoSessao
+from .shared_libraries.audio import OutputProfile
+from .shared_libraries.circuit_breaker import CircuitOpenError
+from .shared_libraries.deadline import (
+    DeadlineExceeded,
+    TurnCancelled,
+    end_turn,
+    start_turn,
+)
+from .tools.gerar_audio_tts import ErroTtsStream, gerar_audio_tts_stream
+
+logger = logging.getLogger(__name__)
+
+_config = Config()
+
+
+async def _sintetizar(
+    contexto: ContextoSessao,
+    texto: str,
+    voz: str,
+    resultado: Dict[str, Any],
+    perfil: OutputProfile,
+) -> AsyncIterator[bytes]:
+    start_turn(contexto.invocation_id, _config.turn_timeout_secs)
+    try:
+        async for bloco in gerar_audio_tts_stream(texto, contexto, voz, resultado, perfil):
+            yield bloco
+        await contexto.salvar_estado()
+    finally:
+        end_turn(contexto.invocation_id)
+
+
+def _resposta_de_erro(e: Exception) -> JSONResponse:
+    if isinstance(e, ErroTtsStream):
+        return JSONResponse(e.resultado, status_code=400)
+    if isinstance(e, CircuitOpenError):
+        segundos = round(e.retry_after_secs)
+        return JSONResponse(
+            {
+                "erro": "Áudio temporariamente indisponível. Responda apenas em texto.",
+                "sucesso": False,
+                "degradado": True,
+                "tentar_novamente_em_segundos": segundos,
+            },
+            status_code=503,
+            headers={"Retry-After": str(segundos)},
+        )
+    if isinstance(e, (DeadlineExceeded, TurnCancelled)):
+        return JSONResponse(
+            {"erro": "A geração de áudio não terminou a tempo.", "sucesso": False},
+            status_code=504,
+        )
+    raise e
+
+
+def criar_router_tts_stream(runner) -> APIRouter:
+    """Router com os endpoints de TTS em stream sobre os serviços de `runner`."""
+    router = APIRouter()
+
+    async def abrir(user_id, session_id, texto, voz, resultado, perfil):
+        """Primeiro bloco e o restante do stream, ou a resposta de erro."""
+        session = await runner.session_service.get_session(
+            app_name=runner.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada")
+        stream = _sintetizar(ContextoSessao(runner, session, "tts-stream"), texto, voz, resultado, perfil)
+        # O primeiro bloco é aguardado aqui: pedidos recusados ainda podem
+        # responder com o status HTTP adequado
+        try:
+            primeiro = await stream.__anext__()
+        except (ErroTtsStream, CircuitOpenError, DeadlineExceeded, TurnCancelled) as e:
+            return _resposta_de_erro(e)
+        return primeiro, stream
+
+    @router.get("/tts/stream")
+    async def tts_stream(
+        user_id: str,
+        session_id: str,
+        texto: str,
+        voz: str = "Kore",
+        taxa_amostragem: int = 24000,
+        bits_por_amostra: int = 16,
+        conteiner: str = "wav",
+    ):
+        perfil = OutputProfile(taxa_amostragem, bits_por_amostra, conteiner)
+        aberto = await abrir(user_id, session_id, texto, voz, {}, perfil)
+        if isinstance(aberto, JSONResponse):
+            return aberto
+        primeiro, stream = aberto
+
+        async def corpo():
+            yield primeiro
+            try:
+                async for bloco in stream:
+                    yield bloco
+            except Exception as e:
+                # Status já enviado: o áudio termina onde parou
+                logger.warning(f"TTS em stream interrompido: {e}")
+
+        return StreamingResponse(
+            corpo(), media_type=perfil.mime_type, headers={"Cache-Control": "no-store"}
+        )
+
+    @router.get("/tts/stream/eventos")
+    async def tts_stream_eventos(
+        user_id: str,
+        session_id: str,
+        texto: str,
+        voz: str = "Kore",
+        taxa_amostragem: int = 24000,
+        bits_por_amostra: int = 16,
+        conteiner: str = "wav",
+    ):
+        resultado: Dict[str, Any] = {}
+        perfil = OutputProfile(taxa_amostragem, bits_por_amostra, conteiner)
+        aberto = await abrir(user_id, session_id, texto, voz, resultado, perfil)
+        if isinstance(aberto, JSONResponse):
+            return aberto
+        primeiro, stream = aberto
+
+        def evento(nome: str, dados: str) -> str:
+            return f"event: {nome}\ndata: {dados}\n\n"
+
+        async def eventos():
+            yield evento("audio", base64.b64encode(primeiro).decode("ascii"))
+            try:
+                async for bloco in stream:
+                    yield evento("audio", base64.b64encode(bloco).decode("ascii"))
+            except Exception as e:
+                logger.warning(f"TTS em stream interrompido: {e}")
+                yield evento("erro", json.dumps({"erro": str(e), "sucesso": False}))
+                return
+            yield evento("fim", json.dumps(resultado, ensure_ascii=False))
+
+        return StreamingResponse(
+            eventos(), media_type="text/event-stream", headers={"Cache-Control": "no-store"}
+        )
+
+    return router
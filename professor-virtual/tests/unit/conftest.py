@@ -0,0 +1,38 @@
+import pytest
+
+from professor_virtual.shared_libraries.genai_backend import (
+    FakeGenaiBackend,
+    reset_genai_backend,
+    set_genai_backend,
+)
+from professor_virtual.shared_libraries.file_uploads import reset_file_upload_index
+from professor_virtual.shared_libraries.tts_cache import reset_tts_cache
+
+
+class FakeToolContext:
+    """ToolContext stand-in exposing the async artifact API the tools use."""
+
+    def __init__(self, artifacts=None):
+        self.artifacts = dict(artifacts or {})
+        self.versions = {}
+        self.state = {}
+
+    async def load_artifact(self, filename, version=None):
+        return self.artifacts.get(filename)
+
+    async def save_artifact(self, filename, artifact):
+        self.artifacts[filename] = artifact
+        self.versions[filename] = self.versions.get(filename, -1) + 1
+        return self.versions[filename]
+
+
+@pytest.fixture
+def fake_backend():
+    backend = FakeGenaiBackend()
+    set_genai_backend(backend)
+    reset_file_upload_index()
+    reset_tts_cache()
+    yield backend
+    reset_genai_backend()
+    reset_file_upload_index()
+    reset_tts_cache()
@@ -0,0 +1,93 @@
+import struct
+
+import numpy as np
+import pytest
+
+from professor_virtual.shared_libraries.audio import (
+    DEFAULT_PROFILE,
+    OutputProfile,
+    encode_output,
+    mulaw_decode,
+    mulaw_encode,
+    parse_wav_header,
+)
+from professor_virtual.shared_libraries.tts_cache import STORED_AUDIO_STATE_PREFIX
+from professor_virtual.tools import gerar_audio_tts
+from conftest import FakeToolContext
+
+
+def _tom(rate=24000, secs=1.0, freq=440.0):
+    t = np.arange(int(rate * secs)) / rate
+    return (0.5 * np.sin(2 * np.pi * freq * t) * 32767).astype("<i2")
+
+
+def test_mulaw_round_trip_stays_within_quantization_error():
+    pcm = _tom()
+    decoded = mulaw_decode(mulaw_encode(pcm)).astype(np.int32)
+    erro = np.abs(decoded - pcm) / (np.abs(pcm.astype(np.int32)) + 64)
+    assert erro.max() < 0.07
+
+
+def test_default_profile_is_plain_wav_and_keeps_cache_keys():
+    pcm = _tom().tobytes()
+    wav = encode_output(pcm, 24000)
+    assert parse_wav_header(wav).sample_rate == 24000 and wav[44:] == pcm
+    assert DEFAULT_PROFILE.cache_options() == ()
+
+
+def test_16khz_mulaw_wav_is_a_third_of_the_size():
+    pcm = _tom().tobytes()
+    perfil = OutputProfile(16000, 8, "wav")
+    wav = encode_output([pcm[:10000], pcm[10000:]], 24000, perfil)
+
+    info = parse_wav_header(wav)
+    assert (info.format_tag, info.sample_rate, info.bits_per_sample) == (7, 16000, 8)
+    assert info.data_size == 16000
+    assert len(wav) < len(pcm) / 2.9
+
+
+def test_au_header_and_never_upsamples():
+    pcm = _tom(rate=8000).tobytes()
+    au = encode_output(pcm, 8000, OutputProfile(16000, 16, "au"))
+    magic, offset, size, encoding, rate, channels = struct.unpack(">4sIIIII", au[:24])
+    assert (magic, offset, encoding, rate, channels) == (b".snd", 24, 3, 8000, 1)
+    assert size == len(pcm) and au[24:26] == pcm[1::-1][:2]
+
+
+def test_invalid_profile_is_rejected():
+    with pytest.raises(ValueError):
+        OutputProfile(44100).validate()
+
+
+@pytest.mark.asyncio
+async def test_tool_profile_is_keyed_and_recorded(fake_backend):
+    ctx = FakeToolContext()
+    texto = "Agora vamos praticar a tabuada do nove."
+
+    padrao = await gerar_audio_tts(texto, ctx)
+    leve = await gerar_audio_tts(texto, ctx, taxa_amostragem=8000, bits_por_amostra=8, conteiner="au")
+    de_novo = await gerar_audio_tts(texto, ctx, taxa_amostragem=8000, bits_por_amostra=8, conteiner="au")
+
+    assert leve["nome_artefato_gerado"].endswith(".au")
+    assert leve["nome_artefato_gerado"] != padrao["nome_artefato_gerado"]
+    assert leve["tamanho_bytes"] < padrao["tamanho_bytes"] / 5
+    assert leve["perfil_saida"] == {
+        "taxa_amostragem": 8000, "bits_por_amostra": 8, "codificacao": "mulaw", "conteiner": "au",
+    }
+    assert de_novo["fonte_cache"] and de_novo["perfil_saida"] == leve["perfil_saida"]
+    assert len(fake_backend.calls) == 2
+
+    artifact = ctx.artifacts[leve["nome_artefato_gerado"]]
+    assert artifact.inline_data.mime_type == "audio/basic"
+    perfis = [
+        ref["perfil"] for chave, ref in ctx.state.items()
+        if chave.startswith(STORED_AUDIO_STATE_PREFIX)
+    ]
+    assert leve["perfil_saida"] in perfis and padrao["perfil_saida"] in perfis
+
+
+@pytest.mark.asyncio
+async def test_tool_rejects_unknown_container(fake_backend):
+    resultado = await gerar_audio_tts("Olá!", FakeToolContext(), conteiner="mp3")
+    assert not resultado["sucesso"] and "au" in resultado["conteineres_validos"]
+    assert fake_backend.calls == []
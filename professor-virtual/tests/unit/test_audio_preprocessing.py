@@ -0,0 +1,97 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+from google.genai import types
+
+from professor_virtual.shared_libraries.audio import (
+    build_wav,
+    decode_wav,
+    encode_wav,
+    parse_wav_header,
+    preprocess_for_transcription,
+    resample,
+)
+from professor_virtual.shared_libraries.audio.wav import wav_header
+from professor_virtual.tools import transcrever_audio
+from conftest import FakeToolContext
+
+
+def _stereo_wav_44k(silence_secs=1.0, speech_secs=1.0, freq=440.0):
+    rate = 44100
+    silence = np.zeros(int(silence_secs * rate), dtype=np.float32)
+    t = np.arange(int(speech_secs * rate)) / rate
+    tone = (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+    mono = np.concatenate([silence, tone, silence])
+    stereo = np.stack([mono, mono], axis=1)
+    pcm = (stereo * 32767).astype("<i2")
+    return wav_header(pcm.nbytes, rate, channels=2) + pcm.tobytes()
+
+
+def test_wav_round_trip():
+    samples = np.linspace(-0.5, 0.5, 1600, dtype=np.float32)
+    decoded, rate = decode_wav(encode_wav(samples, 16000))
+    assert rate == 16000
+    assert decoded.shape == (1600, 1)
+    assert np.allclose(decoded[:, 0], samples, atol=1e-4)
+
+
+def test_build_wav_from_chunks_matches_wave_module():
+    pcm = (np.arange(4800) % 200 - 100).astype("<i2").tobytes()
+    chunks = [pcm[:1000], memoryview(pcm)[1000:3000], bytearray(pcm[3000:])]
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(24000)
+        wf.writeframes(pcm)
+
+    assert build_wav(chunks, 24000) == buffer.getvalue()
+    assert build_wav(pcm, 24000) == buffer.getvalue()
+
+
+def test_resample_preserves_duration_and_pitch():
+    rate = 44100
+    t = np.arange(rate) / rate
+    tone = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+    out = resample(tone, rate, 16000)
+    assert len(out) == 16000
+    peak_hz = np.argmax(np.abs(np.fft.rfft(out))) * 16000 / len(out)
+    assert abs(peak_hz - 440) < 2
+
+
+def test_preprocess_downmixes_resamples_and_trims_silence():
+    data = _stereo_wav_44k()
+    result = preprocess_for_transcription(data)
+
+    info = parse_wav_header(result.data)
+    assert (info.channels, info.sample_rate, info.bits_per_sample) == (1, 16000, 16)
+    assert result.original_secs == pytest.approx(3.0, abs=0.01)
+    # 1s of speech plus the VAD padding on each side.
+    assert 1.0 <= result.processed_secs <= 1.5
+    assert result.secs_saved > 1.5
+    assert result.bytes_saved > 0.9 * len(data)
+
+
+def test_preprocess_skips_non_wav_payloads():
+    assert preprocess_for_transcription(b"ID3" + b"\x00" * 1000) is None
+    assert preprocess_for_transcription(b"RIFF" + b"\x01" * 1000) is None
+
+
+@pytest.mark.asyncio
+async def test_transcrever_audio_sends_preprocessed_audio(fake_backend):
+    data = _stereo_wav_44k(silence_secs=1.5, freq=523.0)
+    ctx = FakeToolContext(
+        {"pergunta.wav": types.Part.from_bytes(data=data, mime_type="audio/wav")}
+    )
+
+    resultado = await transcrever_audio("pergunta.wav", ctx)
+
+    assert resultado["sucesso"]
+    assert resultado["duracao_segundos"] == pytest.approx(4.0, abs=0.1)
+    assert resultado["preprocessamento"]["bytes_economizados"] > 0
+    assert resultado["preprocessamento"]["segundos_economizados"] > 2.0
+    enviado = fake_backend.calls[-1]["contents"][1].inline_data.data
+    assert len(enviado) == resultado["preprocessamento"]["bytes_enviados"]
@@ -0,0 +1,94 @@
+import struct
+
+import numpy as np
+import pytest
+from google.genai import types
+
+from professor_virtual.shared_libraries.audio import encode_wav, probe_audio
+from professor_virtual.tools import transcrever_audio
+from conftest import FakeToolContext
+
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x00"  # MPEG1 layer III, 128kbps, 44.1kHz, stereo
+
+
+def _aiff(frames, rate=22050, channels=1):
+    exponent = 16383 + rate.bit_length() - 1
+    mantissa = rate << (64 - rate.bit_length())
+    comm = struct.pack(">hIh", channels, frames, 16) + struct.pack(">HQ", exponent, mantissa)
+    body = b"AIFF" + b"COMM" + struct.pack(">I", len(comm)) + comm
+    return b"FORM" + struct.pack(">I", len(body)) + body
+
+
+def _flac(total_samples, rate=48000, channels=2, bits=16):
+    packed = (rate << 44) | ((channels - 1) << 41) | ((bits - 1) << 36) | total_samples
+    streaminfo = b"\x10\x00" * 2 + b"\x00" * 6 + packed.to_bytes(8, "big") + b"\x00" * 16
+    return b"fLaC" + b"\x80" + len(streaminfo).to_bytes(3, "big") + streaminfo
+
+
+def _ogg_page(granule, packet=b"", header_type=0):
+    return (
+        b"OggS" + bytes([0, header_type])
+        + struct.pack("<qIII", granule, 1, 0, 0)
+        + bytes([1, len(packet)]) + packet
+    )
+
+
+def test_probe_wav_uses_real_sample_rate():
+    info = probe_audio(encode_wav(np.zeros(16000 * 3, np.float32), 16000))
+    assert (info.format, info.sample_rate, info.channels) == ("wav", 16000, 1)
+    assert info.duration_secs == pytest.approx(3.0)
+
+
+def test_probe_aiff():
+    info = probe_audio(_aiff(frames=22050 * 2))
+    assert info.sample_rate == 22050
+    assert info.duration_secs == pytest.approx(2.0)
+
+
+def test_probe_flac():
+    info = probe_audio(_flac(total_samples=48000 * 5))
+    assert (info.sample_rate, info.channels, info.bits_per_sample) == (48000, 2, 16)
+    assert info.duration_secs == pytest.approx(5.0)
+
+
+def test_probe_mp3_cbr():
+    data = (MP3_FRAME_HEADER + b"\x00" * 413) * 100
+    info = probe_audio(data)
+    assert (info.format, info.sample_rate, info.channels) == ("mp3", 44100, 2)
+    assert info.duration_secs == pytest.approx(100 * 1152 / 44100, rel=0.01)
+
+
+def test_probe_mp3_vbr_xing_after_id3_tag():
+    id3 = b"ID3\x04\x00\x00" + bytes([0, 0, 15, 80]) + b"\x00" * 2000
+    first = MP3_FRAME_HEADER + b"\x00" * 32 + b"Xing" + struct.pack(">II", 1, 500)
+    data = id3 + first + b"\x00" * 50000
+    info = probe_audio(data)
+    assert info.duration_secs == pytest.approx(500 * 1152 / 44100)
+
+
+def test_probe_ogg_opus_reads_last_granule():
+    opus_head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 16000, 0, 0)
+    data = _ogg_page(0, opus_head, 2) + b"\x00" * 20000 + _ogg_page(48000 * 3 + 312, header_type=4)
+    info = probe_audio(data)
+    assert (info.format, info.sample_rate, info.channels) == ("opus", 16000, 1)
+    assert info.duration_secs == pytest.approx(3.0)
+
+
+def test_probe_unknown_payload():
+    assert probe_audio(b"\x00" * 100) is None
+
+
+@pytest.mark.asyncio
+async def test_transcrever_audio_rejects_long_audio_from_header(fake_backend):
+    # MPEG2 layer III, 8kbps, 22.05kHz: ~700s in 700KB.
+    frame = b"\xff\xf3\x10\xc4" + b"\x00" * 20
+    data = frame * (700 * 1000 // len(frame))
+    ctx = FakeToolContext(
+        {"longo.mp3": types.Part.from_bytes(data=data, mime_type="audio/mpeg")}
+    )
+
+    resultado = await transcrever_audio("longo.mp3", ctx)
+
+    assert not resultado["sucesso"]
+    assert resultado["audio"]["duracao_segundos"] > 600
+    assert fake_backend.calls == []
@@ -0,0 +1,84 @@
+import importlib
+
+import numpy as np
+import pytest
+from google.genai import types
+
+from professor_virtual.shared_libraries.audio import (
+    QualityThresholds,
+    analyze_quality,
+    encode_wav,
+)
+from professor_virtual.tools import transcrever_audio
+from conftest import FakeToolContext
+
+modulo_transcricao = importlib.import_module(
+    "professor_virtual.tools.transcrever_audio.transcrever_audio"
+)
+
+RATE = 16000
+
+
+def _tone(secs, amplitude=0.3, freq=300.0):
+    t = np.arange(int(secs * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def test_clean_speech_is_usable():
+    samples = np.concatenate([np.zeros(RATE // 2, np.float32), _tone(1.0)])
+    report = analyze_quality(samples, RATE)
+    assert report.usable
+    assert report.speech_fraction == pytest.approx(2 / 3, abs=0.05)
+    assert report.clipping_ratio == 0.0
+
+
+@pytest.mark.parametrize(
+    "samples, problem",
+    [
+        (np.zeros(0, np.float32), "empty"),
+        (_tone(0.1), "too_short"),
+        (_tone(2.0, amplitude=0.001), "too_quiet"),
+        (np.clip(_tone(2.0, amplitude=3.0), -1, 1), "clipped"),
+        (np.zeros(2 * RATE, np.float32), "no_speech"),
+    ],
+)
+def test_unusable_recordings_are_flagged(samples, problem):
+    report = analyze_quality(samples, RATE)
+    assert not report.usable
+    assert problem in report.problems
+
+
+def test_thresholds_are_tunable():
+    quiet = _tone(2.0, amplitude=0.006)
+    assert not analyze_quality(quiet, RATE).usable
+    assert analyze_quality(quiet, RATE, QualityThresholds(min_rms_db=-55.0)).usable
+
+
+@pytest.mark.asyncio
+async def test_transcrever_audio_rejects_silence_without_model_call(fake_backend):
+    silencio = encode_wav(np.zeros(3 * RATE, np.float32), RATE)
+    ctx = FakeToolContext(
+        {"vazio.wav": types.Part.from_bytes(data=silencio, mime_type="audio/wav")}
+    )
+
+    resultado = await transcrever_audio("vazio.wav", ctx)
+
+    assert not resultado["sucesso"]
+    assert resultado["status"] == "audio_inutilizavel"
+    assert "no_speech" in resultado["problemas"]
+    assert ctx.state["temp:tipo_erro"] == "entender_audio"
+    assert fake_backend.calls == []
+
+
+@pytest.mark.asyncio
+async def test_quality_gate_runs_with_preprocessing_off(fake_backend, monkeypatch):
+    monkeypatch.setattr(modulo_transcricao._config, "transcricao_preprocessamento", False)
+    silencio = encode_wav(np.zeros(4 * RATE, np.float32), RATE)
+    ctx = FakeToolContext(
+        {"vazio.wav": types.Part.from_bytes(data=silencio, mime_type="audio/wav")}
+    )
+
+    resultado = await transcrever_audio("vazio.wav", ctx)
+
+    assert resultado["status"] == "audio_inutilizavel"
+    assert fake_backend.calls == []
@@ -0,0 +1,105 @@
+import struct
+
+import pytest
+from google.genai import types
+
+from professor_virtual.shared_libraries.audio import (
+    parse_webm,
+    probe_audio,
+    webm_to_ogg_opus,
+)
+from professor_virtual.shared_libraries.audio.webm import ogg_crc
+from professor_virtual.tools import transcrever_audio
+from conftest import FakeToolContext
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+OPUS_PACKET = b"\xf8" + b"\x11" * 40  # CELT 20ms, one frame: 960 samples
+
+
+def _el(element_id: bytes, body: bytes) -> bytes:
+    return element_id + b"\x01" + len(body).to_bytes(7, "big") + body
+
+
+def _webm(packets=50, duration_ms=None):
+    opus_head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 48000, 0, 0)
+    info = _el(b"\x2a\xd7\xb1", (1_000_000).to_bytes(3, "big"))
+    if duration_ms is not None:
+        info += _el(b"\x44\x89", struct.pack(">d", duration_ms))
+    track = _el(
+        b"\xae",
+        _el(b"\xd7", b"\x01")
+        + _el(b"\x86", b"A_OPUS")
+        + _el(b"\x63\xa2", opus_head)
+        + _el(b"\xe1", _el(b"\xb5", struct.pack(">d", 48000.0)) + _el(b"\x9f", b"\x01")),
+    )
+    blocks = b"".join(
+        _el(b"\xa3", b"\x81" + struct.pack(">h", i * 20) + b"\x80" + OPUS_PACKET)
+        for i in range(packets)
+    )
+    cluster = b"\x1f\x43\xb6\x75" + UNKNOWN_SIZE + _el(b"\xe7", b"\x00") + blocks
+    segment = (
+        b"\x18\x53\x80\x67" + UNKNOWN_SIZE
+        + _el(b"\x15\x49\xa9\x66", info)
+        + _el(b"\x16\x54\xae\x6b", track)
+        + cluster
+    )
+    return _el(b"\x1a\x45\xdf\xa3", _el(b"\x42\x82", b"webm")) + segment
+
+
+def test_ogg_crc_check_value():
+    assert ogg_crc(b"123456789") == 0x89A1897F
+
+
+def test_parse_live_webm_without_duration_element():
+    audio = parse_webm(_webm(packets=50))
+    assert (audio.codec, audio.sample_rate, audio.channels) == ("A_OPUS", 48000, 1)
+    assert len(audio.packets) == 50
+    assert audio.duration_secs == pytest.approx(1.0)
+
+
+def test_probe_webm_prefers_info_duration():
+    info = probe_audio(_webm(packets=5, duration_ms=2500.0))
+    assert info.format == "webm/opus"
+    assert info.duration_secs == pytest.approx(2.5)
+
+
+def test_probe_webm_with_duration_does_not_walk_clusters():
+    # A corrupt cluster only matters when the blocks have to be counted.
+    data = _webm(packets=5, duration_ms=2500.0) + b"\x00" * 8
+
+    assert probe_audio(data).duration_secs == pytest.approx(2.5)
+    assert probe_audio(_webm(packets=5) + b"\x00" * 8) is None
+
+
+def test_remux_to_ogg_keeps_opus_packets():
+    ogg = webm_to_ogg_opus(_webm(packets=300))
+
+    info = probe_audio(ogg)
+    assert (info.format, info.channels) == ("opus", 1)
+    assert info.duration_secs == pytest.approx(6.0)
+    assert ogg.count(OPUS_PACKET) == 300
+    # Every page carries a valid checksum.
+    offset = 0
+    while offset < len(ogg):
+        segments = ogg[offset + 26]
+        size = 27 + segments + sum(ogg[offset + 27:offset + 27 + segments])
+        page = bytearray(ogg[offset:offset + size])
+        (crc,) = struct.unpack_from("<I", page, 22)
+        page[22:26] = b"\x00" * 4
+        assert ogg_crc(bytes(page)) == crc
+        offset += size
+
+
+@pytest.mark.asyncio
+async def test_transcrever_audio_accepts_webm_opus(fake_backend):
+    audio = types.Part.from_bytes(data=_webm(packets=150), mime_type="audio/webm;codecs=opus")
+    ctx = FakeToolContext({"pergunta.webm": audio})
+
+    resultado = await transcrever_audio("pergunta.webm", ctx)
+
+    assert resultado["sucesso"]
+    assert resultado["formato"] == "webm"
+    assert resultado["duracao_segundos"] == pytest.approx(3.0)
+    enviado = fake_backend.calls[-1]["contents"][1].inline_data
+    assert enviado.mime_type == "audio/ogg"
+    assert enviado.data[:4] == b"OggS"
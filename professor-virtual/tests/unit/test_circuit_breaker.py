@@ -0,0 +1,61 @@
+import pytest
+from google.genai import errors
+
+from professor_virtual.shared_libraries.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+def _unavailable():
+    raise errors.ServerError(503, {"error": {"message": "unavailable"}})
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_fails_fast_and_half_opens():
+    now = [0.0]
+    breaker = CircuitBreaker("tts", failure_threshold=2, reset_timeout_secs=10,
+                             clock=lambda: now[0])
+
+    async def failing():
+        _unavailable()
+
+    async def ok():
+        return "ok"
+
+    for _ in range(2):
+        with pytest.raises(errors.ServerError):
+            await breaker.call(failing)
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(ok)
+
+    now[0] += 10
+    assert await breaker.call(ok) == "ok"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_and_client_errors_do_not_trip():
+    now = [0.0]
+    breaker = CircuitBreaker("vision", failure_threshold=1, reset_timeout_secs=5,
+                             clock=lambda: now[0])
+
+    async def bad_request():
+        raise errors.ClientError(400, {"error": {"message": "bad"}})
+
+    with pytest.raises(errors.ClientError):
+        await breaker.call(bad_request)
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    now[0] += 5
+
+    async def failing():
+        _unavailable()
+
+    with pytest.raises(errors.ServerError):
+        await breaker.call(failing)
+    assert breaker.state == "open"
+    assert breaker.stats()["times_opened"] == 2
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from google.genai import errors
+
+from professor_virtual.shared_libraries.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    ModelCallController,
+)
+
+
+def _quota_error():
+    return errors.ClientError(429, {"error": {"message": "quota"}})
+
+
+def test_aimd_shrinks_on_overload_and_grows_on_success():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=1, max_limit=10)
+    limiter.on_overload()
+    assert limiter.limit == 4
+    for _ in range(20):
+        limiter.on_success()
+    assert 5 <= limiter.limit <= 10
+    for _ in range(10):
+        limiter.on_overload()
+    assert limiter.limit == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_overloads_shrink_the_limit_once():
+    controller = ModelCallController("gemini-test", max_attempts=1)
+    controller.limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        raise _quota_error()
+
+    calls = [asyncio.ensure_future(controller.call(call)) for _ in range(8)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*calls, return_exceptions=True)
+
+    assert controller.stats()["overloads"] == 8
+    assert controller.limiter.limit == 4
+
+    # A call sent under the new limit can shrink it again.
+    with pytest.raises(errors.ClientError):
+        await controller.call(call)
+    assert controller.limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_calls():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(work() for _ in range(6)))
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_controller_retries_overload_then_succeeds():
+    controller = ModelCallController("gemini-test", base_delay_secs=0, max_attempts=3)
+    failures = [_quota_error(), _quota_error()]
+
+    async def call():
+        if failures:
+            raise failures.pop()
+        return "ok"
+
+    assert await controller.call(call) == "ok"
+    stats = controller.stats()
+    assert stats["retries"] == 2
+    assert stats["overloads"] == 2
+    assert stats["limit"] < 8
+
+
+@pytest.mark.asyncio
+async def test_controller_does_not_retry_client_errors():
+    controller = ModelCallController("gemini-test", base_delay_secs=0)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise errors.ClientError(400, {"error": {"message": "bad request"}})
+
+    with pytest.raises(errors.ClientError):
+        await controller.call(call)
+    assert calls == 1
+    assert controller.stats()["failures"] == 1
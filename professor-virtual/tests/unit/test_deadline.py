@@ -0,0 +1,231 @@
+import asyncio
+import importlib
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from google.adk.events import Event
+from google.adk.models import LlmRequest
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from professor_virtual.execucao_streaming import criar_router_execucao, eventos_do_turno
+from professor_virtual.shared_libraries.callbacks.before_agent.before_agent_callback import before_agent
+from professor_virtual.shared_libraries.callbacks.rate_limit_callback.rate_limit_callback import (
+    TURN_OVER_MESSAGE,
+    rate_limit_callback,
+)
+from professor_virtual.shared_libraries.deadline import (
+    DEADLINE_STATE_KEY,
+    cancel_turn,
+    get_turn_deadline,
+    start_turn,
+)
+from professor_virtual.shared_libraries.single_flight import SingleFlight
+from professor_virtual.tools import gerar_audio_tts, transcrever_audio
+from conftest import FakeToolContext
+
+modulo_before_agent = importlib.import_module(
+    "professor_virtual.shared_libraries.callbacks.before_agent.before_agent_callback"
+)
+
+
+class DummyCallbackContext:
+    def __init__(self, invocation_id):
+        self.invocation_id = invocation_id
+        self.state = {"student_id": "7"}
+
+
+def _tool_context(invocation_id, artifacts=None):
+    ctx = FakeToolContext(artifacts)
+    ctx.invocation_id = invocation_id
+    return ctx
+
+
+def test_before_agent_starts_turn_deadline():
+    ctx = DummyCallbackContext("inv-start")
+    before_agent(ctx)
+    deadline = get_turn_deadline(ctx)
+    assert deadline is not None
+    assert ctx.state[DEADLINE_STATE_KEY] == deadline.expires_at
+    assert deadline.remaining() > 0
+
+
+def test_before_agent_uses_configured_turn_timeout(monkeypatch):
+    monkeypatch.setattr(modulo_before_agent._config, "turn_timeout_secs", 5)
+    ctx = DummyCallbackContext("inv-config")
+    before_agent(ctx)
+    assert 0 < get_turn_deadline(ctx).remaining() <= 5
+
+
+@pytest.mark.asyncio
+async def test_tool_times_out_with_remaining_budget(fake_backend):
+    fake_backend.latency_secs = 1.0
+    start_turn("inv-timeout", timeout_secs=0.1)
+    audio = types.Part.from_bytes(data=b"RIFF" + b"\x04" * 16000, mime_type="audio/wav")
+    ctx = _tool_context("inv-timeout", {"pergunta.wav": audio})
+
+    result = await asyncio.wait_for(transcrever_audio("pergunta.wav", ctx), timeout=0.5)
+
+    assert not result["sucesso"]
+    assert result["status"] == "tempo_esgotado"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_turn_stops_tool(fake_backend):
+    fake_backend.latency_secs = 1.0
+    start_turn("inv-cancel", timeout_secs=30)
+    ctx = _tool_context("inv-cancel")
+
+    task = asyncio.create_task(gerar_audio_tts("Olá de novo", ctx))
+    await asyncio.sleep(0.05)
+    assert cancel_turn("inv-cancel")
+    result = await asyncio.wait_for(task, timeout=0.5)
+
+    assert not result["sucesso"]
+    assert result["status"] == "cancelado"
+
+
+@pytest.mark.asyncio
+async def test_stream_is_cut_when_the_turn_expires(fake_backend):
+    from professor_virtual.shared_libraries.deadline import DeadlineExceeded
+    from professor_virtual.tools.gerar_audio_tts import gerar_audio_tts_stream
+
+    fake_backend.stream_chunk_bytes = 2400
+    fake_backend.stream_chunk_interval_secs = 0.05
+    start_turn("inv-stream", timeout_secs=0.12)
+    ctx = _tool_context("inv-stream")
+
+    recebidos = []
+    with pytest.raises(DeadlineExceeded):
+        async for bloco in gerar_audio_tts_stream("Uma resposta bem longa " * 4, ctx):
+            recebidos.append(bloco)
+
+    assert len(recebidos) >= 2
+    assert not any(nome.startswith("user:tts_") for nome in ctx.artifacts)
+
+
+@pytest.mark.asyncio
+async def test_expired_turn_cancels_the_model_call(fake_backend):
+    fake_backend.latency_secs = 0.5
+    start_turn("inv-cancela-chamada", timeout_secs=0.1)
+    ctx = _tool_context("inv-cancela-chamada")
+
+    result = await gerar_audio_tts("Resposta que não chega a tempo", ctx)
+    await asyncio.sleep(0.05)
+
+    assert result["status"] == "tempo_esgotado"
+    assert fake_backend.calls[0].get("cancelled")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_turn_cancels_the_model_call(fake_backend):
+    fake_backend.latency_secs = 0.5
+    start_turn("inv-cancela-turno", timeout_secs=30)
+    ctx = _tool_context("inv-cancela-turno")
+
+    task = asyncio.create_task(gerar_audio_tts("Resposta que ninguém vai ouvir", ctx))
+    await asyncio.sleep(0.05)
+    cancel_turn("inv-cancela-turno")
+    result = await task
+    await asyncio.sleep(0.05)
+
+    assert result["status"] == "cancelado"
+    assert fake_backend.calls[0].get("cancelled")
+
+
+@pytest.mark.asyncio
+async def test_shared_call_survives_until_its_last_waiter_leaves():
+    voo = SingleFlight("teste")
+    iniciadas, canceladas = [], []
+
+    async def chamada():
+        iniciadas.append(1)
+        try:
+            await asyncio.sleep(0.2)
+            return "ok"
+        except asyncio.CancelledError:
+            canceladas.append(1)
+            raise
+
+    primeiro = asyncio.create_task(voo.do("k", chamada))
+    segundo = asyncio.create_task(voo.do("k", chamada))
+    await asyncio.sleep(0.05)
+    primeiro.cancel()
+    assert await segundo == "ok"
+    assert canceladas == []
+
+    terceiro = asyncio.create_task(voo.do("k", chamada))
+    await asyncio.sleep(0.05)
+    terceiro.cancel()
+    await asyncio.sleep(0.01)
+    assert canceladas == [1] and len(voo) == 0
+    assert voo.stats()["abandoned"] == 1
+
+
+class _RunnerLento:
+    """Runner que registra o turno, emite um evento e fica trabalhando."""
+
+    app_name = "professor_virtual_app"
+
+    def __init__(self, eventos=1, trabalho_secs=10.0):
+        self.session_service = InMemorySessionService()
+        self.eventos = eventos
+        self.trabalho_secs = trabalho_secs
+
+    async def run_async(self, *, user_id, session_id, new_message):
+        start_turn("inv-runner", 60)
+        for _ in range(self.eventos):
+            yield Event(invocation_id="inv-runner", author="professor")
+        await asyncio.sleep(self.trabalho_secs)
+
+
+@pytest.mark.asyncio
+async def test_consumer_leaving_cancels_the_runner_turn():
+    mensagem = types.Content(role="user", parts=[types.Part(text="oi")])
+    eventos = eventos_do_turno(_RunnerLento(), "aluno", "s1", mensagem)
+
+    primeiro = await eventos.__anext__()
+    deadline = get_turn_deadline(DummyCallbackContext(primeiro.invocation_id))
+    proximo = asyncio.ensure_future(eventos.__anext__())
+    await asyncio.sleep(0.01)
+    proximo.cancel()  # what Starlette does when the client disconnects
+    await asyncio.gather(proximo, return_exceptions=True)
+
+    assert deadline.cancelled
+    assert deadline.cancel_reason == "client_disconnected"
+
+
+def test_http_endpoint_streams_runner_events():
+    runner = _RunnerLento(eventos=2, trabalho_secs=0)
+    app = FastAPI()
+    app.include_router(criar_router_execucao(runner))
+    session = asyncio.run(
+        runner.session_service.create_session(app_name=runner.app_name, user_id="aluno")
+    )
+
+    resposta = TestClient(app).post(
+        "/agente/eventos", json={"user_id": "aluno", "session_id": session.id, "texto": "oi"}
+    )
+
+    eventos = [json.loads(e.removeprefix("data: ")) for e in resposta.text.strip().split("\n\n")]
+    assert [e["invocationId"] for e in eventos] == ["inv-runner"] * 2
+    assert get_turn_deadline(DummyCallbackContext("inv-runner")) is None
+
+
+def _llm_request():
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="oi")])])
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_wait_and_model_call_are_bounded_by_the_turn():
+    start_turn("inv-modelo", timeout_secs=30)
+    pedido = _llm_request()
+
+    assert await rate_limit_callback(DummyCallbackContext("inv-modelo"), pedido) is None
+    assert 0 < pedido.config.http_options.timeout <= 30_000
+
+    start_turn("inv-esgotado", timeout_secs=0)
+    resposta = await rate_limit_callback(DummyCallbackContext("inv-esgotado"), _llm_request())
+    assert resposta.content.parts[0].text == TURN_OVER_MESSAGE
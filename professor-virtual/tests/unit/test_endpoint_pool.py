@@ -0,0 +1,162 @@
+import importlib
+import logging
+import random
+
+import pytest
+from google.genai import errors
+
+from professor_virtual.shared_libraries.endpoint_pool import EndpointPool, parse_locations
+from professor_virtual.shared_libraries.genai_backend import (
+    FakeGenaiBackend,
+    GeminiBackend,
+    GenaiBackend,
+    get_genai_backend,
+    reset_genai_backend,
+)
+
+modulo_backend = importlib.import_module(
+    "professor_virtual.shared_libraries.genai_backend.genai_backend"
+)
+
+
+def _quota():
+    return errors.ClientError(429, {"error": {"message": "regional quota"}})
+
+
+def test_parse_locations():
+    assert parse_locations("us-central1:3, us-east4") == {"us-central1": 3.0, "us-east4": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_fails_over_on_regional_quota_and_cools_down():
+    central = FakeGenaiBackend(errors=[_quota()])
+    east = FakeGenaiBackend()
+    pool = EndpointPool(
+        {"us-central1": central, "us-east4": east},
+        weights={"us-central1": 1000, "us-east4": 1},
+        rng=random.Random(0),
+    )
+
+    response = await pool.generate_content(model="m", contents="oi")
+    assert response.text
+    assert len(central.calls) == 1 and len(east.calls) == 1
+    assert pool.failovers == 1
+
+    # us-central1 is cooling down, so the next call goes straight to us-east4.
+    await pool.generate_content(model="m", contents="oi")
+    assert len(central.calls) == 1 and len(east.calls) == 2
+    stats = {s["location"]: s for s in pool.stats()}
+    assert stats["us-central1"]["cooling_down"]
+    assert stats["us-east4"]["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_raises_when_every_location_fails():
+    pool = EndpointPool(
+        {"a": FakeGenaiBackend(errors=[_quota()]), "b": FakeGenaiBackend(errors=[_quota()])}
+    )
+    with pytest.raises(errors.ClientError):
+        await pool.generate_content(model="m", contents="oi")
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_count_against_the_location():
+    central = FakeGenaiBackend(errors=[errors.ClientError(400, {"error": {"message": "bad"}})])
+    pool = _pool_preferring_central(central, FakeGenaiBackend())
+
+    with pytest.raises(errors.ClientError):
+        await pool.generate_content(model="m", contents="oi")
+
+    stats = {s["location"]: s for s in pool.stats()}
+    assert stats["us-central1"]["errors"] == 0
+    assert stats["us-central1"]["error_rate_ewma"] == 0
+    assert not stats["us-central1"]["cooling_down"] and pool.failovers == 0
+
+
+@pytest.mark.asyncio
+async def test_prefers_faster_location():
+    fast = FakeGenaiBackend()
+    slow = FakeGenaiBackend(latency_secs=0.02)
+    pool = EndpointPool({"fast": fast, "slow": slow}, rng=random.Random(1))
+    for _ in range(40):
+        await pool.generate_content(model="m", contents="oi")
+    assert len(fast.calls) > len(slow.calls)
+
+
+def _pool_preferring_central(central, east):
+    return EndpointPool(
+        {"us-central1": central, "us-east4": east},
+        weights={"us-central1": 1000, "us-east4": 1},
+        rng=random.Random(0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_fails_over_before_the_first_chunk():
+    central = FakeGenaiBackend(errors=[_quota()])
+    east = FakeGenaiBackend()
+    pool = _pool_preferring_central(central, east)
+
+    chunks = [c async for c in pool.generate_content_stream(model="m", contents="Diga oi")]
+
+    assert chunks
+    assert len(central.calls) == 1 and east.calls[0]["stream"]
+    assert pool.failovers == 1
+
+
+class _ChunkedBackend(GenaiBackend):
+    def __init__(self):
+        self.closed = False
+
+    async def generate_content(self, *, model, contents, config=None):
+        raise NotImplementedError
+
+    async def generate_content_stream(self, *, model, contents, config=None):
+        try:
+            for i in range(5):
+                yield i
+        finally:
+            self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_stream_closes_the_location_stream_when_the_consumer_stops():
+    backend = _ChunkedBackend()
+    pool = EndpointPool({"us-central1": backend})
+
+    chunks = pool.generate_content_stream(model="m", contents="Diga oi")
+    assert await chunks.__anext__() == 0
+    await chunks.aclose()
+
+    assert backend.closed
+
+
+@pytest.mark.asyncio
+async def test_upload_fails_over_to_another_location():
+    central = FakeGenaiBackend(errors=[_quota()])
+    east = FakeGenaiBackend()
+    pool = _pool_preferring_central(central, east)
+
+    arquivo = await pool.upload_file(data=b"audio", mime_type="audio/mpeg")
+
+    assert arquivo.uri in east.files
+    assert len(central.uploads) == 1 and pool.failovers == 1
+
+
+@pytest.mark.parametrize("vertexai", [True, False])
+def test_pool_is_only_built_for_vertex_ai(monkeypatch, caplog, vertexai):
+    monkeypatch.setenv("GOOGLE_CLOUD_LOCATIONS", "us-central1:3,us-east4:1")
+    monkeypatch.setattr(modulo_backend, "uses_vertexai", lambda: vertexai)
+    reset_genai_backend()
+    try:
+        with caplog.at_level(logging.WARNING):
+            backend = get_genai_backend()
+    finally:
+        reset_genai_backend()
+
+    if vertexai:
+        assert isinstance(backend, EndpointPool)
+        assert [e.location for e in backend.endpoints] == ["us-central1", "us-east4"]
+    else:
+        assert isinstance(backend, GeminiBackend)
+        assert "GOOGLE_CLOUD_LOCATIONS ignored" in caplog.text
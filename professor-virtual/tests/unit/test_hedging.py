@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from google.genai import errors
+
+from professor_virtual.shared_libraries.concurrency import ModelCallController
+from professor_virtual.shared_libraries.hedging import HedgingPolicy, LatencyTracker
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100)
+    for i in range(1, 101):
+        tracker.record(i / 100)
+    assert tracker.percentile(50) == 0.5
+    assert tracker.percentile(95) == 0.95
+
+
+def _warmed_policy(**kwargs):
+    policy = HedgingPolicy("test", min_samples=5, **kwargs)
+    for _ in range(10):
+        policy.latencies.record(0.02)
+    policy.requests = 100
+    return policy
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    policy = _warmed_policy(max_fraction=0.5)
+    calls = []
+
+    async def call():
+        attempt = len(calls)
+        calls.append(attempt)
+        try:
+            await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            calls.append("cancelled")
+            raise
+        return attempt
+
+    assert await asyncio.wait_for(policy.run(call), timeout=0.5) == 1
+    await asyncio.sleep(0)
+    assert "cancelled" in calls
+    assert policy.stats()["hedges_sent"] == 1
+    assert policy.stats()["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_hedges_are_capped_by_fraction():
+    policy = _warmed_policy(max_fraction=0.0)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    assert await policy.run(call) == "ok"
+    assert calls == 1
+    assert policy.stats()["hedges_sent"] == 0
+
+
+@pytest.mark.asyncio
+async def test_losing_primary_latency_is_recorded():
+    policy = _warmed_policy(max_fraction=0.5)
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    await policy.run(call)
+    await asyncio.sleep(0)
+    # The warm-up samples, the winning hedge and the cancelled primary
+    assert len(policy.latencies) == 12
+    assert policy.latencies.percentile(100) > 0.02
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hedge_leaves_the_primary_running():
+    policy = _warmed_policy(max_fraction=0.5)
+    calls = []
+
+    async def call():
+        calls.append(len(calls))
+        if len(calls) == 2:
+            raise asyncio.CancelledError()
+        await asyncio.sleep(0.1)
+        return "primary"
+
+    assert await policy.run(call) == "primary"
+    assert policy.stats()["primary_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_controller_hedges_each_attempt_not_the_backoff():
+    policy = _warmed_policy(max_fraction=0.5)
+    controller = ModelCallController("gemini-test", base_delay_secs=0.2, max_attempts=2)
+    failures = [errors.ServerError(503, {"error": {"message": "unavailable"}})]
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if failures:
+            raise failures.pop()
+        return "ok"
+
+    controller.backoff_delay = lambda attempt: 0.2
+    assert await controller.call(call, hedging=policy) == "ok"
+    assert calls == 2
+    assert policy.stats()["hedges_sent"] == 0
@@ -0,0 +1,53 @@
+import threading
+
+from professor_virtual.shared_libraries.lru_cache import LRUCache
+
+
+def test_evicts_least_recently_used_within_byte_budget():
+    cache = LRUCache(max_bytes=30, size_fn=len)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    cache.put("c", "z" * 10)
+    assert cache.get("a") == "x" * 10  # "a" becomes most recent
+    cache.put("d", "w" * 10)
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache and "d" in cache
+    assert cache.current_bytes == 30
+    assert cache.stats()["evictions"] == 1
+
+
+def test_rejects_values_larger_than_budget():
+    cache = LRUCache(max_bytes=5, size_fn=len)
+    assert not cache.put("big", "x" * 6)
+    assert len(cache) == 0
+
+
+def test_ttl_expiry_counts_as_miss():
+    now = [0.0]
+    cache = LRUCache(max_bytes=100, ttl_secs=10, size_fn=len, clock=lambda: now[0])
+    cache.put("k", "v")
+    assert cache.get("k") == "v"
+    now[0] = 11
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["expirations"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_concurrent_access_keeps_accounting_consistent():
+    cache = LRUCache(max_bytes=1000, size_fn=len)
+
+    def worker(n):
+        for i in range(500):
+            cache.put((n, i % 50), "x" * (i % 20 + 1))
+            cache.get((n, (i + 7) % 50))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert cache.current_bytes <= 1000
+    assert cache.current_bytes == sum(len(cache.get(k)) for k in list(cache._entries))
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.sessions import InMemorySessionService, Session
+
+from professor_virtual.shared_libraries.callbacks.rate_limit_callback import session_scope
+from professor_virtual.shared_libraries.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(rpm=60, capacity=2, clock=lambda: now[0])
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    now[0] += 1.0
+    assert bucket.try_acquire()
+
+
+@pytest.mark.asyncio
+async def test_throttled_session_does_not_block_others():
+    limiter = RateLimiter(session_rpm=1)
+    await limiter.acquire(user_id="u1", session_id="s1")
+
+    throttled = asyncio.create_task(limiter.acquire(user_id="u1", session_id="s1"))
+    await asyncio.sleep(0.05)
+    assert not throttled.done()
+    assert limiter.queue_depth()["session"] == 1
+
+    waited = await asyncio.wait_for(
+        limiter.acquire(user_id="u2", session_id="s2"), timeout=0.5
+    )
+    assert waited == 0
+
+    throttled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await throttled
+    assert limiter.queue_depth()["session"] == 0
+
+
+@pytest.mark.asyncio
+async def test_global_scope_awaits_refill():
+    limiter = RateLimiter(global_rpm=600)  # 10 tokens/s
+    limiter._global._tokens = 0
+    waited = await limiter.acquire()
+    assert 0.05 < waited < 0.5
+    assert limiter.stats()["total_acquired"] == 1
+
+
+def test_session_scope_reads_a_real_adk_callback_context():
+    session = Session(id="s1", app_name="professor_virtual_app", user_id="u1")
+    invocation = InvocationContext(
+        session_service=InMemorySessionService(),
+        invocation_id="inv-1",
+        agent=LlmAgent(name="professor"),
+        session=session,
+    )
+
+    assert session_scope(CallbackContext(invocation)) == ("u1", "s1")
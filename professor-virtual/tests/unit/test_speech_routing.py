@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+from google.genai import types
+
+from professor_virtual.shared_libraries.audio import encode_wav
+from professor_virtual.shared_libraries.circuit_breaker import get_circuit_breaker
+from professor_virtual.shared_libraries.speech import (
+    SpeechRouter,
+    SpeechToTextEngine,
+    SynthesizedSpeech,
+    TextToSpeechEngine,
+    Transcript,
+    normalize_phrase,
+    quota_pressure,
+    reset_local_engines,
+    set_local_stt_engine,
+    set_local_tts_engine,
+    set_speech_router,
+)
+from professor_virtual.tools import gerar_audio_tts, transcrever_audio
+from conftest import FakeToolContext
+
+RATE = 16000
+
+
+class FakeLocalStt(SpeechToTextEngine):
+    name = "stt_local_fake"
+
+    def __init__(self, text="sim", error=None):
+        self.text = text
+        self.error = error
+        self.calls = 0
+
+    async def transcribe(self, audio, mime_type, language="pt"):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return Transcript(text=self.text, language="pt", confidence=0.9)
+
+
+class FakeLocalTts(TextToSpeechEngine):
+    name = "tts_local_fake"
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    async def synthesize(self, text):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return SynthesizedSpeech(pcm=b"\x00\x01" * 16000, sample_rate=16000)
+
+
+@pytest.fixture
+def local_engines():
+    stt, tts = FakeLocalStt(), FakeLocalTts()
+    set_local_stt_engine(stt)
+    set_local_tts_engine(tts)
+    set_speech_router(SpeechRouter(local_max_secs=3.0, local_phrases=["Muito bem!"]))
+    yield stt, tts
+    reset_local_engines()
+    set_speech_router(None)
+
+
+def _gravacao(secs, freq):
+    t = np.arange(int(secs * RATE)) / RATE
+    samples = (0.3 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+    return types.Part.from_bytes(data=encode_wav(samples, RATE), mime_type="audio/wav")
+
+
+def test_phrase_normalization_ignores_case_accents_and_punctuation():
+    assert normalize_phrase("  Você ACERTOU!! ") == normalize_phrase("voce acertou")
+
+
+def test_router_policy():
+    router = SpeechRouter(local_max_secs=3.0, local_phrases=["Isso mesmo!"])
+    modelo = "modelo-roteamento-teste"
+
+    assert router.route_transcription(2.0, modelo, has_local=True).reason == "short_audio"
+    assert router.route_transcription(10.0, modelo, has_local=True).engine == "gemini"
+    assert router.route_transcription(None, modelo, has_local=True).engine == "gemini"
+    assert router.route_transcription(2.0, modelo, has_local=False).reason == "no_local_engine"
+    assert router.route_synthesis("isso mesmo", modelo, has_local=True).reason == "whitelisted_phrase"
+    assert router.route_synthesis("Vamos estudar frações.", modelo, has_local=True).engine == "gemini"
+    assert SpeechRouter(mode="local").route_synthesis("qualquer", modelo, True).reason == "pinned"
+    assert router.stats()["local:short_audio"] == 1
+
+
+def test_open_breaker_counts_as_full_quota_pressure():
+    modelo = "modelo-pressao-teste"
+    router = SpeechRouter(local_max_secs=3.0, pressure_max_secs=15.0)
+    assert quota_pressure(modelo) == 0.0
+    assert router.route_transcription(10.0, modelo, has_local=True).engine == "gemini"
+
+    breaker = get_circuit_breaker(modelo)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    try:
+        assert quota_pressure(modelo) == 1.0
+        rota = router.route_transcription(10.0, modelo, has_local=True)
+        assert (rota.engine, rota.reason) == ("local", "quota_pressure")
+        assert router.route_transcription(30.0, modelo, has_local=True).engine == "gemini"
+    finally:
+        breaker.record_success()
+
+
+@pytest.mark.asyncio
+async def test_short_audio_is_transcribed_locally(fake_backend, local_engines):
+    stt, _ = local_engines
+    ctx = FakeToolContext({"curto.wav": _gravacao(1.5, 310.0), "longo.wav": _gravacao(6.0, 320.0)})
+
+    curto = await transcrever_audio("curto.wav", ctx)
+    longo = await transcrever_audio("longo.wav", ctx)
+
+    assert curto["sucesso"] and curto["texto"] == "sim"
+    assert (curto["motor"], curto["envio"], curto["tokens_audio_estimados"]) == (
+        "stt_local_fake", "local", 0
+    )
+    assert longo["motor"] == "gemini"
+    assert stt.calls == 1
+    assert [c["kind"] for c in fake_backend.calls] == ["transcricao"]
+
+
+@pytest.mark.asyncio
+async def test_local_engine_failure_falls_back_to_gemini(fake_backend, local_engines):
+    stt, _ = local_engines
+    stt.error = RuntimeError("modelo não instalado")
+    ctx = FakeToolContext({"curto.wav": _gravacao(1.5, 330.0)})
+
+    resultado = await transcrever_audio("curto.wav", ctx)
+
+    assert resultado["sucesso"] and resultado["motor"] == "gemini"
+    assert len(fake_backend.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_whitelisted_phrase_is_synthesized_locally(fake_backend, local_engines):
+    _, tts = local_engines
+    ctx = FakeToolContext()
+
+    local = await gerar_audio_tts("muito bem", ctx)
+    remoto = await gerar_audio_tts("Vamos revisar a tabuada do sete.", ctx)
+
+    assert local["sucesso"] and local["motor"] == "tts_local_fake"
+    assert local["roteamento"] == "whitelisted_phrase"
+    wav = ctx.artifacts[local["nome_artefato_gerado"]].inline_data.data
+    assert int.from_bytes(wav[24:28], "little") == 16000
+    assert remoto["motor"] == "gemini"
+    assert tts.calls == 1
+    assert [c["kind"] for c in fake_backend.calls] == ["tts"]
+
+
+@pytest.mark.asyncio
+async def test_gemini_fallback_is_cached_under_the_local_route(fake_backend, local_engines):
+    _, tts = local_engines
+    tts.error = RuntimeError("motor local fora do ar")
+    ctx = FakeToolContext()
+
+    primeiro = await gerar_audio_tts("Muito bem!", ctx)
+    segundo = await gerar_audio_tts("Muito bem!", ctx)
+
+    assert primeiro["sucesso"] and primeiro["motor"] == "gemini"
+    assert segundo["fonte_cache"]
+    assert segundo["nome_artefato_gerado"] == primeiro["nome_artefato_gerado"]
+    assert tts.calls == 1 and len(fake_backend.calls) == 1
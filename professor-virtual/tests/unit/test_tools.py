@@ -1,63 +1,195 @@
+import asyncio
+
 import pytest
+from google.genai import errors, types
+
+from professor_virtual.shared_libraries.deadline import start_turn
+from professor_virtual.shared_libraries.file_uploads import content_hash, get_file_upload_index
 from professor_virtual.tools import (
     transcrever_audio,
     analisar_necessidade_visual,
     analisar_imagem_educacional,
     gerar_audio_tts,
 )
+from conftest import FakeToolContext
 
 
-class FakeArtifact:
-    def __init__(self, name, content):
-        self.name = name
-        self.content = content
-
-
-class FakeSession:
-    def __init__(self):
-        self.artifacts = {}
-
-    def get_artifact(self, name):
-        return self.artifacts.get(name)
+def _part(data, mime_type):
+    return types.Part.from_bytes(data=data, mime_type=mime_type)
 
-    def create_artifact(self, name, content, mime_type=None):
-        self.artifacts[name] = FakeArtifact(name, content)
 
-
-class FakeToolContext:
-    def __init__(self, session):
-        self.session = session
+@pytest.mark.asyncio
+async def test_transcrever_audio(fake_backend):
+    ctx = FakeToolContext({"pergunta.wav": _part(b"RIFF" + b"0" * 16000, "audio/wav")})
+    result = await transcrever_audio("pergunta.wav", ctx)
+    assert result["sucesso"]
+    assert result["texto"] == fake_backend.transcricao["transcricao"]
+    assert fake_backend.calls[0]["kind"] == "transcricao"
 
 
-def test_transcrever_audio():
-    session = FakeSession()
-    session.artifacts["pergunta.wav"] = FakeArtifact("pergunta.wav", b"0" * 16000)
-    ctx = FakeToolContext(session)
-    result = transcrever_audio("pergunta.wav", ctx)
-    assert result["sucesso"]
-    assert "texto" in result
+@pytest.mark.asyncio
+async def test_transcrever_audio_erro_do_modelo(fake_backend):
+    fake_backend.queue_error(errors.ClientError(400, {"error": {"message": "inválido"}}))
+    ctx = FakeToolContext({"pergunta.wav": _part(b"RIFF" + b"9" * 16000, "audio/wav")})
+    result = await transcrever_audio("pergunta.wav", ctx)
+    assert not result["sucesso"]
+    assert result["detalhes_erro"]["tipo"] == "ClientError"
 
 
 def test_analisar_necessidade_visual():
-    ctx = FakeToolContext(FakeSession())
+    ctx = FakeToolContext()
     texto = "Olhe essa figura aqui"
     result = analisar_necessidade_visual(texto, ctx)
     assert result["necessita_imagem"]
 
 
-def test_analisar_imagem_educacional():
-    session = FakeSession()
-    session.artifacts["exercicio.png"] = FakeArtifact("exercicio.png", b"1" * 20000)
-    ctx = FakeToolContext(session)
-    result = analisar_imagem_educacional("exercicio.png", "qual é a resposta?", ctx)
+@pytest.mark.asyncio
+async def test_analisar_imagem_educacional(fake_backend):
+    ctx = FakeToolContext({"exercicio.png": _part(b"1" * 20000, "image/png")})
+    result = await analisar_imagem_educacional("exercicio.png", "qual é a resposta?", ctx)
     assert result["sucesso"]
     assert result["qualidade_adequada"] in (True, False)
+    assert result["tipo_conteudo"] == "exercicio_matematica"
 
 
-def test_gerar_audio_tts():
-    session = FakeSession()
-    ctx = FakeToolContext(session)
-    result = gerar_audio_tts("Olá", ctx)
+@pytest.mark.asyncio
+async def test_gerar_audio_tts(fake_backend):
+    ctx = FakeToolContext()
+    result = await gerar_audio_tts("Olá", ctx)
     assert result["sucesso"]
-    assert result["nome_artefato_gerado"] in session.artifacts
-
+    assert result["nome_artefato_gerado"] in ctx.artifacts
+    wav = ctx.artifacts[result["nome_artefato_gerado"]].inline_data.data
+    assert wav[:4] == b"RIFF"
+
+
+@pytest.mark.asyncio
+async def test_gerar_audio_tts_une_todas_as_partes_de_audio(fake_backend, monkeypatch):
+    def resposta_em_duas_partes(contents):
+        pcm = b"\x01\x00" * 2400
+        partes = [
+            types.Part(inline_data=types.Blob(data=pcm, mime_type="audio/L16;codec=pcm;rate=24000"))
+            for _ in range(2)
+        ]
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=partes))]
+        )
+
+    monkeypatch.setattr(fake_backend, "_audio_response", resposta_em_duas_partes)
+    ctx = FakeToolContext()
+    result = await gerar_audio_tts("Olá de novo", ctx)
+
+    wav = ctx.artifacts[result["nome_artefato_gerado"]].inline_data.data
+    assert wav[44:] == b"\x01\x00" * 4800
+
+
+@pytest.mark.asyncio
+async def test_gerar_audio_tts_degrada_com_circuito_aberto(fake_backend):
+    from professor_virtual.shared_libraries.circuit_breaker import get_circuit_breaker
+
+    breaker = get_circuit_breaker("gemini-2.5-flash-preview-tts")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    try:
+        result = await gerar_audio_tts("Resposta longa", FakeToolContext())
+    finally:
+        breaker.record_success()
+
+    assert not result["sucesso"]
+    assert result["degradado"]
+    assert result["modo_resposta"] == "somente_texto"
+    assert fake_backend.calls == []
+
+
+@pytest.mark.asyncio
+async def test_large_audio_goes_through_files_api_once(fake_backend):
+    audio = types.Part.from_bytes(
+        data=b"ID3" + b"\x07" * (21 * 1024 * 1024), mime_type="audio/mpeg"
+    )
+    ctx = FakeToolContext({"aula.mp3": audio})
+
+    primeiro = await transcrever_audio("aula.mp3", ctx)
+    segundo = await analisar_imagem_educacional("aula.mp3", "?", ctx)
+
+    assert primeiro["sucesso"] and primeiro["envio"] == "files_api"
+    assert len(fake_backend.uploads) == 1
+    file_data = fake_backend.calls[0]["contents"][1].file_data
+    assert file_data.file_uri in fake_backend.files
+    # Same bytes, different tool: the indexed URI is reused.
+    assert segundo["sucesso"]
+    assert len(fake_backend.uploads) == 1
+    assert fake_backend.calls[1]["contents"][0].file_data.file_uri == file_data.file_uri
+
+
+@pytest.mark.asyncio
+async def test_reused_media_is_uploaded_on_second_request(fake_backend):
+    imagem = types.Part.from_bytes(
+        data=b"\x89PNG" + b"\x08" * (2 * 1024 * 1024), mime_type="image/png"
+    )
+    ctx = FakeToolContext({"lousa.png": imagem})
+
+    await analisar_imagem_educacional("lousa.png", "primeira pergunta", ctx)
+    await analisar_imagem_educacional("lousa.png", "segunda pergunta", ctx)
+    await analisar_imagem_educacional("lousa.png", "terceira pergunta", ctx)
+
+    assert fake_backend.calls[0]["contents"][0].inline_data is not None
+    assert fake_backend.calls[1]["contents"][0].file_data is not None
+    assert len(fake_backend.uploads) == 1
+
+
+@pytest.mark.asyncio
+async def test_large_media_is_rejected_without_files_api(fake_backend):
+    fake_backend.supports_files_api = False
+    audio = types.Part.from_bytes(
+        data=b"ID3" + b"\x09" * (21 * 1024 * 1024), mime_type="audio/mpeg"
+    )
+    imagem = types.Part.from_bytes(
+        data=b"\x89PNG" + b"\x09" * (6 * 1024 * 1024), mime_type="image/png"
+    )
+    ctx = FakeToolContext({"aula.mp3": audio, "mapa.png": imagem})
+
+    transcricao = await transcrever_audio("aula.mp3", ctx)
+    analise = await analisar_imagem_educacional("mapa.png", "?", ctx)
+
+    assert not transcricao["sucesso"] and "Máximo: 20MB" in transcricao["erro"]
+    assert not analise["sucesso"] and analise["erro"] == "Imagem muito grande (máximo 5MB)"
+    assert fake_backend.uploads == [] and fake_backend.calls == []
+
+
+@pytest.mark.asyncio
+async def test_upload_stops_at_the_turn_deadline(fake_backend):
+    fake_backend.upload_latency_secs = 1.0
+    start_turn("inv-upload", timeout_secs=0.1)
+    imagem = types.Part.from_bytes(
+        data=b"\x89PNG" + b"\x0b" * (6 * 1024 * 1024), mime_type="image/png"
+    )
+    ctx = FakeToolContext({"mapa.png": imagem})
+    ctx.invocation_id = "inv-upload"
+
+    analise = await asyncio.wait_for(
+        analisar_imagem_educacional("mapa.png", "?", ctx), timeout=0.5
+    )
+
+    assert not analise["sucesso"]
+    assert fake_backend.uploads[0]["cancelled"] and fake_backend.calls == []
+
+
+@pytest.mark.asyncio
+async def test_expired_upload_is_uploaded_again_and_retried(fake_backend):
+    imagem = types.Part.from_bytes(
+        data=b"\x89PNG" + b"\x0a" * (6 * 1024 * 1024), mime_type="image/png"
+    )
+    ctx = FakeToolContext({"mapa.png": imagem})
+
+    primeiro = await analisar_imagem_educacional("mapa.png", "primeira", ctx)
+    # O arquivo sumiu da Files API antes do prazo indexado
+    fake_backend.files.clear()
+    segundo = await analisar_imagem_educacional("mapa.png", "segunda", ctx)
+    terceiro = await analisar_imagem_educacional("mapa.png", "terceira", ctx)
+
+    assert primeiro["sucesso"] and segundo["sucesso"] and terceiro["sucesso"]
+    assert len(fake_backend.uploads) == 2
+    # Falha com a URI antiga, nova tentativa com a nova e reuso dela depois
+    uris = [c["contents"][0].file_data.file_uri for c in fake_backend.calls]
+    assert len(uris) == 4 and uris[1] == uris[0] and uris[2] == uris[3] != uris[0]
+    # The retry is not counted as another request for the same image
+    assert get_file_upload_index()._seen.get(content_hash(imagem.inline_data.data)) == 3
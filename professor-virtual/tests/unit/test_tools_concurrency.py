@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+from google.genai import types
+
+from professor_virtual.tools import (
+    transcrever_audio,
+    analisar_imagem_educacional,
+    gerar_audio_tts,
+)
+from conftest import FakeToolContext
+
+GEMINI_LATENCY_SECS = 0.3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tool_calls_overlap(fake_backend):
+    fake_backend.latency_secs = GEMINI_LATENCY_SECS
+    audio = types.Part.from_bytes(data=b"RIFF" + b"\x01" * 32000, mime_type="audio/wav")
+    imagem = types.Part.from_bytes(data=b"\x89PNG" + b"\x02" * 20000, mime_type="image/png")
+    ctx = FakeToolContext({"pergunta.wav": audio, "exercicio.png": imagem})
+
+    start = time.monotonic()
+    resultados = await asyncio.gather(
+        transcrever_audio("pergunta.wav", ctx),
+        analisar_imagem_educacional("exercicio.png", "qual é a resposta?", ctx),
+    )
+    elapsed = time.monotonic() - start
+
+    assert all(r["sucesso"] for r in resultados)
+    assert len(fake_backend.calls) == 2
+    # Sequential calls would take at least 2x the model latency.
+    assert elapsed < 2 * GEMINI_LATENCY_SECS
+
+
+@pytest.mark.asyncio
+async def test_duplicate_in_flight_requests_are_coalesced(fake_backend):
+    fake_backend.latency_secs = 0.05
+    audio = types.Part.from_bytes(data=b"RIFF" + b"\x03" * 32000, mime_type="audio/wav")
+    ctx = FakeToolContext({"pergunta.wav": audio})
+
+    resultados = await asyncio.gather(
+        transcrever_audio("pergunta.wav", ctx),
+        transcrever_audio("pergunta.wav", ctx),
+        gerar_audio_tts("Muito bem!", ctx),
+        gerar_audio_tts("Muito bem!", ctx),
+    )
+
+    assert all(r["sucesso"] for r in resultados)
+    assert resultados[0]["texto"] == resultados[1]["texto"]
+    assert [c["kind"] for c in fake_backend.calls].count("transcricao") == 1
+    assert [c["kind"] for c in fake_backend.calls].count("tts") == 1
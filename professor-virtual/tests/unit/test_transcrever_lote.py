@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import pytest
+
+from professor_virtual.batch.transcrever_lote import TranscricaoEmLote, listar_diretorio
+
+
+def _gravacoes(raiz, quantidade):
+    raiz.mkdir()
+    (raiz / "leia-me.txt").write_text("ignorado")
+    for i in range(quantidade):
+        (raiz / f"aluno_{i}.mp3").write_bytes(b"ID3" + bytes([0x60 + i]) * 4000)
+
+
+@pytest.mark.asyncio
+async def test_lote_grava_jsonl_e_retoma(fake_backend, tmp_path):
+    raiz = tmp_path / "gravacoes"
+    _gravacoes(raiz, 4)
+    saida = tmp_path / "saida.jsonl"
+
+    lote = TranscricaoEmLote(saida, concorrencia=2, rpm=6000, base=raiz)
+    contagem = await lote.executar(listar_diretorio(raiz))
+
+    assert contagem["sucesso"] == 4
+    registros = [json.loads(l) for l in saida.read_text().splitlines()]
+    assert sorted(r["caminho"] for r in registros) == [f"aluno_{i}.mp3" for i in range(4)]
+    assert all(r["sucesso"] and r["texto"] for r in registros)
+
+    # Simula queda no meio da gravação de uma linha e uma gravação nova
+    with saida.open("a") as f:
+        f.write('{"caminho": "aluno_')
+    (raiz / "aluno_9.mp3").write_bytes(b"ID3" + b"\x70" * 4000)
+    chamadas = len(fake_backend.calls)
+
+    lote = TranscricaoEmLote(saida, concorrencia=2, rpm=6000, base=raiz)
+    contagem = await lote.executar(listar_diretorio(raiz))
+
+    assert contagem == {"sucesso": 1, "falha": 0, "transitorio": 0, "pulado": 4}
+    assert len(fake_backend.calls) == chamadas + 1
+    linhas = saida.read_text().splitlines()
+    assert len(linhas) == 5
+    assert json.loads(linhas[-1])["caminho"] == "aluno_9.mp3"
+
+
+@pytest.mark.asyncio
+async def test_lote_repete_falhas_transitorias(fake_backend, tmp_path):
+    raiz = tmp_path / "gravacoes"
+    raiz.mkdir()
+    (raiz / "pergunta.mp3").write_bytes(b"ID3" + b"\x71" * 4000)
+    saida = tmp_path / "saida.jsonl"
+    saida.write_text(
+        json.dumps({"caminho": "pergunta.mp3", "sucesso": False, "transitorio": True}) + "\n"
+    )
+
+    contagem = await TranscricaoEmLote(saida, rpm=6000, base=raiz).executar(
+        listar_diretorio(raiz)
+    )
+
+    assert contagem["sucesso"] == 1
+    assert contagem["pulado"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lote_registra_arquivos_ausentes_sem_travar(fake_backend, tmp_path):
+    raiz = tmp_path / "gravacoes"
+    _gravacoes(raiz, 1)
+    saida = tmp_path / "saida.jsonl"
+    caminhos = [raiz / f"sumiu_{i}.mp3" for i in range(3)] + [raiz / "aluno_0.mp3"]
+
+    lote = TranscricaoEmLote(saida, concorrencia=2, rpm=6000, base=raiz)
+    contagem = await asyncio.wait_for(lote.executar(caminhos), timeout=5)
+
+    assert contagem == {"sucesso": 1, "falha": 3, "transitorio": 0, "pulado": 0}
+    registros = {r["caminho"]: r for r in map(json.loads, saida.read_text().splitlines())}
+    assert not registros["sumiu_0.mp3"]["sucesso"]
+    assert "transitorio" not in registros["sumiu_0.mp3"]
+    assert registros["aluno_0.mp3"]["sucesso"]
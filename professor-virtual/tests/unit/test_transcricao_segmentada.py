@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+import types as pytypes
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from professor_virtual.shared_libraries.audio import encode_wav, split_at_silence
+from professor_virtual.tools import transcrever_audio_avancado
+from professor_virtual.tools.transcrever_audio import transcrever_audio_avancado_stream
+from professor_virtual.transcricao_streaming import criar_router_transcricao_stream
+from conftest import FakeToolContext
+
+RATE = 16000
+
+
+def _aula(trechos):
+    """Tone bursts separated by silence: [(tone_secs, silence_secs), ...]."""
+    partes = []
+    for i, (fala, pausa) in enumerate(trechos):
+        t = np.arange(int(fala * RATE)) / RATE
+        partes.append((0.3 * np.sin(2 * np.pi * (200 + 50 * i) * t)).astype(np.float32))
+        partes.append(np.zeros(int(pausa * RATE), np.float32))
+    return np.concatenate(partes)
+
+
+def test_split_at_silence_cuts_inside_pauses():
+    samples = _aula([(20, 2), (23, 2), (23, 0)])
+    limites = split_at_silence(samples, RATE, max_segment_secs=30, min_segment_secs=5)
+
+    assert len(limites) == 3
+    assert limites[0][0] == 0 and limites[-1][1] == len(samples)
+    assert 20 <= limites[0][1] / RATE <= 22
+    assert 45 <= limites[1][1] / RATE <= 47
+    assert all((fim - inicio) / RATE <= 30 for inicio, fim in limites)
+
+
+@pytest.mark.asyncio
+async def test_transcrever_audio_avancado_runs_segments_concurrently(fake_backend):
+    fake_backend.latency_secs = 0.2
+    data = encode_wav(_aula([(20, 2), (23, 2), (23, 0)]), RATE)
+    ctx = FakeToolContext(
+        {"aula.wav": types.Part.from_bytes(data=data, mime_type="audio/wav")}
+    )
+
+    start = time.monotonic()
+    resultado = await transcrever_audio_avancado("aula.wav", ctx, incluir_timestamps=True)
+    elapsed = time.monotonic() - start
+
+    assert resultado["sucesso"]
+    assert [c["kind"] for c in fake_backend.calls].count("transcricao") == 3
+    assert elapsed < 3 * fake_backend.latency_secs
+    inicios = [s["inicio_segundos"] for s in resultado["segmentos"]]
+    assert inicios == sorted(inicios) and inicios[0] == 0
+    assert resultado["texto"].startswith("[00:00] ")
+    assert resultado["duracao_segundos"] == pytest.approx(70.0, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_transcrever_audio_avancado_short_audio_uses_single_call(fake_backend):
+    data = encode_wav(_aula([(3, 1)]), RATE)
+    ctx = FakeToolContext(
+        {"pergunta.wav": types.Part.from_bytes(data=data, mime_type="audio/wav")}
+    )
+
+    resultado = await transcrever_audio_avancado("pergunta.wav", ctx, identificar_speakers=True)
+
+    assert resultado["sucesso"]
+    assert "segmentos" not in resultado
+    assert resultado["configuracoes_avancadas"]["identificacao_falantes_solicitada"]
+    assert len(fake_backend.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_growing_prefix_then_fills_result(fake_backend):
+    data = encode_wav(_aula([(21, 2), (22, 2), (23, 0)]), RATE)
+    ctx = FakeToolContext(
+        {"aula.wav": types.Part.from_bytes(data=data, mime_type="audio/wav")}
+    )
+    resultado = {}
+
+    parciais = [
+        p async for p in transcrever_audio_avancado_stream("aula.wav", ctx, resultado=resultado)
+    ]
+
+    assert [p["segmentos_concluidos"] for p in parciais] == [1, 2, 3]
+    assert all(p["total_segmentos"] == 3 for p in parciais)
+    assert parciais[-1]["texto"] == resultado["texto"]
+    assert resultado["sucesso"]
+
+
+def test_http_endpoint_sends_partial_events_then_result(fake_backend):
+    runner = pytypes.SimpleNamespace(
+        app_name="professor_virtual_app",
+        session_service=InMemorySessionService(),
+        artifact_service=InMemoryArtifactService(),
+    )
+    app = FastAPI()
+    app.include_router(criar_router_transcricao_stream(runner))
+    client = TestClient(app)
+    session = asyncio.run(
+        runner.session_service.create_session(app_name=runner.app_name, user_id="aluno")
+    )
+    data = encode_wav(_aula([(22, 2), (21, 2), (23, 0)]), RATE)
+    asyncio.run(runner.artifact_service.save_artifact(
+        app_name=runner.app_name, user_id="aluno", session_id=session.id,
+        filename="aula.wav", artifact=types.Part.from_bytes(data=data, mime_type="audio/wav"),
+    ))
+
+    resposta = client.get("/transcricao/stream/eventos", params={
+        "user_id": "aluno", "session_id": session.id, "nome_artefato_audio": "aula.wav",
+    })
+
+    assert resposta.headers["content-type"].startswith("text/event-stream")
+    eventos = resposta.text.strip().split("\n\n")
+    nomes = [e.split("\n")[0].removeprefix("event: ") for e in eventos]
+    assert nomes == ["parcial"] * 3 + ["fim"]
+    fim = json.loads(eventos[-1].split("data: ", 1)[1])
+    assert fim["sucesso"] and fim["estatisticas"]["total_segmentos"] == 3
+
+    sem_sessao = client.get("/transcricao/stream/eventos", params={
+        "user_id": "aluno", "session_id": "nenhuma", "nome_artefato_audio": "aula.wav",
+    })
+    assert sem_sessao.status_code == 404
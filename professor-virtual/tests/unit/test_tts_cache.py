@@ -0,0 +1,82 @@
+import pytest
+
+from professor_virtual.shared_libraries.tts_cache import (
+    STORED_AUDIO_STATE_PREFIX,
+    STORED_KEY_STATE_PREFIX,
+    audio_digest,
+    get_tts_cache,
+    normalize_speech_text,
+    speech_key,
+    store_audio,
+    stored_audio,
+)
+from professor_virtual.tools import gerar_audio_tts
+from conftest import FakeToolContext
+
+
+def _nova_sessao(ctx):
+    """Outra sessão do mesmo usuário: artifacts e estado "user:" persistem."""
+    nova = FakeToolContext(ctx.artifacts)
+    nova.versions = ctx.versions
+    nova.state = {k: v for k, v in ctx.state.items() if k.startswith("user:")}
+    return nova
+
+
+def test_key_ignores_whitespace_but_not_voice():
+    assert normalize_speech_text("  Muito\n bem! ") == "Muito bem!"
+    assert speech_key("Muito  bem!", "Kore", "m") == speech_key("Muito bem!", "Kore", "m")
+    assert speech_key("Muito bem!", "Kore", "m") != speech_key("Muito bem!", "Puck", "m")
+
+
+@pytest.mark.asyncio
+async def test_repeated_phrase_reuses_stored_audio_across_sessions(fake_backend):
+    ctx = FakeToolContext()
+
+    primeiro = await gerar_audio_tts("Parabéns, você acertou!", ctx)
+    repetido = await gerar_audio_tts("Parabéns,  você acertou!", ctx)
+    outra_sessao = await gerar_audio_tts("Parabéns, você acertou!", _nova_sessao(ctx))
+
+    assert primeiro["nome_artefato_gerado"].startswith("user:tts_")
+    assert not primeiro["fonte_cache"]
+    for resultado in (repetido, outra_sessao):
+        assert resultado["fonte_cache"]
+        assert resultado["nome_artefato_gerado"] == primeiro["nome_artefato_gerado"]
+        assert resultado["versao_artefato"] == primeiro["versao_artefato"]
+    assert len(fake_backend.calls) == 1
+    assert list(ctx.versions.values()) == [0]
+
+    stats = get_tts_cache().stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert stats["bytes_saved"] == 2 * primeiro["tamanho_bytes"]
+
+
+@pytest.mark.asyncio
+async def test_other_user_gets_a_copy_without_a_model_call(fake_backend):
+    aluno_a, aluno_b = FakeToolContext(), FakeToolContext()
+
+    a = await gerar_audio_tts("Vamos tentar de novo?", aluno_a)
+    b = await gerar_audio_tts("Vamos tentar de novo?", aluno_b)
+    outra_voz = await gerar_audio_tts("Vamos tentar de novo?", aluno_b, voz="Puck")
+
+    assert b["fonte_cache"]
+    assert b["nome_artefato_gerado"] == a["nome_artefato_gerado"]
+    assert b["nome_artefato_gerado"] in aluno_b.artifacts
+    assert not outra_voz["fonte_cache"]
+    assert len(fake_backend.calls) == 2
+    stats = get_tts_cache().stats()
+    assert (stats["shared_hits"], stats["misses"]) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_each_stored_audio_is_its_own_state_key_and_oldest_are_cleared():
+    ctx = FakeToolContext()
+    for i in range(3):
+        await store_audio(ctx, bytes([i]) * 100, "audio/wav", "gemini", f"pedido-{i}", max_refs=2)
+
+    audios = {k: v for k, v in ctx.state.items() if k.startswith(STORED_AUDIO_STATE_PREFIX)}
+    pedidos = {k: v for k, v in ctx.state.items() if k.startswith(STORED_KEY_STATE_PREFIX)}
+    assert len(audios) == len(pedidos) == 3
+    assert [v is None for v in audios.values()] == [True, False, False]
+    assert pedidos[STORED_KEY_STATE_PREFIX + "pedido-0"] is None
+    assert stored_audio(ctx, audio_digest(bytes([0]) * 100)) is None
+    assert stored_audio(ctx, audio_digest(bytes([2]) * 100)).size_bytes == 100
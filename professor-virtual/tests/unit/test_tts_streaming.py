@@ -0,0 +1,149 @@
+import asyncio
+import base64
+import json
+import types as pytypes
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.sessions import InMemorySessionService
+
+from professor_virtual.shared_libraries.audio import OutputProfile, parse_wav_header
+from professor_virtual.tools.gerar_audio_tts import ErroTtsStream, gerar_audio_tts_stream
+from professor_virtual.tts_streaming import criar_router_tts_stream
+from conftest import FakeToolContext
+
+
+async def _consumir(stream):
+    return [bloco async for bloco in stream]
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_header_then_pcm_and_persists_full_wav(fake_backend):
+    fake_backend.stream_chunk_bytes = 4800
+    ctx = FakeToolContext()
+    resultado = {}
+    texto = "Sete vezes oito é cinquenta e seis."
+
+    blocos = await _consumir(gerar_audio_tts_stream(texto, ctx, resultado=resultado))
+
+    assert blocos[0][:4] == b"RIFF" and len(blocos[0]) == 44
+    assert int.from_bytes(blocos[0][40:44], "little") == 0xFFFFFFFF
+    assert len(blocos) > 3
+    salvo = ctx.artifacts[resultado["nome_artefato_gerado"]].inline_data.data
+    assert salvo[44:] == b"".join(blocos[1:])
+    assert parse_wav_header(salvo).sample_rate == 24000
+    assert resultado["sucesso"] and resultado["stream"]
+    assert fake_backend.calls[0]["stream"]
+
+    # Segunda vez: o áudio guardado sai inteiro, sem chamar o modelo
+    de_novo = {}
+    blocos = await _consumir(gerar_audio_tts_stream(texto, ctx, resultado=de_novo))
+    assert blocos == [salvo]
+    assert de_novo["fonte_cache"]
+    assert len(fake_backend.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_honours_the_requested_profile(fake_backend):
+    fake_backend.stream_chunk_bytes = 4800
+    ctx = FakeToolContext()
+    resultado = {}
+    perfil = OutputProfile(8000, 8, "au")
+    texto = "Sete vezes oito é cinquenta e seis."
+
+    blocos = await _consumir(
+        gerar_audio_tts_stream(texto, ctx, resultado=resultado, perfil=perfil)
+    )
+
+    assert len(blocos) == 1 and blocos[0][:4] == b".snd"
+    salvo = ctx.artifacts[resultado["nome_artefato_gerado"]].inline_data
+    assert (salvo.data, salvo.mime_type) == (blocos[0], "audio/basic")
+    assert resultado["perfil_saida"]["taxa_amostragem"] == 8000
+
+    # O perfil padrão não reaproveita o áudio de outro perfil
+    await _consumir(gerar_audio_tts_stream(texto, ctx))
+    assert len(fake_backend.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_arrives_before_synthesis_finishes(fake_backend):
+    fake_backend.stream_chunk_bytes = 2400
+    fake_backend.stream_chunk_interval_secs = 0.02
+    stream = gerar_audio_tts_stream("Uma explicação mais longa sobre frações.", FakeToolContext())
+
+    loop = asyncio.get_running_loop()
+    inicio = loop.time()
+    await stream.__anext__()
+    primeiro = loop.time() - inicio
+    await _consumir(stream)
+    total = loop.time() - inicio
+
+    assert primeiro < total / 5
+
+
+@pytest.mark.asyncio
+async def test_invalid_request_fails_before_any_bytes(fake_backend):
+    with pytest.raises(ErroTtsStream) as erro:
+        await _consumir(gerar_audio_tts_stream("oi", FakeToolContext(), voz="Inexistente"))
+    assert "vozes_validas" in erro.value.resultado
+
+
+def _app():
+    runner = pytypes.SimpleNamespace(
+        app_name="professor_virtual_app",
+        session_service=InMemorySessionService(),
+        artifact_service=InMemoryArtifactService(),
+    )
+    app = FastAPI()
+    app.include_router(criar_router_tts_stream(runner))
+    return runner, TestClient(app)
+
+
+def test_http_endpoints_stream_audio_and_save_artifact(fake_backend):
+    runner, client = _app()
+    session = asyncio.run(
+        runner.session_service.create_session(app_name=runner.app_name, user_id="aluno")
+    )
+    params = {"user_id": "aluno", "session_id": session.id, "texto": "Muito bem, continue!"}
+
+    audio = client.get("/tts/stream", params=params)
+    assert audio.status_code == 200
+    assert audio.headers["content-type"] == "audio/wav"
+    assert audio.content[:4] == b"RIFF"
+
+    eventos = client.get("/tts/stream/eventos", params=params).text.strip().split("\n\n")
+    nomes = [e.split("\n")[0].removeprefix("event: ") for e in eventos]
+    assert nomes[-1] == "fim" and set(nomes[:-1]) == {"audio"}
+    fim = json.loads(eventos[-1].split("data: ", 1)[1])
+    assert fim["fonte_cache"]
+    corpo = b"".join(base64.b64decode(e.split("data: ", 1)[1]) for e in eventos[:-1])
+    assert corpo[44:] == audio.content[44:]
+
+    salvo = asyncio.run(runner.artifact_service.load_artifact(
+        app_name=runner.app_name, user_id="aluno", session_id=session.id,
+        filename=fim["nome_artefato_gerado"],
+    ))
+    assert salvo is not None
+    sessao = asyncio.run(runner.session_service.get_session(
+        app_name=runner.app_name, user_id="aluno", session_id=session.id
+    ))
+    assert sessao.state["ultimo_audio_tts"]["arquivo"] == fim["nome_artefato_gerado"]
+    assert len(fake_backend.calls) == 1
+
+
+def test_http_endpoint_rejects_unknown_session_and_bad_voice(fake_backend):
+    runner, client = _app()
+    session = asyncio.run(
+        runner.session_service.create_session(app_name=runner.app_name, user_id="aluno")
+    )
+    assert client.get(
+        "/tts/stream", params={"user_id": "aluno", "session_id": "x", "texto": "oi"}
+    ).status_code == 404
+    resposta = client.get(
+        "/tts/stream",
+        params={"user_id": "aluno", "session_id": session.id, "texto": "oi", "voz": "Nada"},
+    )
+    assert resposta.status_code == 400
+    assert not resposta.json()["sucesso"]
@@ -0,0 +1,93 @@
+import asyncio
+import importlib
+
+import pytest
+from google.genai import errors
+
+from professor_virtual.shared_libraries.audio import parse_wav_header
+from professor_virtual.shared_libraries.speech import split_for_synthesis
+from professor_virtual.tools.gerar_audio_tts import gerar_audio_tts, gerar_audio_tts_stream
+from conftest import FakeToolContext
+
+modulo_tts = importlib.import_module("professor_virtual.tools.gerar_audio_tts.gerar_audio_tts")
+
+FRASE = "Para somar frações com denominadores diferentes, primeiro encontramos o mínimo múltiplo comum."
+TEXTO_LONGO = " ".join(f"{FRASE[:-1]} do exemplo {i}." for i in range(8))
+
+
+@pytest.fixture(autouse=True)
+def _trechos_limpos():
+    modulo_tts._trechos_cache.clear()
+    yield
+    modulo_tts._trechos_cache.clear()
+
+
+def test_split_keeps_sentences_whole_and_paragraphs_apart():
+    texto = "Primeira frase. Segunda frase! Terceira?\n\nOutro parágrafo."
+    assert split_for_synthesis(texto, max_chars=35) == [
+        "Primeira frase. Segunda frase!",
+        "Terceira?",
+        "Outro parágrafo.",
+    ]
+
+
+def test_split_breaks_overlong_sentences_within_limit():
+    texto = "Uma frase enorme, " * 30
+    trechos = split_for_synthesis(texto, max_chars=50)
+    assert all(len(t) <= 50 for t in trechos)
+    assert " ".join(trechos).split() == texto.split()
+
+
+@pytest.mark.asyncio
+async def test_long_text_chunks_are_synthesized_in_parallel_and_joined_in_order(fake_backend):
+    fake_backend.latency_secs = 0.2
+    ctx = FakeToolContext()
+
+    loop = asyncio.get_running_loop()
+    inicio = loop.time()
+    resultado = await gerar_audio_tts(TEXTO_LONGO, ctx)
+    decorrido = loop.time() - inicio
+
+    trechos = split_for_synthesis(TEXTO_LONGO, 300)
+    assert resultado["sucesso"] and resultado["trechos"] == len(trechos) > 1
+    assert [c["contents"] for c in fake_backend.calls] == trechos
+    # Sequencial levaria uma latência por trecho
+    assert decorrido < 2 * 0.2
+
+    wav = ctx.artifacts[resultado["nome_artefato_gerado"]].inline_data.data
+    esperado = b"".join(
+        fake_backend._audio_response(t).candidates[0].content.parts[0].inline_data.data
+        for t in trechos
+    )
+    assert parse_wav_header(wav).sample_rate == 24000
+    assert wav[44:] == esperado
+
+
+@pytest.mark.asyncio
+async def test_retry_after_partial_failure_only_synthesizes_missing_chunks(fake_backend):
+    fake_backend.queue_error(
+        errors.ClientError(400, {"error": {"code": 400, "message": "bad", "status": "INVALID_ARGUMENT"}})
+    )
+    ctx = FakeToolContext()
+
+    falha = await gerar_audio_tts(TEXTO_LONGO, ctx)
+    assert not falha["sucesso"]
+    chamadas_na_falha = len(fake_backend.calls)
+
+    resultado = await gerar_audio_tts(TEXTO_LONGO, ctx)
+    assert resultado["sucesso"]
+    trechos = resultado["trechos"]
+    assert len(fake_backend.calls) - chamadas_na_falha < trechos
+
+
+@pytest.mark.asyncio
+async def test_stream_of_long_text_yields_header_then_chunks(fake_backend):
+    ctx = FakeToolContext()
+    resultado = {}
+
+    blocos = [b async for b in gerar_audio_tts_stream(TEXTO_LONGO, ctx, resultado=resultado)]
+
+    assert len(blocos[0]) == 44 and len(blocos) == resultado["trechos"] + 1
+    salvo = ctx.artifacts[resultado["nome_artefato_gerado"]].inline_data.data
+    assert salvo[44:] == b"".join(blocos[1:])
+    assert not any(c.get("stream") for c in fake_backend.calls)
@@ -0,0 +1,108 @@
+import asyncio
+import importlib
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from google.genai import types
+
+from professor_virtual.ciclo_de_vida import ciclo_de_vida
+
+from professor_virtual.shared_libraries.write_behind import WriteBehindQueue
+from professor_virtual.tools import transcrever_audio
+from conftest import FakeToolContext
+
+modulo_transcricao = importlib.import_module(
+    "professor_virtual.tools.transcrever_audio.transcrever_audio"
+)
+
+
+@pytest.mark.asyncio
+async def test_queue_runs_writes_in_order_and_counts_failures():
+    fila = WriteBehindQueue("teste")
+    feitos = []
+
+    async def gravar(i):
+        if i == 2:
+            raise IOError("gcs indisponível")
+        feitos.append(i)
+
+    for i in range(4):
+        assert fila.submit(lambda i=i: gravar(i))
+    assert await fila.flush(timeout=1)
+
+    assert feitos == [0, 1, 3]
+    assert fila.stats() == {
+        "pending": 0, "submitted": 4, "completed": 3, "failed": 1, "dropped": 0
+    }
+    await fila.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_drops_when_full():
+    fila = WriteBehindQueue("teste", max_pending=1)
+    liberar = asyncio.Event()
+    fila.submit(liberar.wait)
+    await asyncio.sleep(0)  # the worker takes the first write
+    assert fila.submit(liberar.wait)
+    assert not fila.submit(liberar.wait)
+    assert fila.dropped == 1
+    liberar.set()
+    await fila.close(timeout=1)
+
+
+class SlowSaveToolContext(FakeToolContext):
+    async def save_artifact(self, filename, artifact):
+        await asyncio.sleep(0.3)
+        return await super().save_artifact(filename, artifact)
+
+
+def _audio(seed):
+    return types.Part.from_bytes(data=b"ID3" + bytes([seed]) * 8000, mime_type="audio/mpeg")
+
+
+@pytest.mark.asyncio
+async def test_background_persistence_does_not_delay_the_result(fake_backend):
+    ctx = SlowSaveToolContext({"pergunta.mp3": _audio(41)})
+
+    start = time.monotonic()
+    resultado = await transcrever_audio("pergunta.mp3", ctx)
+    assert time.monotonic() - start < 0.3
+
+    nome = resultado["arquivo_agendado"]
+    assert nome.startswith("transcricao_") and nome not in ctx.artifacts
+    assert await modulo_transcricao._fila_persistencia.flush(timeout=2)
+    assert ctx.artifacts[nome].text == resultado["texto"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("modo", ["sync", "off"])
+async def test_persistence_modes(fake_backend, monkeypatch, modo):
+    monkeypatch.setattr(modulo_transcricao._config, "transcricao_persistencia", modo)
+    ctx = FakeToolContext({"pergunta.mp3": _audio(42 if modo == "sync" else 43)})
+
+    resultado = await transcrever_audio("pergunta.mp3", ctx)
+
+    assert "arquivo_agendado" not in resultado
+    if modo == "sync":
+        assert resultado["versao"] == 0
+        assert resultado["arquivo_salvo"] in ctx.artifacts
+    else:
+        assert "arquivo_salvo" not in resultado
+        assert set(ctx.artifacts) == {"pergunta.mp3"}
+
+
+def test_shutdown_lifespan_saves_queued_transcripts(fake_backend):
+    ctx = SlowSaveToolContext({"pergunta.mp3": _audio(44)})
+    app = FastAPI(lifespan=ciclo_de_vida)
+
+    @app.post("/transcrever")
+    async def transcrever():
+        return await transcrever_audio("pergunta.mp3", ctx)
+
+    with TestClient(app) as client:
+        nome = client.post("/transcrever").json()["arquivo_agendado"]
+        assert nome not in ctx.artifacts
+
+    assert nome in ctx.artifacts